@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_env_file():
+    env_path = BASE_DIR / ".env"
+    if not env_path.exists():
+        return
+    for line in env_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        k, v = line.split("=", 1)
+        os.environ.setdefault(k.strip(), v.strip())
+
+
+load_env_file()
+
+LLM_MODE = os.environ.get("LLM_MODE", "off").strip()  # off|azure_openai|hchat
+LLM_ENDPOINT = os.environ.get("LLM_ENDPOINT", "").strip()
+LLM_API_KEY = os.environ.get("LLM_API_KEY", "").strip()
+LLM_API_KEY_HEADER = os.environ.get("LLM_API_KEY_HEADER", "api-key").strip()
+LLM_DEPLOYMENT = os.environ.get("LLM_DEPLOYMENT", "").strip()
+LLM_API_VERSION = os.environ.get("LLM_API_VERSION", "2024-02-15-preview").strip()
+
+# bulk fill tuning
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))  # parallel requests per upload
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "30"))  # seconds per HTTP attempt
+LLM_ROW_TIMEOUT = float(os.environ.get("LLM_ROW_TIMEOUT", "90"))  # seconds per row incl. retries
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+
+# response cache (data/llm_cache.sqlite3)
+LLM_CACHE = os.environ.get("LLM_CACHE", "on").strip().lower() in ("1", "true", "on", "yes")
+LLM_CACHE_PATH = Path(os.environ.get("LLM_CACHE_PATH", str(BASE_DIR / "data" / "llm_cache.sqlite3")))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # seconds, 0 = never expire
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "64"))
+
+# batched fill: up to LLM_BATCH_MAX terms per request (1 = one term per request), sized so the
+# expected answer fits in LLM_MAX_TOKENS response tokens
+LLM_BATCH_MAX = int(os.environ.get("LLM_BATCH_MAX", "10"))
+LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", "4096"))
+# seconds per batch incl. retries; 0 = LLM_ROW_TIMEOUT x terms in the batch (the answer grows
+# with the batch). Each HTTP attempt of a batch likewise gets LLM_TIMEOUT x terms.
+LLM_BATCH_TIMEOUT = float(os.environ.get("LLM_BATCH_TIMEOUT", "0"))
+
+# threads for blocking work (file writes/fsync, workbook builds, full scans); the event loop
+# itself only parses requests and awaits
+BLOCKING_THREADS = int(os.environ.get("BLOCKING_THREADS", "8"))
@@ -0,0 +1,238 @@
+"""Glossary exports: .xlsx (cached per version) and streamed CSV / JSON Lines / Parquet.
+
+The .xlsx is built with openpyxl's write_only mode (rows are serialized as they are appended,
+no cell grid in memory) and two named styles registered once on the workbook, so each cell
+only carries a style reference. The bytes are kept per store tag (compaction epoch + rev):
+repeat downloads between edits are served from memory, and the tag doubles as the ETag, so
+every worker answers a revalidation the same way.
+
+The tabular formats are generated EXPORT_CHUNK rows at a time from a store snapshot, so the
+response starts immediately and memory stays flat; `select_items` applies the category /
+modified-since filters lazily on the same pass.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.utils import get_column_letter
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+XLSX_HEADERS = [
+    "용어(KR)",
+    "약어/EN",
+    "분류",
+    "한줄 정의",
+    "예시",
+    "KPI",
+    "혼동되는 용어",
+    "출처",
+]
+
+# column widths (rough)
+XLSX_WIDTHS = [22, 22, 12, 70, 60, 25, 30, 10]
+
+
+def export_row(it: Dict[str, Any]) -> List[Any]:
+    """One glossary item as a row in XLSX_HEADERS order."""
+    return [
+        it.get("kr", ""),
+        it.get("en", ""),
+        it.get("category", ""),
+        it.get("oneLine", ""),
+        it.get("example", ""),
+        ", ".join(it.get("kpi") or []),
+        ", ".join(it.get("confusions") or []),
+        it.get("createdBy", "USER"),
+    ]
+
+
+def build_xlsx(items: List[Dict[str, Any]]) -> bytes:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Glossary")
+
+    wb.add_named_style(NamedStyle(name="glossary_header", font=Font(bold=True),
+                                  alignment=Alignment(vertical="top", wrap_text=True)))
+    wb.add_named_style(NamedStyle(name="glossary_cell", alignment=Alignment(vertical="top", wrap_text=True)))
+
+    # write_only sheets need widths before the first row
+    for i, w in enumerate(XLSX_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+
+    def styled(value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    ws.append([styled(h, "glossary_header") for h in XLSX_HEADERS])
+    for it in items:
+        ws.append([styled(v, "glossary_cell") for v in export_row(it)])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class VersionedExport:
+    """Caches the latest rendering of one export format, keyed by the store's tag.
+
+    Only one version is kept (older ones are never requested again). The lock makes concurrent
+    downloads after an edit share a single build instead of each rendering the workbook.
+    """
+
+    def __init__(self, build: Callable[[List[Dict[str, Any]]], bytes], name: str):
+        self._build = build
+        self._name = name
+        self._lock = threading.Lock()
+        self._tag: Optional[str] = None
+        self._data = b""
+
+    def etag(self, tag: str) -> str:
+        return f'"{self._name}-{tag}"'
+
+    def get(self, store) -> Tuple[bytes, str]:
+        """(bytes, etag) for the store's current state."""
+        with self._lock:
+            tag = store.tag
+            if tag != self._tag:
+                # tag before the copy: a put landing in between is at worst built again next time
+                items = store.export()
+                self._data = self._build(items)
+                self._tag = tag
+            return self._data, self.etag(self._tag)
+
+
+# ---- streamed tabular exports ------------------------------------------
+
+EXPORT_CHUNK = int(os.environ.get("EXPORT_CHUNK", "500"))  # rows per yielded chunk
+
+# column order for CSV / Parquet (JSON Lines keeps every item field)
+EXPORT_FIELDS = ["kr", "en", "category", "oneLine", "example", "kpi", "confusions", "createdBy", "updatedAt"]
+LIST_FIELDS = ("kpi", "confusions")
+
+
+def parse_since(value: str) -> str:
+    """Normalize a modifiedSince value (ISO 8601 date/datetime or epoch seconds) to the
+    `updatedAt` format. Naive datetimes are taken as UTC. Raises ValueError."""
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        try:
+            dt = datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (ValueError, OverflowError, OSError) as e:  # nan, inf, past year 9999
+            raise ValueError(f"modifiedSince out of range: {value}") from e
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def select_items(items: Iterable[Dict[str, Any]], categories: Optional[List[str]] = None,
+                 since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Items in any of `categories` (all if empty) updated at or after `since`.
+
+    Items without `updatedAt` (seed data never edited through the app) only match when no
+    `since` is given.
+    """
+    wanted = set(categories or ())
+    for it in items:
+        if wanted and it.get("category", "") not in wanted:
+            continue
+        if since and (it.get("updatedAt") or "") < since:
+            continue
+        yield it
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for it in items:
+        chunk.append(it)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(EXPORT_FIELDS)
+    for chunk in _chunks(items, EXPORT_CHUNK):
+        for it in chunk:
+            w.writerow([", ".join(it.get(f) or []) if f in LIST_FIELDS else it.get(f, "")
+                        for f in EXPORT_FIELDS])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()  # header only (no matching rows)
+
+
+def iter_jsonl(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for chunk in _chunks(items, EXPORT_CHUNK):
+        yield "".join(json.dumps(it, ensure_ascii=False) + "\n" for it in chunk)
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink the Parquet writer appends to; `take()` hands over what was written.
+
+    tell() keeps counting across takes because the footer records absolute offsets.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+def iter_parquet(items: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One row group per EXPORT_CHUNK items. Requires pyarrow (see parquet_available)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(f, pa.list_(pa.string()) if f in LIST_FIELDS else pa.string())
+                        for f in EXPORT_FIELDS])
+    sink = _Drain()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for chunk in _chunks(items, EXPORT_CHUNK):
+            rows = [{f: (list(it.get(f) or []) if f in LIST_FIELDS else it.get(f)) for f in EXPORT_FIELDS}
+                    for it in chunk]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()  # footer
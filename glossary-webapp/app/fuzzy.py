@@ -0,0 +1,194 @@
+"""Approximate term matching for the glossary.
+
+Two layers:
+- a spacing/punctuation-insensitive exact key ("스마트 팩토리" == "스마트팩토리", "OEE." == "OEE");
+  this is a lookup key only: term identity stays norm_key, so "C" and "C++" remain two entries
+- a symmetric-delete (deletion neighborhood) index over Hangul-jamo-decomposed keys for typo
+  tolerance: two strings within edit distance d share a variant with <= d characters removed,
+  so a lookup is a handful of dict probes plus a bounded Levenshtein check on the few candidates
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+_LOOSE_RE = re.compile(r"[\W_]+", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def norm_key(s: str) -> str:
+    """Identity key of a term: lowercase, trimmed, inner whitespace collapsed."""
+    return _SPACE_RE.sub(" ", (s or "").strip().lower())
+
+
+def loose_key(s: str) -> str:
+    """Lowercase and drop whitespace/punctuation."""
+    return _LOOSE_RE.sub("", (s or "").lower())
+
+
+def decompose(s: str) -> str:
+    """Split Hangul syllables into jamo so one wrong jamo costs 1, not a whole syllable."""
+    out: List[str] = []
+    for ch in s:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            idx = code - _HANGUL_BASE
+            out.append(_CHO[idx // 588])
+            out.append(_JUNG[(idx % 588) // 28])
+            out.append(_JONG[idx % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def max_distance(key: str) -> int:
+    """Edit-distance budget by (jamo) key length; short acronyms must match exactly."""
+    n = len(key)
+    if n <= 4:
+        return 0
+    if n < 10:
+        return 1
+    return 2
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance, returning limit + 1 as soon as it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        row_min = i
+        for j, cb in enumerate(b, start=1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            cur.append(v)
+            if v < row_min:
+                row_min = v
+        if row_min > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+MAX_EDITS = 2
+
+
+def deletions(key: str, depth: int = MAX_EDITS) -> Set[str]:
+    """All strings reachable from key by removing up to `depth` characters (key included)."""
+    out = {key}
+    frontier = {key}
+    for _ in range(depth):
+        nxt = set()
+        for k in frontier:
+            for i in range(len(k)):
+                nxt.add(k[:i] + k[i + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+class FuzzyIndex:
+    """Typo-tolerant lookup over `kr`/`en` of glossary items (identity keys live in GlossaryStore).
+
+    Registered as a store listener it is patched per put, like the related graph: only the
+    replaced item's keys and their deletion variants change, never the whole index.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict[str, Any]] = {}  # norm_key(kr) -> item
+        self._jamo: Dict[str, Set[str]] = {}  # jamo key -> norm_key(kr) of items with that kr/en
+        self._variants: Dict[str, Set[str]] = {}  # deletion variant -> jamo keys
+        self.reset(items)
+
+    # ---- store listener ------------------------------------------------
+
+    def reset(self, items: Iterable[Dict[str, Any]]):
+        with self._lock:
+            self._items, self._jamo, self._variants = {}, {}, {}
+            for item in items:
+                self._add(item)
+
+    def replace(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            self._add(new)
+
+    # ---- maintenance ---------------------------------------------------
+
+    @staticmethod
+    def _keys(item: Dict[str, Any]) -> Set[str]:
+        keys = (loose_key(item.get(field) or "") for field in ("kr", "en"))
+        return {decompose(k) for k in keys if k}
+
+    def _add(self, item: Dict[str, Any]):
+        kr = norm_key(item.get("kr") or "")
+        if not kr or kr in self._items:
+            return  # duplicates: first wins, like the store
+        self._items[kr] = item
+        for j in self._keys(item):
+            if j not in self._jamo:
+                # a key never matches beyond its own budget, so deeper variants would be dead weight
+                for v in deletions(j, max_distance(j)):
+                    self._variants.setdefault(v, set()).add(j)
+            self._jamo.setdefault(j, set()).add(kr)
+
+    def _remove(self, item: Dict[str, Any]):
+        kr = norm_key(item.get("kr") or "")
+        if self._items.get(kr) is not item:
+            return
+        del self._items[kr]
+        for j in self._keys(item):
+            owners = self._jamo.get(j)
+            if owners is None:
+                continue
+            owners.discard(kr)
+            if owners:
+                continue
+            del self._jamo[j]
+            for v in deletions(j, max_distance(j)):
+                keys = self._variants.get(v)
+                if keys is not None:
+                    keys.discard(j)
+                    if not keys:
+                        del self._variants[v]
+
+    # ---- queries -------------------------------------------------------
+
+    def similar(self, term: str, limit: int = 5,
+                max_dist: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return up to `limit` (distance, item) pairs, closest first."""
+        j = decompose(loose_key(term))
+        if not j:
+            return []
+        budget = min(max_distance(j) if max_dist is None else max_dist, MAX_EDITS)
+        with self._lock:
+            candidates: Set[str] = set()
+            for v in deletions(j, budget):
+                candidates |= self._variants.get(v, set())
+
+            best: Dict[str, int] = {}
+            for key in candidates:
+                # short keys (acronyms) keep their own strict budget: "OEE" never matches "OEM";
+                # keys are only indexed that deep, so `max_dist` can narrow the budget, not widen it
+                limit_d = min(budget, max_distance(key))
+                d = levenshtein(j, key, limit_d)
+                if d > limit_d:
+                    continue
+                for kr in self._jamo[key]:
+                    if d < best.get(kr, limit_d + 1):
+                        best[kr] = d
+            ranked = sorted((d, kr) for kr, d in best.items())[:limit]
+            return [(d, self._items[kr]) for d, kr in ranked]
@@ -0,0 +1,174 @@
+"""Related-terms graph over `confusions` and `kpi`.
+
+Nodes are loose keys (see fuzzy.loose_key) with a kind prefix: "t:" for term names, "k:" for
+KPIs. Each item links its own `kr` node to every confusion name and to every KPI node, in both
+directions. Confusion names need not be glossary entries, and they may use the other item's
+`en` ("AX" for "AI 전환"), so an item's neighbors are the union of the edges at its `kr` and
+`en` nodes.
+
+Registered as a store listener, the graph is patched per put (old edges out, new edges in) and
+never rebuilt; neighbor lookups and the KPI reverse index cost O(degree). A node's display label
+goes with its last item, alias or edge, so names an edit drops do not pile up.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.fuzzy import loose_key
+
+
+def term_node(name: str) -> str:
+    return "t:" + loose_key(name)
+
+
+def kpi_node(name: str) -> str:
+    return "k:" + loose_key(name)
+
+
+def summary(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "kr": item.get("kr"),
+        "en": item.get("en"),
+        "category": item.get("category"),
+        "oneLine": item.get("oneLine"),
+        "source": item.get("createdBy", "glossary"),
+    }
+
+
+class RelatedGraph:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._adj: Dict[str, Dict[str, int]] = {}  # node -> {neighbor: edge multiplicity}
+        self._items: Dict[str, Dict[str, Any]] = {}  # kr node -> item
+        self._alias: Dict[str, str] = {}  # en node -> kr node
+        self._labels: Dict[str, str] = {}  # node -> display name (first seen while referenced)
+
+    # ---- store listener ------------------------------------------------
+
+    def reset(self, items: Iterable[Dict[str, Any]]):
+        with self._lock:
+            self._adj, self._items, self._alias, self._labels = {}, {}, {}, {}
+            for it in items:
+                if term_node(it.get("kr", "")) not in self._items:  # duplicates: first wins, like the store
+                    self._add(it)
+
+    def replace(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            self._add(new)
+
+    # ---- maintenance ---------------------------------------------------
+
+    @staticmethod
+    def _edges(item: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(node, display name) pairs the item links to."""
+        out = [(term_node(c), c) for c in item.get("confusions") or []]
+        out += [(kpi_node(k), k) for k in item.get("kpi") or []]
+        return [(n, label) for n, label in out if len(n) > 2]
+
+    def _link(self, a: str, b: str, delta: int):
+        for x, y in ((a, b), (b, a)):
+            nbrs = self._adj.setdefault(x, {})
+            n = nbrs.get(y, 0) + delta
+            if n > 0:
+                nbrs[y] = n
+            else:
+                nbrs.pop(y, None)
+                if not nbrs:
+                    del self._adj[x]
+
+    def _add(self, item: Dict[str, Any]):
+        node = term_node(item.get("kr", ""))
+        if len(node) <= 2:
+            return
+        self._items[node] = item
+        self._labels.setdefault(node, item.get("kr", ""))
+        en = term_node(item.get("en", ""))
+        if len(en) > 2 and en != node:
+            self._alias.setdefault(en, node)
+            self._labels.setdefault(en, item.get("en", ""))
+        for other, label in self._edges(item):
+            if other == node or other == en:
+                continue  # lists itself as a confusion
+            self._labels.setdefault(other, label)
+            self._link(node, other, 1)
+
+    def _remove(self, item: Dict[str, Any]):
+        node = term_node(item.get("kr", ""))
+        if self._items.get(node) is not item:
+            return
+        del self._items[node]
+        en = term_node(item.get("en", ""))
+        if self._alias.get(en) == node:
+            del self._alias[en]
+        touched = {node, en}
+        for other, _ in self._edges(item):
+            if other == node or other == en:
+                continue
+            self._link(node, other, -1)
+            touched.add(other)
+        for n in touched:
+            if n not in self._items and n not in self._alias and n not in self._adj:
+                self._labels.pop(n, None)
+
+    # ---- queries -------------------------------------------------------
+
+    def _canonical(self, node: str) -> str:
+        return node if node in self._items else self._alias.get(node, node)
+
+    def _neighbors(self, node: str) -> List[str]:
+        """Canonical neighbors of a canonical node (edges at its kr and en nodes)."""
+        nbrs = list(self._adj.get(node, ()))
+        item = self._items.get(node)
+        if item is not None:
+            en = term_node(item.get("en", ""))
+            if en != node and self._alias.get(en) == node:
+                nbrs.extend(self._adj.get(en, ()))
+        return [self._canonical(n) for n in nbrs]
+
+    def _describe(self, node: str, hops: int) -> Dict[str, Any]:
+        if node.startswith("k:"):
+            return {"type": "kpi", "kpi": self._labels.get(node, node[2:]),
+                    "terms": len(self._adj.get(node, ())), "hops": hops}
+        item = self._items.get(node)
+        if item is not None:
+            return {"type": "term", **summary(item), "inGlossary": True, "hops": hops}
+        return {"type": "term", "kr": self._labels.get(node, node[2:]), "inGlossary": False, "hops": hops}
+
+    def related(self, term: str, k: int = 1, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+        """Nodes within `k` hops of `term` (a term -> KPI -> term path is 2 hops), nearest first.
+
+        None if `term` is not in the graph at all.
+        """
+        with self._lock:
+            start = self._canonical(term_node(term))
+            if start not in self._items and start not in self._adj:
+                return None
+            seen = {start}
+            out: List[Dict[str, Any]] = []
+            frontier = deque([(start, 0)])
+            while frontier and len(out) < limit:
+                node, hops = frontier.popleft()
+                if hops >= k:
+                    continue
+                for nb in self._neighbors(node):
+                    if nb in seen:
+                        continue
+                    seen.add(nb)
+                    out.append(self._describe(nb, hops + 1))
+                    if len(out) >= limit:
+                        break
+                    frontier.append((nb, hops + 1))
+            return out
+
+    def kpi_terms(self, kpi: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """(KPI display name, items that list it) or None for an unknown KPI."""
+        with self._lock:
+            node = kpi_node(kpi)
+            nbrs = self._adj.get(node)
+            if not nbrs:
+                return None
+            items = [self._items[n] for n in nbrs if n in self._items]
+            return self._labels.get(node, kpi), [summary(it) for it in sorted(items, key=lambda it: it.get("kr", ""))]
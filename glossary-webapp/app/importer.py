@@ -0,0 +1,287 @@
+"""Excel bulk import: header mapping, row parsing, LLM fill and merge into the store.
+
+The sheet XML is streamed (app.xlsx_stream) and rows are pulled in chunks, so memory stays
+bounded by the chunk size (plus the shared-strings table) regardless of file size; duplicate
+matching is an O(1) key lookup in the store. After each chunk the job's counters and
+`nextRow` are checkpointed, so an interrupted import resumes where it stopped. Re-applying a
+chunk is harmless because merges are idempotent upserts. Each chunk is counted in its own report
+that joins the job's totals only at the checkpoint, and the rows a chunk adds are checkpointed
+(`chunkAdded`) before its puts reach the log, so a re-applied chunk reports the same counts.
+"""
+
+import asyncio
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.config import LLM_CONCURRENCY, LLM_MODE
+from app.llm import generate_many
+from app.store import GlossaryStore
+from app.xlsx_stream import iter_rows, sheet_rows
+
+IMPORT_CHUNK = int(os.environ.get("IMPORT_CHUNK", "100"))  # rows per checkpoint
+MAX_REPORTED_ERRORS = 200
+
+HEADER_ALIASES = {
+    "kr": ["용어(KR)", "용어", "KR", "kr"],
+    "en": ["약어/EN", "EN", "en", "약어"],
+    "category": ["분류", "category"],
+    "oneLine": ["한줄 정의", "정의", "oneLine"],
+    "example": ["예시", "example"],
+    "kpi": ["KPI", "kpi"],
+    "confusions": ["혼동되는 용어", "confusions"],
+}
+
+
+class ImportFailed(Exception):
+    """Whole-file problem (e.g. missing KR column); `code` is reported to the client."""
+
+    def __init__(self, code: str, detail: Any = None):
+        super().__init__(code)
+        self.code = code
+        self.detail = detail
+
+
+def split_list(s: Any) -> List[str]:
+    if s is None:
+        return []
+    if isinstance(s, list):
+        return [str(x).strip() for x in s if str(x).strip()]
+    s2 = str(s).strip()
+    if not s2:
+        return []
+    # allow comma or newline separated
+    parts = re.split(r"[\n,]+", s2)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def merge_keep_existing(dst: Dict[str, Any], src: Dict[str, Any]):
+    """Fill only missing/empty fields in dst from src."""
+    for k, v in src.items():
+        if v is None:
+            continue
+        if isinstance(v, str):
+            if not v.strip():
+                continue
+        if isinstance(v, list):
+            if len(v) == 0:
+                continue
+
+        cur = dst.get(k)
+        if cur is None:
+            dst[k] = v
+            continue
+        if isinstance(cur, str) and not cur.strip():
+            dst[k] = v
+            continue
+        if isinstance(cur, list) and len(cur) == 0:
+            dst[k] = v
+            continue
+
+
+def needs_fill(entry: Dict[str, Any]) -> bool:
+    return any([
+        not entry.get("en"),
+        not entry.get("category"),
+        not entry.get("oneLine"),
+        not entry.get("example"),
+        not entry.get("kpi"),
+        not entry.get("confusions"),
+    ])
+
+
+def map_headers(header_row: Sequence[Any]) -> Dict[str, int]:
+    col_map: Dict[str, int] = {}
+    for i, h in enumerate(header_row):
+        hn = str(h).strip() if h is not None else ""
+        if not hn:
+            continue
+        for key, names in HEADER_ALIASES.items():
+            if hn in names:
+                col_map[key] = i
+    return col_map
+
+
+def parse_row(values: Sequence[Any], col_map: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """Glossary entry for one sheet row, or None when the KR cell is empty."""
+
+    def cell(key: str) -> Any:
+        i = col_map.get(key)
+        return values[i] if i is not None and i < len(values) else None
+
+    def text(key: str) -> str:
+        v = cell(key)
+        return str(v).strip() if v is not None else ""
+
+    kr = text("kr")
+    if not kr:
+        return None
+
+    entry: Dict[str, Any] = {
+        "kr": kr,
+        "en": text("en"),
+        "category": text("category"),
+        "oneLine": text("oneLine"),
+        "example": text("example"),
+        "kpi": split_list(cell("kpi")),
+        "confusions": split_list(cell("confusions")),
+    }
+
+    # normalize category if empty
+    if not entry.get("category"):
+        entry["category"] = "AI"
+    return entry
+
+
+def merge_entry(store: GlossaryStore, entry: Dict[str, Any]) -> str:
+    """Upsert `entry`; returns "added" or "updated"."""
+    existing = store.find(entry["kr"])
+    if existing is None and entry.get("en"):
+        existing = store.find(entry.get("en", ""))
+
+    if existing is None:
+        store.put(entry)
+        return "added"
+
+    # merge: keep existing values, fill missing from uploaded/LLM
+    merged = dict(existing)
+    merge_keep_existing(merged, entry)
+    store.put(merged)
+    return "updated"
+
+
+def new_report() -> Dict[str, Any]:
+    return {"added": 0, "updated": 0, "filledByLLM": 0, "skipped": 0, "errors": []}
+
+
+def _error(report: Dict[str, Any], row_idx: int, err: Any):
+    report["errorCount"] = report.get("errorCount", 0) + 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row_idx, "error": str(err)})
+
+
+def add_report(total: Dict[str, Any], part: Dict[str, Any]):
+    """Fold one chunk's report into the job's."""
+    for k in ("added", "updated", "filledByLLM", "skipped"):
+        total[k] += part[k]
+    if part.get("errorCount"):
+        total["errorCount"] = total.get("errorCount", 0) + part["errorCount"]
+        total["errors"].extend(part["errors"][:max(0, MAX_REPORTED_ERRORS - len(total["errors"]))])
+
+
+async def import_chunk(store: GlossaryStore, rows: List[Tuple[int, Sequence[Any]]], col_map: Dict[str, int],
+                       fill: bool, report: Dict[str, Any], added: Optional[Set[int]] = None,
+                       before_write: Optional[Callable[[], None]] = None):
+    # 1) parse rows
+    parsed: List[Tuple[int, Dict[str, Any]]] = []
+    for row_idx, values in rows:
+        try:
+            entry = parse_row(values, col_map)
+            if entry is None:
+                report["skipped"] += 1
+                continue
+            parsed.append((row_idx, entry))
+        except Exception as e:
+            _error(report, row_idx, e)
+
+    # 2) auto-fill missing parts by LLM, concurrently (never overwrite user-provided values)
+    if fill and (LLM_MODE != "off"):
+        todo = [(row_idx, entry) for row_idx, entry in parsed if needs_fill(entry)]
+        results = await generate_many([entry["kr"] for _, entry in todo], concurrency=LLM_CONCURRENCY)
+        failed = set()
+        for (row_idx, entry), gen in zip(todo, results):
+            if isinstance(gen, Exception):
+                _error(report, row_idx, gen)
+                failed.add(row_idx)
+                continue
+            # ensure list shapes
+            gen["kpi"] = split_list(gen.get("kpi"))
+            gen["confusions"] = split_list(gen.get("confusions"))
+            merge_keep_existing(entry, gen)
+            report["filledByLLM"] += 1
+        parsed = [(row_idx, entry) for row_idx, entry in parsed if row_idx not in failed]
+
+    # 3) merge into the glossary (one log write per chunk); the log append and any compaction
+    # happen in a worker thread
+    await asyncio.to_thread(merge_chunk, store, parsed, report, added, before_write)
+
+
+def merge_chunk(store: GlossaryStore, parsed: List[Tuple[int, Dict[str, Any]]], report: Dict[str, Any],
+                added: Optional[Set[int]] = None, before_write: Optional[Callable[[], None]] = None):
+    """Merge parsed rows in one batch. Rows already in `added` (a previous attempt at this chunk
+    added them) count as added again; new additions join the set. `before_write` runs before the
+    batch is appended to the log.
+    """
+    added = set() if added is None else added
+    with store.batch():
+        for row_idx, entry in parsed:
+            try:
+                outcome = merge_entry(store, entry)
+            except Exception as e:
+                _error(report, row_idx, e)
+                continue
+            if outcome == "added":
+                added.add(row_idx)
+            elif row_idx in added:
+                outcome = "added"
+            report[outcome] += 1
+        if before_write is not None:
+            before_write()
+
+
+async def run_import_job(store: GlossaryStore, job: Dict[str, Any], checkpoint: Callable[[Dict[str, Any]], None]):
+    """Import job["path"] into the store, resuming from job["nextRow"]."""
+    path = str(Path(job["path"]))
+    rows = iter_rows(path)
+    try:
+        first = await asyncio.to_thread(next, rows, None)
+        header_row = [str(x).strip() if x is not None else "" for x in (first[1] if first else [])]
+        col_map = map_headers(header_row)
+        if "kr" not in col_map:
+            raise ImportFailed("MISSING_KR_COLUMN", header_row)
+
+        job.setdefault("report", new_report())
+        last_row = await asyncio.to_thread(sheet_rows, path)
+        job["rowsTotal"] = max(0, last_row - 1) if last_row else None
+        start = job.get("nextRow", 2)
+        fill = job.get("fillMissing", False)
+        redo = job.get("chunkAdded")  # rows the interrupted chunk added: {"row", "rows"}
+        await asyncio.to_thread(checkpoint, job)
+
+        def next_chunk() -> List[Tuple[int, Sequence[Any]]]:
+            out = []
+            for row_idx, values in rows:
+                if row_idx < start:
+                    continue  # resume: already imported
+                out.append((row_idx, values))
+                if len(out) >= IMPORT_CHUNK:
+                    break
+            return out
+
+        while True:
+            # XML parsing happens off the event loop, one chunk at a time
+            chunk = await asyncio.to_thread(next_chunk)
+            if not chunk:
+                break
+            first_row = chunk[0][0]
+            added = set(redo["rows"]) if redo and redo["row"] == first_row else set()
+            redo = None
+
+            def before_write():
+                # the job's report is still the pre-chunk one, matching nextRow
+                if added:
+                    job["chunkAdded"] = {"row": first_row, "rows": sorted(added)}
+                    checkpoint(job)
+
+            part = new_report()
+            await import_chunk(store, chunk, col_map, fill, part, added, before_write)
+            add_report(job["report"], part)
+            job.pop("chunkAdded", None)
+            job["rowsDone"] = job.get("rowsDone", 0) + len(chunk)
+            job["nextRow"] = chunk[-1][0] + 1
+            await asyncio.to_thread(checkpoint, job)
+    finally:
+        rows.close()
+
+    job["count"] = len(store.items())
@@ -0,0 +1,139 @@
+"""Background job queue for bulk imports.
+
+Each job is a JSON file under `data/jobs/` (written atomically on every state change), so
+status survives restarts; jobs still `queued` or `running` at startup are picked up again.
+A finished job's input file (`job["path"]`) is deleted. Job-file reads and writes run in
+worker threads so a slow disk never stalls the event loop.
+
+With several server processes each one resumes the same interrupted jobs, so a worker first
+claims the job with a non-blocking flock on `<id>.lock` and skips it if another process holds it.
+The lock file stays until the job is finished, so every claimer contends on the same file.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only
+    fcntl = None
+
+from app.store import write_json_atomic
+
+Handler = Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Awaitable[None]]
+
+
+class JobQueue:
+    def __init__(self, jobs_dir: Path, handler: Handler, workers: int = 2):
+        self.jobs_dir = jobs_dir
+        self.handler = handler
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.json"
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:12]
+
+    def save(self, job: Dict[str, Any]):
+        job["updatedAt"] = time.time()
+        write_json_atomic(self._path(job["id"]), job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not job_id.isalnum():
+            return None
+        p = self._path(job_id)
+        if not p.exists():
+            return None
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def _claim(self, job_id: str) -> Optional[int]:
+        """Lock fd for the job, or None if another process is running it."""
+        fd = os.open(self.jobs_dir / f"{job_id}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+        return fd
+
+    def _release(self, job_id: str, fd: int, finished: bool):
+        # Unlinking an unfinished job's lock file would let a process that opened it earlier
+        # lock the old inode while another creates and locks a new one: two owners. Only a
+        # finished job's file goes; a late claimer of the old inode re-reads the job under
+        # that lock (_run) and skips it.
+        if finished:
+            (self.jobs_dir / f"{job_id}.lock").unlink(missing_ok=True)
+        os.close(fd)
+
+    def list(self, limit: int = 20) -> List[Dict[str, Any]]:
+        if not self.jobs_dir.exists():
+            return []
+        paths = sorted(self.jobs_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [json.loads(p.read_text(encoding="utf-8")) for p in paths[:limit]]
+
+    async def submit(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job.update(status="queued", createdAt=time.time(), rowsDone=0)
+        await asyncio.to_thread(self.save, job)
+        self._queue.put_nowait(job["id"])
+        return job
+
+    async def start(self):
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+        # resume anything interrupted by a restart, oldest first
+        pending = [j for j in self.list(limit=10_000) if j.get("status") in ("queued", "running")]
+        for job in sorted(pending, key=lambda j: j.get("createdAt", 0)):
+            self._queue.put_nowait(job["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            fd = await asyncio.to_thread(self._claim, job_id)
+            if fd is None:
+                continue
+            finished = False
+            try:
+                finished = await self._run(job_id)
+            finally:
+                self._release(job_id, fd, finished)
+
+    async def _run(self, job_id: str) -> bool:
+        """Run the job if it still needs running; True once it is done or failed."""
+        # read after claiming: another process may have finished it in the meantime
+        job = await asyncio.to_thread(self.get, job_id)
+        if job is None or job.get("status") in ("done", "failed"):
+            return True
+        job["status"] = "running"
+        await asyncio.to_thread(self.save, job)
+        try:
+            await self.handler(job, self.save)
+            job["status"] = "done"
+        except asyncio.CancelledError:
+            # shutting down: leave it "running" so start() resumes it
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = getattr(e, "code", None) or str(e)
+            detail = getattr(e, "detail", None)
+            if detail is not None:
+                job["errorDetail"] = detail
+        await asyncio.to_thread(self.save, job)
+        if job.get("path"):
+            await asyncio.to_thread(Path(job["path"]).unlink, missing_ok=True)
+        return True
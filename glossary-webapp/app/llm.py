@@ -0,0 +1,383 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from app.config import (
+    LLM_API_KEY,
+    LLM_API_KEY_HEADER,
+    LLM_API_VERSION,
+    LLM_BATCH_MAX,
+    LLM_BATCH_TIMEOUT,
+    LLM_CACHE,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL,
+    LLM_CONCURRENCY,
+    LLM_DEPLOYMENT,
+    LLM_ENDPOINT,
+    LLM_MAX_RETRIES,
+    LLM_MAX_TOKENS,
+    LLM_MODE,
+    LLM_ROW_TIMEOUT,
+    LLM_TIMEOUT,
+)
+from app.fuzzy import loose_key
+from app.llm_cache import LLMCache
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+cache: Optional[LLMCache] = (
+    LLMCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024)) if LLM_CACHE else None
+)
+
+# network calls per path, to compare tokens and wall time per term (single vs batch)
+path_stats: Dict[str, Dict[str, float]] = {
+    "single": {"calls": 0, "terms": 0, "tokens": 0, "seconds": 0.0},
+    "batch": {"calls": 0, "terms": 0, "tokens": 0, "seconds": 0.0, "failedTerms": 0},
+}
+
+# running estimate of completion tokens one drafted term needs; drives the batch size
+_tokens_per_term = 300.0
+
+_SCHEMA = (
+    "{\n"
+    "  \"kr\": \"\",\n"
+    "  \"en\": \"\",\n"
+    "  \"category\": \"전략|데이터|AI|자동화|운영|보안|성과\",\n"
+    "  \"oneLine\": \"1~2문장\",\n"
+    "  \"example\": \"제조 현장 예시 1개\",\n"
+    "  \"kpi\": [\"OEE\",\"불량률\",\"리드타임\",\"OTD\",\"원가\",\"에너지\"],\n"
+    "  \"confusions\": [\"유사 용어 1~3개\"]\n"
+    "}\n"
+)
+
+
+def build_prompt(term: str) -> str:
+    return (
+        "당신은 제조(스마트팩토리/품질/설비) 맥락의 AI/DX 용어집 작성자입니다.\n"
+        "아래 용어에 대해 '초안'을 작성하세요.\n\n"
+        f"용어: {term}\n\n"
+        "출력은 반드시 JSON만 반환하세요. 추가 텍스트 금지.\n"
+        "스키마:\n"
+        + _SCHEMA
+    )
+
+
+def build_batch_prompt(terms: List[str]) -> str:
+    listing = "".join(f"{i}. {t}\n" for i, t in enumerate(terms, start=1))
+    return (
+        "당신은 제조(스마트팩토리/품질/설비) 맥락의 AI/DX 용어집 작성자입니다.\n"
+        "아래 용어 각각에 대해 '초안'을 작성하세요.\n\n"
+        f"용어 목록:\n{listing}\n"
+        "출력은 반드시 JSON만 반환하세요. 추가 텍스트 금지.\n"
+        "형식: {\"items\": [용어 목록 순서대로 용어마다 아래 스키마 객체 1개]}\n"
+        "각 객체의 kr은 목록의 용어를 그대로 사용하세요.\n"
+        "스키마:\n"
+        + _SCHEMA
+    )
+
+
+def _request(prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """(url, headers, body) for one chat completion."""
+    if LLM_MODE == "off":
+        raise RuntimeError("LLM is disabled (LLM_MODE=off)")
+    if not LLM_ENDPOINT or not LLM_API_KEY:
+        raise RuntimeError("Missing LLM_ENDPOINT or LLM_API_KEY")
+
+    # We support two generic modes:
+    # - azure_openai: endpoint like https://{resource}.openai.azure.com
+    # - hchat: custom endpoint that accepts OpenAI-compatible /chat/completions (best effort)
+
+    headers = {LLM_API_KEY_HEADER: LLM_API_KEY}
+
+    if LLM_MODE == "azure_openai":
+        if not LLM_DEPLOYMENT:
+            raise RuntimeError("Missing LLM_DEPLOYMENT for azure_openai")
+        url = f"{LLM_ENDPOINT.rstrip('/')}/openai/deployments/{LLM_DEPLOYMENT}/chat/completions?api-version={LLM_API_VERSION}"
+    else:
+        # assume endpoint is full URL to /chat/completions
+        url = LLM_ENDPOINT
+
+    body = {
+        "messages": [
+            {"role": "system", "content": "Return only JSON."},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.2,
+    }
+    return url, headers, body
+
+
+def _cache_key(body: Dict[str, Any]) -> str:
+    return LLMCache.key(LLM_MODE, LLM_ENDPOINT, LLM_DEPLOYMENT, body["temperature"], body["messages"])
+
+
+def _content(data: Dict[str, Any]) -> str:
+    # best effort parsing
+    try:
+        return data["choices"][0]["message"]["content"]
+    except Exception:
+        raise RuntimeError(f"Unexpected LLM response shape: {str(data)[:500]}")
+
+
+def _remember(key: str, content: str, data: Dict[str, Any], started: float):
+    if cache is None:
+        return
+    tokens = (data.get("usage") or {}).get("total_tokens") or 0
+    cache.put(key, content, latency_ms=(time.perf_counter() - started) * 1000.0, tokens=int(tokens))
+
+
+def _record(path: str, terms: int, data: Dict[str, Any], seconds: float):
+    st = path_stats[path]
+    st["calls"] += 1
+    st["terms"] += terms
+    st["tokens"] += int((data.get("usage") or {}).get("total_tokens") or 0)
+    st["seconds"] += seconds
+
+
+def _parse(content: str, term: str) -> Dict[str, Any]:
+    try:
+        obj = json.loads(content)
+    except Exception:
+        raise RuntimeError(f"LLM did not return valid JSON: {content[:500]}")
+
+    # minimal normalization
+    obj.setdefault("kr", term)
+    obj.setdefault("category", "AI")
+    obj.setdefault("oneLine", "")
+    obj.setdefault("example", "")
+    obj.setdefault("kpi", [])
+    obj.setdefault("confusions", [])
+    return obj
+
+
+# ---- shared async client -----------------------------------------------
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared keep-alive pool sized to the fill concurrency."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(max_connections=LLM_CONCURRENCY, max_keepalive_connections=LLM_CONCURRENCY),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), 30.0)
+        except ValueError:
+            pass
+    # exponential with full jitter: 0.5s, 1s, 2s ... capped at 8s
+    return random.uniform(0, min(8.0, 0.5 * (2 ** attempt)))
+
+
+async def _apost(url: str, headers: Dict[str, str], body: Dict[str, Any],
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """POST with retry/backoff on transport errors, 429 and 5xx. `timeout` overrides
+    LLM_TIMEOUT per attempt."""
+    client = get_async_client()
+    attempt = 0
+    while True:
+        try:
+            if timeout is None:
+                r = await client.post(url, headers=headers, json=body)
+            else:
+                r = await client.post(url, headers=headers, json=body, timeout=timeout)
+            if r.status_code in RETRY_STATUS and attempt < LLM_MAX_RETRIES:
+                await asyncio.sleep(_backoff(attempt, r.headers.get("retry-after")))
+                attempt += 1
+                continue
+            r.raise_for_status()
+            return r.json()
+        except httpx.TransportError:
+            if attempt >= LLM_MAX_RETRIES:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+
+
+def _cached_many(terms: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Cached drafts for `terms` (None where missing). Blocking: call via asyncio.to_thread."""
+    if cache is None:
+        return [None] * len(terms)
+    out: List[Optional[Dict[str, Any]]] = []
+    for term in terms:
+        _, _, body = _request(build_prompt(term))
+        content = cache.get(_cache_key(body))
+        out.append(None if content is None else _parse(content, term))
+    return out
+
+
+async def allm_generate(term: str) -> Dict[str, Any]:
+    """Draft one term over the shared client (cache first; cache reads/writes run in a thread)."""
+    url, headers, body = _request(build_prompt(term))
+    key = _cache_key(body)
+    cached = await asyncio.to_thread(cache.get, key) if cache else None
+    if cached is not None:
+        return _parse(cached, term)
+
+    started = time.perf_counter()
+    data = await _apost(url, headers, body)
+    _record("single", 1, data, time.perf_counter() - started)
+    content = _content(data)
+    obj = _parse(content, term)
+    await asyncio.to_thread(_remember, key, content, data, started)
+    return obj
+
+
+def valid_item(obj: Any, term: str) -> bool:
+    """Schema check for one element of a batch answer."""
+    if not isinstance(obj, dict):
+        return False
+    if loose_key(str(obj.get("kr") or "")) != loose_key(term):
+        return False
+    for k in ("en", "category", "oneLine", "example"):
+        if k in obj and not isinstance(obj[k], str):
+            return False
+    for k in ("kpi", "confusions"):
+        if k in obj and not isinstance(obj[k], (list, str)):
+            return False
+    return bool((obj.get("oneLine") or "").strip())
+
+
+def batch_timeout(terms: int) -> float:
+    """Seconds one batch may take including retries (LLM_BATCH_TIMEOUT, else scaled per term)."""
+    return LLM_BATCH_TIMEOUT or LLM_ROW_TIMEOUT * terms
+
+
+def batch_size() -> int:
+    """Terms per request so the expected answer stays within ~80% of LLM_MAX_TOKENS."""
+    return max(1, min(LLM_BATCH_MAX, int(LLM_MAX_TOKENS * 0.8 / _tokens_per_term)))
+
+
+async def allm_generate_batch(terms: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Draft several terms in one request; elements that fail validation come back as None.
+
+    Valid elements are cached under their single-term prompt key, so later single lookups hit.
+    """
+    global _tokens_per_term
+    url, headers, body = _request(build_batch_prompt(terms))
+    body["max_tokens"] = LLM_MAX_TOKENS
+
+    started = time.perf_counter()
+    data = await _apost(url, headers, body, timeout=LLM_TIMEOUT * len(terms))
+    elapsed = time.perf_counter() - started
+    _record("batch", len(terms), data, elapsed)
+
+    usage = data.get("usage") or {}
+    if usage.get("completion_tokens"):
+        # exponential moving average of tokens per drafted term
+        _tokens_per_term = 0.7 * _tokens_per_term + 0.3 * (usage["completion_tokens"] / len(terms))
+
+    out: List[Optional[Dict[str, Any]]] = [None] * len(terms)
+    try:
+        if data["choices"][0].get("finish_reason") == "length":
+            # truncated answer: shrink future batches and retry these one by one
+            _tokens_per_term *= 1.5
+            raise ValueError("truncated")
+        parsed = json.loads(_content(data))
+        items = parsed.get("items") if isinstance(parsed, dict) else parsed
+        if not isinstance(items, list):
+            raise ValueError("no items array")
+    except Exception:
+        path_stats["batch"]["failedTerms"] += len(terms)
+        return out
+
+    by_key = {loose_key(str(it.get("kr") or "")): it for it in items if isinstance(it, dict)}
+    per_term_tokens = int(usage.get("total_tokens") or 0) // len(terms)
+    entries: List[Tuple[str, str]] = []
+    for i, term in enumerate(terms):
+        obj = by_key.get(loose_key(term))
+        if obj is None and i < len(items):
+            obj = items[i]
+        if not valid_item(obj, term):
+            path_stats["batch"]["failedTerms"] += 1
+            continue
+        obj = _parse(json.dumps(obj, ensure_ascii=False), term)
+        out[i] = obj
+        if cache is not None:
+            _, _, single_body = _request(build_prompt(term))
+            entries.append((_cache_key(single_body), json.dumps(obj, ensure_ascii=False)))
+
+    def remember_all():
+        for key, content in entries:
+            cache.put(key, content, latency_ms=elapsed * 1000.0 / len(terms), tokens=per_term_tokens)
+
+    if entries:
+        await asyncio.to_thread(remember_all)  # one thread hop for the whole batch
+    return out
+
+
+def path_summary() -> Dict[str, Any]:
+    """Per-term tokens and wall time for the single and batch paths."""
+    out: Dict[str, Any] = {"batchSize": batch_size(), "tokensPerTermEstimate": round(_tokens_per_term, 1)}
+    for path, st in path_stats.items():
+        terms = st["terms"] or 1
+        out[path] = {**st, "tokensPerTerm": round(st["tokens"] / terms, 1), "secondsPerTerm": round(st["seconds"] / terms, 4)}
+    return out
+
+
+async def generate_many(terms: List[str], concurrency: int = LLM_CONCURRENCY) -> List[Union[Dict[str, Any], Exception]]:
+    """Generate drafts for `terms` with at most `concurrency` requests in flight.
+
+    Uncached terms are sent in batches (LLM_BATCH_MAX > 1); batch elements that fail
+    validation are retried one by one. Results are returned in input order; a failed or
+    timed-out term yields its exception.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    results: List[Any] = [None] * len(terms)
+
+    async def single(i: int):
+        async with sem:
+            try:
+                results[i] = await asyncio.wait_for(allm_generate(terms[i]), timeout=LLM_ROW_TIMEOUT)
+            except asyncio.TimeoutError:
+                results[i] = RuntimeError(f"LLM timed out after {LLM_ROW_TIMEOUT:.0f}s")
+            except Exception as e:
+                results[i] = e
+
+    if LLM_BATCH_MAX <= 1:
+        await asyncio.gather(*(single(i) for i in range(len(terms))))
+        return results
+
+    pending: List[int] = []
+    for i, hit in enumerate(await asyncio.to_thread(_cached_many, terms)):
+        if hit is None:
+            pending.append(i)
+        else:
+            results[i] = hit
+
+    async def batch(idxs: List[int]):
+        async with sem:
+            try:
+                objs = await asyncio.wait_for(allm_generate_batch([terms[i] for i in idxs]),
+                                              timeout=batch_timeout(len(idxs)))
+            except Exception:
+                objs = [None] * len(idxs)
+        for i, obj in zip(idxs, objs):
+            results[i] = obj
+        await asyncio.gather(*(single(i) for i, obj in zip(idxs, objs) if obj is None))
+
+    size = batch_size()
+    if size <= 1:
+        await asyncio.gather(*(single(i) for i in pending))
+    else:
+        await asyncio.gather(*(batch(pending[k:k + size]) for k in range(0, len(pending), size)))
+    return results
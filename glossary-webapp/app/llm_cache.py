@@ -0,0 +1,121 @@
+"""Disk-backed LLM response cache (SQLite).
+
+Keyed by sha256 of (mode, endpoint, deployment, temperature, prompt). Entries expire after
+`ttl` seconds; when the stored content exceeds `max_bytes` the least recently used rows go
+first. Each row remembers the latency and token usage of the original call, so hits can be
+reported as saved time/spend.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class LLMCache:
+    def __init__(self, path: Path, ttl: float, max_bytes: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.saved_tokens = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL,"
+                " latency_ms REAL NOT NULL DEFAULT 0, tokens INTEGER NOT NULL DEFAULT 0)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed)")
+            self._bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT content, created, latency_ms, tokens, size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            content, created, latency_ms, tokens, size = row
+            if self.ttl and created + self.ttl < now:
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._bytes -= size
+                self.misses += 1
+                return None
+            db.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.saved_ms += latency_ms
+            self.saved_tokens += tokens
+            return content
+
+    def put(self, key: str, content: str, latency_ms: float = 0.0, tokens: int = 0):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            db = self._conn()
+            old = db.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, size, created, accessed, latency_ms, tokens)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, content, size, now, now, latency_ms, tokens),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        db = self._db
+        if self.ttl:
+            db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+        self._bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        # drop least recently used until 90% of the budget, so eviction doesn't run on every put
+        target = int(self.max_bytes * 0.9)
+        if self._bytes <= target:
+            return
+        freed = 0
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM llm_cache ORDER BY accessed"):
+            doomed.append((key,))
+            freed += size
+            if self._bytes - freed <= target:
+                break
+        db.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        self._bytes -= freed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "savedSeconds": round(self.saved_ms / 1000.0, 3),
+                "savedTokens": self.saved_tokens,
+            }
@@ -1,69 +1,94 @@
+import asyncio
+import hashlib
 import json
 import os
-import re
-from io import BytesIO
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
 from fastapi import Body, FastAPI, File, Form, Request, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment, Font
+
+from app import llm, semantic
+from app.assets import IMMUTABLE, StaticAssets, compress_variants, pick_variant
+from app.config import BASE_DIR, BLOCKING_THREADS, LLM_MODE
+from app.exporter import (
+    XLSX_MEDIA_TYPE,
+    VersionedExport,
+    build_xlsx,
+    iter_csv,
+    iter_jsonl,
+    iter_parquet,
+    parquet_available,
+    parse_since,
+    select_items,
+)
+from app.fuzzy import FuzzyIndex, norm_key
+from app.graph import RelatedGraph
+from app.importer import run_import_job, split_list
+from app.jobs import JobQueue
+from app.llm import allm_generate, close_async_client
+from app.store import GlossaryStore, utc_now
 
 ALLOWED_CATEGORIES = ["전략", "데이터", "AI", "자동화", "운영", "보안", "성과"]
 
-BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_PATH = BASE_DIR / "data" / "glossary.json"
+LOG_PATH = BASE_DIR / "data" / "glossary.log.jsonl"
 DRAFTS_PATH = BASE_DIR / "data" / "drafts.json"
+JOBS_DIR = BASE_DIR / "data" / "jobs"
 
 
-def load_env_file():
-    env_path = BASE_DIR / ".env"
-    if not env_path.exists():
-        return
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        k, v = line.split("=", 1)
-        os.environ.setdefault(k.strip(), v.strip())
-
-
-load_env_file()
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Handlers are async; anything that can block (disk writes, full scans, workbook builds)
+    # goes through asyncio.to_thread, i.e. this bounded pool.
+    executor = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix="glossary-blocking")
+    asyncio.get_running_loop().set_default_executor(executor)
+    await asyncio.to_thread(store.items)  # load now: listeners (related graph) fill on load
+    await jobs.start()
+    yield
+    await jobs.stop()
+    await close_async_client()
+    executor.shutdown(wait=False)
 
-LLM_MODE = os.environ.get("LLM_MODE", "off").strip()  # off|azure_openai|hchat
-LLM_ENDPOINT = os.environ.get("LLM_ENDPOINT", "").strip()
-LLM_API_KEY = os.environ.get("LLM_API_KEY", "").strip()
-LLM_API_KEY_HEADER = os.environ.get("LLM_API_KEY_HEADER", "api-key").strip()
-LLM_DEPLOYMENT = os.environ.get("LLM_DEPLOYMENT", "").strip()
-LLM_API_VERSION = os.environ.get("LLM_API_VERSION", "2024-02-15-preview").strip()
 
-app = FastAPI(title="Glossary WebApp")
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
+app = FastAPI(title="Glossary WebApp", lifespan=lifespan)
+assets = StaticAssets(BASE_DIR / "static")
 
+# templates are loaded once and never re-stat'ed; restart to pick up template edits
 tpl_env = Environment(
     loader=FileSystemLoader(str(BASE_DIR / "templates")),
     autoescape=select_autoescape(["html", "xml"]),
+    auto_reload=False,
 )
-
-
-def _norm(s: str) -> str:
-    s = (s or "").strip().lower()
-    s = re.sub(r"\s+", " ", s)
-    return s
+tpl_env.globals["static_url"] = assets.url
+tpl_env.policies["json.dumps_kwargs"] = {"ensure_ascii": False}  # |tojson still escapes <>&'
+
+
+store = GlossaryStore(DATA_PATH, LOG_PATH, compact_every=int(os.environ.get("GLOSSARY_COMPACT_EVERY", "200")))
+jobs = JobQueue(JOBS_DIR, lambda job, checkpoint: run_import_job(store, job, checkpoint),
+                workers=int(os.environ.get("IMPORT_WORKERS", "2")))
+xlsx_export = VersionedExport(build_xlsx, "xlsx")
+graph = RelatedGraph()
+store.add_listener(graph)
+fuzzy_index = FuzzyIndex()
+store.add_listener(fuzzy_index)
+
+# optional semantic ranking (needs numpy); blended into /api/search
+SEMANTIC_SEARCH = os.environ.get("SEMANTIC_SEARCH", "off").strip().lower() in ("1", "true", "on", "yes")
+SEMANTIC_TOP_K = int(os.environ.get("SEMANTIC_TOP_K", "20"))
+SEMANTIC_MIN_SCORE = float(os.environ.get("SEMANTIC_MIN_SCORE", "0.2"))
+semantic_index = None
+if SEMANTIC_SEARCH and semantic.available():
+    semantic_index = semantic.SemanticIndex(BASE_DIR / "data" / "semantic.f32",
+                                            dim=int(os.environ.get("SEMANTIC_DIM", "512")))
+    store.add_listener(semantic_index)
 
 
 def load_glossary() -> List[Dict[str, Any]]:
-    if not DATA_PATH.exists():
-        return []
-    return json.loads(DATA_PATH.read_text(encoding="utf-8"))
-
-
-def save_glossary(items: List[Dict[str, Any]]):
-    DATA_PATH.write_text(json.dumps(items, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return store.items()
 
 
 def load_drafts() -> List[Dict[str, Any]]:
@@ -78,30 +103,53 @@ def save_drafts(items: List[Dict[str, Any]]):
     DRAFTS_PATH.write_text(json.dumps(items, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
 
+async def fresh_store():
+    """Apply other workers' writes in a thread if there are any, so inline lookups below
+    (dict hits, graph walks) never replay a log on the event loop."""
+    if store.stale():
+        await asyncio.to_thread(store.items)
+
+
 def find_term(term: str) -> Optional[Dict[str, Any]]:
-    t = _norm(term)
-    for item in load_glossary():
-        if _norm(item.get("kr", "")) == t or _norm(item.get("en", "")) == t:
-            return {**item, "source": item.get("createdBy", "glossary")}
-    return None
+    # identity match only ("C" != "C++"); spacing/punctuation variants are find_similar's job
+    item = store.find(term)
+    if item is None:
+        return None
+    return {**item, "source": item.get("createdBy", "glossary")}
 
 
-def search_terms(q: str, category: str = "") -> List[Dict[str, Any]]:
-    qn = _norm(q)
-    catn = _norm(category)
+def find_similar(term: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Near-duplicates of `term` (typos, jamo-level edits), closest first."""
+    store.items()  # catch up with other workers' puts: the index follows the store's view
     out: List[Dict[str, Any]] = []
+    for dist, item in fuzzy_index.similar(term, limit=limit):
+        out.append({
+            "kr": item.get("kr"),
+            "en": item.get("en"),
+            "category": item.get("category"),
+            "oneLine": item.get("oneLine"),
+            "source": item.get("createdBy", "glossary"),
+            "distance": dist,
+        })
+    return out
 
-    if not qn and not catn:
-        return out
 
-    # Search across glossary (all items are "confirmed" by default).
-    items = load_glossary()
+_search_lock = threading.Lock()
+_search_cache: Dict[str, List[Any]] = {"items": [], "keys": []}
 
-    for item in items:
-        if catn and _norm(item.get("category", "")) != catn:
-            continue
 
-        if qn:
+def _search_keys(items: List[Dict[str, Any]]) -> List[Any]:
+    """Normalized (category, haystack) per item, aligned with `items`.
+
+    Puts replace item dicts, so an entry is recomputed only when the object at its index
+    changed; a search after one edit re-normalizes one item, not the whole glossary.
+    """
+    with _search_lock:
+        cached, keys = _search_cache["items"], _search_cache["keys"]
+        del cached[len(items):], keys[len(items):]
+        for idx, item in enumerate(items):
+            if idx < len(cached) and cached[idx] is item:
+                continue
             hay = " ".join([
                 item.get("kr", ""),
                 item.get("en", ""),
@@ -109,8 +157,33 @@ def search_terms(q: str, category: str = "") -> List[Dict[str, Any]]:
                 item.get("oneLine", ""),
                 " ".join(item.get("kpi", []) or []),
             ])
-            if qn not in _norm(hay):
-                continue
+            key = (norm_key(item.get("category", "")), norm_key(hay))
+            if idx < len(cached):
+                cached[idx], keys[idx] = item, key
+            else:
+                cached.append(item)
+                keys.append(key)
+        return list(keys)
+
+
+def search_terms(q: str, category: str = "") -> List[Dict[str, Any]]:
+    qn = norm_key(q)
+    catn = norm_key(category)
+    out: List[Dict[str, Any]] = []
+
+    if not qn and not catn:
+        return out
+
+    # Search across glossary (all items are "confirmed" by default).
+    items = store.export()
+    keys = _search_keys(items)
+
+    for item, (item_cat, hay) in zip(items, keys):
+        if catn and item_cat != catn:
+            continue
+
+        if qn and qn not in hay:
+            continue
 
         out.append({
             "kr": item.get("kr"),
@@ -119,227 +192,358 @@ def search_terms(q: str, category: str = "") -> List[Dict[str, Any]]:
             "oneLine": item.get("oneLine"),
             "source": item.get("createdBy", "glossary"),
         })
+        if len(out) >= 200:
+            break
 
-    return out[:200]
-
-
-def build_prompt(term: str) -> str:
-    return (
-        "당신은 제조(스마트팩토리/품질/설비) 맥락의 AI/DX 용어집 작성자입니다.\n"
-        "아래 용어에 대해 '초안'을 작성하세요.\n\n"
-        f"용어: {term}\n\n"
-        "출력은 반드시 JSON만 반환하세요. 추가 텍스트 금지.\n"
-        "스키마:\n"
-        "{\n"
-        "  \"kr\": \"\",\n"
-        "  \"en\": \"\",\n"
-        "  \"category\": \"전략|데이터|AI|자동화|운영|보안|성과\",\n"
-        "  \"oneLine\": \"1~2문장\",\n"
-        "  \"example\": \"제조 현장 예시 1개\",\n"
-        "  \"kpi\": [\"OEE\",\"불량률\",\"리드타임\",\"OTD\",\"원가\",\"에너지\"],\n"
-        "  \"confusions\": [\"유사 용어 1~3개\"]\n"
-        "}\n"
-    )
-
-
-def _split_list(s: Any) -> List[str]:
-    if s is None:
-        return []
-    if isinstance(s, list):
-        return [str(x).strip() for x in s if str(x).strip()]
-    s2 = str(s).strip()
-    if not s2:
-        return []
-    # allow comma or newline separated
-    parts = re.split(r"[\n,]+", s2)
-    return [p.strip() for p in parts if p.strip()]
+    if qn and semantic_index is not None:
+        out = blend_semantic(out, q, catn)
+    return out
 
 
-def _merge_keep_existing(dst: Dict[str, Any], src: Dict[str, Any]):
-    """Fill only missing/empty fields in dst from src."""
-    for k, v in src.items():
-        if v is None:
+def blend_semantic(lexical: List[Dict[str, Any]], q: str, catn: str) -> List[Dict[str, Any]]:
+    """Lexical hits score 1 and semantic top-k hits add their cosine (< 1), so terms found both
+    ways come first, then the remaining substring hits in glossary order, then terms only the
+    embedding found (above SEMANTIC_MIN_SCORE)."""
+    scored: Dict[str, Dict[str, Any]] = {}
+    for r in lexical:
+        scored[norm_key(r["kr"] or "")] = {**r, "score": 1.0, "match": "lexical"}
+    for sim, item in semantic_index.search(q, k=SEMANTIC_TOP_K, min_score=SEMANTIC_MIN_SCORE):
+        if catn and norm_key(item.get("category", "")) != catn:
             continue
-        if isinstance(v, str):
-            if not v.strip():
-                continue
-        if isinstance(v, list):
-            if len(v) == 0:
-                continue
-
-        cur = dst.get(k)
-        if cur is None:
-            dst[k] = v
-            continue
-        if isinstance(cur, str) and not cur.strip():
-            dst[k] = v
-            continue
-        if isinstance(cur, list) and len(cur) == 0:
-            dst[k] = v
-            continue
-
+        key = norm_key(item.get("kr", ""))
+        hit = scored.get(key)
+        if hit is not None:
+            hit["score"] += sim
+            hit["match"] = "both"
+        else:
+            scored[key] = {
+                "kr": item.get("kr"),
+                "en": item.get("en"),
+                "category": item.get("category"),
+                "oneLine": item.get("oneLine"),
+                "source": item.get("createdBy", "glossary"),
+                "score": sim,
+                "match": "semantic",
+            }
+    out = sorted(scored.values(), key=lambda r: -r["score"])  # stable: ties keep lexical order
+    for r in out:
+        r["score"] = round(r["score"], 4)
+    return out[:200]
 
-def llm_generate(term: str) -> Dict[str, Any]:
-    if LLM_MODE == "off":
-        raise RuntimeError("LLM is disabled (LLM_MODE=off)")
-    if not LLM_ENDPOINT or not LLM_API_KEY:
-        raise RuntimeError("Missing LLM_ENDPOINT or LLM_API_KEY")
 
-    prompt = build_prompt(term)
+def list_categories() -> List[str]:
+    # fixed list for UI consistency, but include any extra categories found in data
+    cats = set(ALLOWED_CATEGORIES)
+    for it in load_glossary():
+        c = (it.get("category") or "").strip()
+        if c:
+            cats.add(c)
+    ordered = [c for c in ALLOWED_CATEGORIES if c in cats]
+    extras = sorted([c for c in cats if c not in ordered])
+    return ordered + extras
 
-    # We support two generic modes:
-    # - azure_openai: endpoint like https://{resource}.openai.azure.com
-    # - hchat: custom endpoint that accepts OpenAI-compatible /chat/completions (best effort)
 
-    headers = {LLM_API_KEY_HEADER: LLM_API_KEY}
+HOME_INLINE_TERMS = int(os.environ.get("HOME_INLINE_TERMS", "2000"))  # max terms embedded in the page
 
-    if LLM_MODE == "azure_openai":
-        if not LLM_DEPLOYMENT:
-            raise RuntimeError("Missing LLM_DEPLOYMENT for azure_openai")
-        url = f"{LLM_ENDPOINT.rstrip('/')}/openai/deployments/{LLM_DEPLOYMENT}/chat/completions?api-version={LLM_API_VERSION}"
-    else:
-        # assume endpoint is full URL to /chat/completions
-        url = LLM_ENDPOINT
+# the page depends on the glossary (store tag), the template and the asset URLs it links; the
+# last two only change with a deploy, and hashing them keeps ETags identical across workers
+_PAGE_BUILD = hashlib.sha256(
+    (BASE_DIR / "templates" / "index.html").read_bytes() + assets.digest.encode("utf-8")
+).hexdigest()[:10]
+_home_lock = threading.Lock()
+_home_cache: Dict[bool, Dict[str, Any]] = {}
 
-    body = {
-        "messages": [
-            {"role": "system", "content": "Return only JSON."},
-            {"role": "user", "content": prompt},
-        ],
-        "temperature": 0.2,
-    }
 
-    with httpx.Client(timeout=30.0) as client:
-        r = client.post(url, headers=headers, json=body)
-        r.raise_for_status()
-        data = r.json()
+def first_page_payload() -> Dict[str, Any]:
+    """Data embedded in the home page: categories plus a compact term list
+    ([kr, en, category, oneLine, kpi joined]) the first search can run against locally."""
+    items = store.export()
+    terms = [
+        [it.get("kr", ""), it.get("en", ""), it.get("category", ""), it.get("oneLine", ""),
+         " ".join(it.get("kpi", []) or [])]
+        for it in items[:HOME_INLINE_TERMS]
+    ]
+    # with semantic ranking on, even the first search should go to the server
+    complete = len(items) <= HOME_INLINE_TERMS and semantic_index is None
+    return {"categories": list_categories(), "terms": terms if complete else [], "complete": complete}
+
+
+def render_home() -> Dict[str, Any]:
+    """Rendered page (plain + precompressed) for the current llm_enabled state and store tag;
+    re-rendered only after an edit."""
+    llm_enabled = LLM_MODE != "off"
+    with _home_lock:
+        page = _home_cache.get(llm_enabled)
+        tag = store.tag
+        if page is None or page["tag"] != tag:
+            html = tpl_env.get_template("index.html").render(
+                llm_enabled=llm_enabled, initial=first_page_payload()
+            ).encode("utf-8")
+            page = {
+                "tag": tag,
+                "body": html,
+                "variants": compress_variants(html),
+                "etag": f'"home-{_PAGE_BUILD}-{int(llm_enabled)}-{tag}"',
+            }
+            _home_cache[llm_enabled] = page
+        return page
+
+
+def _negotiated(request: Request, body: bytes, variants: Dict[str, bytes], media_type: str,
+                headers: Dict[str, str]) -> Response:
+    """Pick the precompressed variant the client accepts (or 304 on a matching ETag)."""
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    etag = headers.get("ETag", "")
+    if etag and etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    out, encoding = pick_variant(request.headers.get("accept-encoding", ""), body, variants)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=out, media_type=media_type, headers=headers)
 
-    # best effort parsing
-    content = None
-    try:
-        content = data["choices"][0]["message"]["content"]
-    except Exception:
-        raise RuntimeError(f"Unexpected LLM response shape: {str(data)[:500]}")
 
-    try:
-        obj = json.loads(content)
-    except Exception:
-        raise RuntimeError(f"LLM did not return valid JSON: {content[:500]}")
-
-    # minimal normalization
-    obj.setdefault("kr", term)
-    obj.setdefault("category", "AI")
-    obj.setdefault("oneLine", "")
-    obj.setdefault("example", "")
-    obj.setdefault("kpi", [])
-    obj.setdefault("confusions", [])
-    return obj
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    page = await asyncio.to_thread(render_home)
+    return _negotiated(request, page["body"], page["variants"], "text/html; charset=utf-8",
+                       {"ETag": page["etag"], "Cache-Control": "no-cache"})
 
 
-@app.get("/", response_class=HTMLResponse)
-def home(request: Request):
-    tpl = tpl_env.get_template("index.html")
-    return tpl.render(llm_enabled=(LLM_MODE != "off"))
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+async def static_file(request: Request, path: str):
+    """Files from static/. Fingerprinted names (see assets.url) are cacheable forever."""
+    asset, immutable = assets.lookup(path)
+    if asset is None:
+        return JSONResponse(status_code=404, content={"error": "NOT_FOUND"})
+    headers = {"ETag": f'"{asset.digest}"', "Cache-Control": IMMUTABLE if immutable else "no-cache"}
+    return _negotiated(request, asset.data, asset.variants, asset.media_type, headers)
 
 
 @app.get("/api/categories")
-def api_categories():
-    # fixed list for UI consistency, but include any extra categories found in data
-    cats = set(ALLOWED_CATEGORIES)
-    for it in load_glossary():
-        c = (it.get("category") or "").strip()
-        if c:
-            cats.add(c)
-    ordered = [c for c in ALLOWED_CATEGORIES if c in cats]
-    extras = sorted([c for c in cats if c not in ordered])
-    return {"categories": ordered + extras}
+async def api_categories():
+    return {"categories": await asyncio.to_thread(list_categories)}
 
 
 @app.get("/api/search")
-def api_search(q: str = "", category: str = ""):
-    return {"results": search_terms(q, category=category)}
+async def api_search(q: str = "", category: str = ""):
+    # full scan: off the event loop. JSONResponse skips FastAPI's jsonable_encoder, which for
+    # async handlers runs on the loop and costs more than the search itself.
+    results = await asyncio.to_thread(search_terms, q, category=category)
+    return JSONResponse(content={"results": results})
 
 
 @app.get("/api/term")
-def api_term(term: str = ""):
+async def api_term(term: str = ""):
+    # exact lookup is a dict hit, cheaper inline than a thread hop
+    await fresh_store()
     item = find_term(term)
     if not item:
-        return JSONResponse(status_code=404, content={"error": "NOT_FOUND"})
+        suggestions = await asyncio.to_thread(find_similar, term)
+        return JSONResponse(status_code=404, content={"error": "NOT_FOUND", "suggestions": suggestions})
     return item
 
 
+@app.get("/api/related")
+async def api_related(term: str = "", k: int = 1, limit: int = 50):
+    """Terms and KPIs within `k` hops (1-3) via confusions and shared KPIs; O(degree) per hop."""
+    await fresh_store()
+    related = graph.related(term, k=min(max(k, 1), 3), limit=min(max(limit, 1), 200))
+    if related is None:
+        return JSONResponse(status_code=404, content={"error": "NOT_FOUND"})
+    return {"term": term, "related": related}
+
+
+@app.get("/api/kpi/{kpi}")
+async def api_kpi(kpi: str):
+    """Terms that list `kpi` (reverse index)."""
+    await fresh_store()
+    found = graph.kpi_terms(kpi)
+    if found is None:
+        return JSONResponse(status_code=404, content={"error": "NOT_FOUND"})
+    label, terms = found
+    return {"kpi": label, "terms": terms}
+
+
+def llm_stats() -> Dict[str, Any]:
+    return {"cache": llm.cache.stats() if llm.cache is not None else "off", "paths": llm.path_summary()}
+
+
+@app.get("/api/llm/stats")
+async def api_llm_stats():
+    """LLM cache hit rate and saved latency/tokens, plus per-term cost of single vs batch calls."""
+    return await asyncio.to_thread(llm_stats)
+
+
+@app.get("/api/export.json")
+async def api_export_json():
+    """Full glossary as JSON (same shape as data/glossary.json)."""
+    rev = await asyncio.to_thread(lambda: store.rev)
+    headers_out = {"Content-Disposition": 'attachment; filename="glossary.json"', "X-Glossary-Rev": str(rev)}
+    # serializing the whole glossary is the expensive part
+    return await asyncio.to_thread(JSONResponse, content=store.export(), headers=headers_out)
+
+
 @app.get("/api/export.xlsx")
-def api_export_xlsx():
-    """Export the current glossary (and drafts) to an .xlsx file.
+async def api_export_xlsx(request: Request):
+    """Export the current glossary to an .xlsx file.
 
-    This is intentionally server-side so end users can download via GUI.
+    This is intentionally server-side so end users can download via GUI. The workbook is
+    rebuilt only after an edit; unchanged re-downloads get 304 via If-None-Match.
     """
+    data, etag = await asyncio.to_thread(xlsx_export.get, store)
+    headers_out = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # revalidate every time, the ETag makes that cheap
+        "Content-Disposition": 'attachment; filename="AI_DX_Glossary_Manufacturing.xlsx"',
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers_out)
+    return Response(content=data, media_type=XLSX_MEDIA_TYPE, headers=headers_out)
+
+
+def _export_stream(chunks, media_type: str, filename: str, snapshot_at: str, rev: int):
+    headers_out = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        # pass this back as modifiedSince for the next incremental sync
+        "X-Snapshot-At": snapshot_at,
+        # ...or this as /api/changes?since=
+        "X-Glossary-Rev": str(rev),
+    }
+    return StreamingResponse(chunks, media_type=media_type, headers=headers_out)
 
-    items = load_glossary()
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Glossary"
-
-    headers = [
-        "용어(KR)",
-        "약어/EN",
-        "분류",
-        "한줄 정의",
-        "예시",
-        "KPI",
-        "혼동되는 용어",
-        "출처",
-    ]
-    ws.append(headers)
-
-    bold = Font(bold=True)
-    for cell in ws[1]:
-        cell.font = bold
-        cell.alignment = Alignment(vertical="top", wrap_text=True)
-
-    for it in items:
-        src = it.get("createdBy", "USER")
-        ws.append(
-            [
-                it.get("kr", ""),
-                it.get("en", ""),
-                it.get("category", ""),
-                it.get("oneLine", ""),
-                it.get("example", ""),
-                ", ".join(it.get("kpi") or []),
-                ", ".join(it.get("confusions") or []),
-                src,
-            ]
-        )
-
-    # Simple readability formatting
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=len(headers)):
-        for cell in row:
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-
-    # column widths (rough)
-    widths = [22, 22, 12, 70, 60, 25, 30, 10]
-    for i, w in enumerate(widths, start=1):
-        ws.column_dimensions[chr(64 + i)].width = w
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-
-    filename = "AI_DX_Glossary_Manufacturing.xlsx"
-    headers_out = {"Content-Disposition": f"attachment; filename=\"{filename}\""}
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers_out,
-    )
-
-
-@app.post("/api/upload.xlsx")
+
+def _export_selection(category: str, modifiedSince: str):
+    """(snapshot time, rev, filtered item iterator) or a 400 response for a bad modifiedSince."""
+    since = None
+    if modifiedSince:
+        try:
+            since = parse_since(modifiedSince)
+        except ValueError:
+            return None, None, JSONResponse(status_code=400, content={"error": "BAD_MODIFIED_SINCE"})
+    # time and rev before the copy: a put racing the export is at worst sent again next sync
+    snapshot_at, rev = utc_now(), store.rev
+    return snapshot_at, rev, select_items(store.export(), split_list(category), since)
+
+
+async def export_selection(category: str, modifiedSince: str):
+    """_export_selection in a thread: catching up with other workers and copying the glossary
+    are both O(n) and must not run on the event loop."""
+    return await asyncio.to_thread(_export_selection, category, modifiedSince)
+
+
+@app.get("/api/export.csv")
+async def api_export_csv(category: str = "", modifiedSince: str = ""):
+    """Glossary as CSV, streamed. Filters: `category` (comma separated), `modifiedSince`
+    (ISO 8601 or epoch seconds, compared with each item's `updatedAt`)."""
+    snapshot_at, rev, selected = await export_selection(category, modifiedSince)
+    if snapshot_at is None:
+        return selected
+    return _export_stream(iter_csv(selected), "text/csv; charset=utf-8", "glossary.csv", snapshot_at, rev)
+
+
+@app.get("/api/export.jsonl")
+async def api_export_jsonl(category: str = "", modifiedSince: str = ""):
+    """Glossary as JSON Lines (one item per line, same fields as export.json), streamed."""
+    snapshot_at, rev, selected = await export_selection(category, modifiedSince)
+    if snapshot_at is None:
+        return selected
+    return _export_stream(iter_jsonl(selected), "application/x-ndjson", "glossary.jsonl", snapshot_at, rev)
+
+
+@app.get("/api/export.parquet")
+async def api_export_parquet(category: str = "", modifiedSince: str = ""):
+    """Glossary as Parquet (one row group per chunk), streamed. Needs pyarrow installed."""
+    if not parquet_available():
+        return JSONResponse(status_code=501, content={"error": "PARQUET_UNAVAILABLE"})
+    snapshot_at, rev, selected = await export_selection(category, modifiedSince)
+    if snapshot_at is None:
+        return selected
+    return _export_stream(iter_parquet(selected), "application/vnd.apache.parquet", "glossary.parquet", snapshot_at, rev)
+
+
+CHANGES_LIMIT = int(os.environ.get("CHANGES_LIMIT", "1000"))  # max items per response / event
+CHANGES_POLL_SECONDS = float(os.environ.get("CHANGES_POLL_SECONDS", "0.5"))
+CHANGES_STREAM_SECONDS = float(os.environ.get("CHANGES_STREAM_SECONDS", "300"))
+
+
+def changes_payload(since: Optional[int], limit: int) -> Dict[str, Any]:
+    head = store.rev
+    if since is None or since < 0 or since > head:
+        # new client, or a rev from other data (restored backup, reset counter): start over
+        return {"reset": True, "rev": head, "items": store.export(), "more": False}
+    items, rev, more = store.changes_since(since, limit)
+    return {"reset": False, "rev": rev, "items": items, "more": more}
+
+
+@app.get("/api/changes")
+async def api_changes(since: Optional[int] = None, limit: int = CHANGES_LIMIT):
+    """Items saved after rev `since`, oldest first, each once at its latest version.
+
+    Pass the returned `rev` back as `since` (right away while `more` is true). Without `since`,
+    or with a rev this glossary never had, returns everything with `reset: true`. Rev 0 is the
+    seed data no one has edited through the app.
+    """
+    limit = min(max(limit, 1), CHANGES_LIMIT)
+    return await asyncio.to_thread(lambda: JSONResponse(content=changes_payload(since, limit)))
+
+
+def _changes_event(since: Optional[int]) -> Tuple[str, int, bool]:
+    """(SSE frame or "" if nothing changed, next rev, more pending)."""
+    payload = changes_payload(since, CHANGES_LIMIT)
+    if not payload["items"] and not payload["reset"]:
+        return "", payload["rev"], payload["more"]
+    event = "reset" if payload["reset"] else "changes"
+    data = json.dumps(payload, ensure_ascii=False)
+    return f"id: {payload['rev']}\nevent: {event}\ndata: {data}\n\n", payload["rev"], payload["more"]
+
+
+@app.get("/api/changes/stream")
+async def api_changes_stream(request: Request, since: Optional[int] = None):
+    """Live changes as server-sent events, same payload as /api/changes.
+
+    Starts after `since` (or the `Last-Event-ID` an EventSource sends when it reconnects), or
+    at the current rev if neither is given; `since=-1` starts with a full `reset` event. Other
+    workers' saves are noticed by polling the shared rev counter, which costs one pread per
+    `CHANGES_POLL_SECONDS`. Streams end after `CHANGES_STREAM_SECONDS`; EventSource reconnects
+    and resumes from the last id.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    if last_id.isdigit():
+        since = int(last_id)
+    if since is None:
+        since = await asyncio.to_thread(lambda: store.rev)
+
+    async def events():
+        rev = since
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CHANGES_STREAM_SECONDS
+        quiet_since = loop.time()
+        seen = None
+        yield "retry: 1000\n\n"
+        while loop.time() < deadline and not await request.is_disconnected():
+            hint = store.rev_hint()
+            if hint != seen:
+                seen = hint
+                more = True
+                while more:
+                    frame, rev, more = await asyncio.to_thread(_changes_event, rev)
+                    if frame:
+                        quiet_since = loop.time()
+                        yield frame
+            elif loop.time() - quiet_since > 15:
+                quiet_since = loop.time()
+                yield ": keepalive\n\n"  # keeps proxies from timing the stream out
+            await asyncio.sleep(CHANGES_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/api/upload.xlsx", status_code=202)
 async def api_upload_xlsx(file: UploadFile = File(...), fillMissing: str = Form("on")):
     """Bulk upload terms from an Excel file.
 
+    - The file is queued as a background job; poll `GET /api/jobs/{jobId}` for progress.
     - Missing columns can be auto-filled by LLM (if enabled).
     - Uploaded rows are merged into glossary.json (the "OK" dataset).
 
@@ -351,113 +555,43 @@ async def api_upload_xlsx(file: UploadFile = File(...), fillMissing: str = Form(
     if not file.filename or not file.filename.lower().endswith(".xlsx"):
         return JSONResponse(status_code=400, content={"error": "XLSX_ONLY"})
 
-    content = await file.read()
-    wb = load_workbook(filename=BytesIO(content))
-    ws = wb.active
-
-    # Build header map
-    header_row = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-    header_row = [str(x).strip() if x is not None else "" for x in header_row]
-
-    col_map: Dict[str, int] = {}
-    aliases = {
-        "kr": ["용어(KR)", "용어", "KR", "kr"],
-        "en": ["약어/EN", "EN", "en", "약어"],
-        "category": ["분류", "category"],
-        "oneLine": ["한줄 정의", "정의", "oneLine"],
-        "example": ["예시", "example"],
-        "kpi": ["KPI", "kpi"],
-        "confusions": ["혼동되는 용어", "confusions"],
-    }
-
-    for i, h in enumerate(header_row):
-        hn = h.strip()
-        if not hn:
-            continue
-        for key, names in aliases.items():
-            if hn in names:
-                col_map[key] = i
-
-    if "kr" not in col_map:
-        return JSONResponse(status_code=400, content={"error": "MISSING_KR_COLUMN", "headers": header_row})
-
-    glossary = load_glossary()
-
-    def find_index(term: str) -> Optional[int]:
-        tn = _norm(term)
-        for idx, it in enumerate(glossary):
-            if _norm(it.get("kr", "")) == tn or (_norm(it.get("en", "")) and _norm(it.get("en", "")) == tn):
-                return idx
-        return None
-
-    fill = fillMissing.lower() in ("1", "true", "on", "yes")
-
-    report = {"added": 0, "updated": 0, "filledByLLM": 0, "skipped": 0, "errors": []}
-
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-        try:
-            kr = row[col_map["kr"]].value if "kr" in col_map else ""
-            kr = str(kr).strip() if kr is not None else ""
-            if not kr:
-                report["skipped"] += 1
-                continue
-
-            entry: Dict[str, Any] = {
-                "kr": kr,
-                "en": str(row[col_map["en"]].value).strip() if ("en" in col_map and row[col_map["en"]].value is not None) else "",
-                "category": str(row[col_map["category"]].value).strip() if ("category" in col_map and row[col_map["category"]].value is not None) else "",
-                "oneLine": str(row[col_map["oneLine"]].value).strip() if ("oneLine" in col_map and row[col_map["oneLine"]].value is not None) else "",
-                "example": str(row[col_map["example"]].value).strip() if ("example" in col_map and row[col_map["example"]].value is not None) else "",
-                "kpi": _split_list(row[col_map["kpi"]].value) if "kpi" in col_map else [],
-                "confusions": _split_list(row[col_map["confusions"]].value) if "confusions" in col_map else [],
-                    }
-
-            # normalize category if empty
-            if not entry.get("category"):
-                entry["category"] = "AI"
-
-            # Auto-fill missing parts by LLM (never overwrite user-provided values)
-            if fill and (LLM_MODE != "off"):
-                needs = any([
-                    not entry.get("en"),
-                    not entry.get("category"),
-                    not entry.get("oneLine"),
-                    not entry.get("example"),
-                    not entry.get("kpi"),
-                    not entry.get("confusions"),
-                ])
-                if needs:
-                    gen = llm_generate(kr)
-                    # ensure list shapes
-                    gen["kpi"] = _split_list(gen.get("kpi"))
-                    gen["confusions"] = _split_list(gen.get("confusions"))
-                    _merge_keep_existing(entry, gen)
-                    report["filledByLLM"] += 1
-
-            idx = find_index(kr)
-            if idx is None and entry.get("en"):
-                idx = find_index(entry.get("en", ""))
-
-            if idx is None:
-                glossary.append(entry)
-                report["added"] += 1
-            else:
-                # merge: keep existing values, fill missing from uploaded/LLM
-                existing = glossary[idx]
-                merged = dict(existing)
-                _merge_keep_existing(merged, entry)
-                glossary[idx] = merged
-                report["updated"] += 1
-
-        except Exception as e:
-            report["errors"].append({"row": row_idx, "error": str(e)})
-
-    save_glossary(glossary)
-    return {"ok": True, "report": report, "count": len(glossary)}
+    job_id = jobs.new_id()
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    path = JOBS_DIR / f"{job_id}.xlsx"
+    f = await asyncio.to_thread(open, path, "wb")
+    try:
+        while True:
+            chunk = await file.read(1 << 20)
+            if not chunk:
+                break
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+
+    job = await jobs.submit({
+        "id": job_id,
+        "filename": file.filename,
+        "path": str(path),
+        "fillMissing": fillMissing.lower() in ("1", "true", "on", "yes"),
+    })
+    return {"ok": True, "jobId": job_id, "job": job}
+
+
+@app.get("/api/jobs")
+async def api_jobs(limit: int = 20):
+    return {"jobs": await asyncio.to_thread(jobs.list, limit=min(max(limit, 1), 200))}
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job(job_id: str):
+    job = await asyncio.to_thread(jobs.get, job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "NOT_FOUND"})
+    return job
 
 
 @app.post("/api/save")
-def api_save(payload: Dict[str, Any] = Body(...)):
+async def api_save(payload: Dict[str, Any] = Body(...)):
     """Upsert a glossary item. User can edit freely (no approval workflow)."""
     kr = (payload.get("kr") or "").strip()
     if not kr:
@@ -469,46 +603,51 @@ def api_save(payload: Dict[str, Any] = Body(...)):
         "category": (payload.get("category") or "").strip(),
         "oneLine": (payload.get("oneLine") or "").strip(),
         "example": (payload.get("example") or "").strip(),
-        "kpi": _split_list(payload.get("kpi")),
-        "confusions": _split_list(payload.get("confusions")),
+        "kpi": split_list(payload.get("kpi")),
+        "confusions": split_list(payload.get("confusions")),
         "createdBy": (payload.get("createdBy") or "USER").strip() or "USER",
     }
     if not item["category"]:
         item["category"] = "AI"
 
-    glossary = load_glossary()
-    idx = None
-    tn = _norm(kr)
-    for i, it in enumerate(glossary):
-        if _norm(it.get("kr", "")) == tn:
-            idx = i
-            break
-
-    if idx is None:
-        glossary.append(item)
-    else:
-        glossary[idx] = item
-
-    save_glossary(glossary)
+    await asyncio.to_thread(store.put, item)  # log append, maybe compaction
     return {"ok": True, "item": find_term(kr)}
 
 
 @app.post("/api/draft")
-def api_draft(term: str = Form(...)):
-    """Generate a new term by LLM and save it immediately as confirmed."""
+async def api_draft(term: str = Form(...), force: str = Form("")):
+    """Generate a new term by LLM and save it immediately as confirmed.
+
+    Near-duplicates (typos) come back as `suggestions` next to the draft. Only a loose-exact
+    match (same name up to spacing/punctuation, "스마트 팩토리" / "스마트팩토리") skips the LLM,
+    and force=on drafts even then. Short keys (<= 4 jamo) have no typo budget at all, so "공정"
+    never hides "공장".
+    """
     term = term.strip()
     if not term:
         return JSONResponse(status_code=400, content={"error": "EMPTY"})
 
+    await fresh_store()
     existing = find_term(term)
     if existing:
         return {"alreadyExists": True, "item": existing}
 
-    obj = llm_generate(term)
+    forced = force.lower() in ("1", "true", "on", "yes")
+    similar = await asyncio.to_thread(find_similar, term)
+    same = [s for s in similar if s["distance"] == 0]
+    if same and not forced:
+        return {"alreadyExists": True, "similar": True, "item": find_term(same[0]["kr"]), "suggestions": similar}
+
+    obj = await allm_generate(term)
     obj["createdBy"] = "LLM"
+    obj["kr"] = (obj.get("kr") or "").strip() or term
+    # put() replaces by kr: the model may answer with the name of an entry that already exists,
+    # and that entry must not be overwritten by a draft
+    await fresh_store()  # the LLM call took seconds: other workers may have added it meanwhile
+    existing = find_term(obj["kr"])
+    if existing:
+        return {"alreadyExists": True, "item": existing, "suggestions": similar}
 
-    glossary = load_glossary()
-    glossary.append(obj)
-    save_glossary(glossary)
+    await asyncio.to_thread(store.put, obj)
 
-    return {"ok": True, "item": find_term(obj.get("kr") or term)}
+    return {"ok": True, "item": find_term(obj["kr"]), "suggestions": similar}
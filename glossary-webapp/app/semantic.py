@@ -0,0 +1,228 @@
+"""Optional semantic-ish search: hashed n-gram embeddings in a memory-mapped float32 matrix.
+
+No model download and no GPU: each item's `kr`/`en`/`oneLine`/`example` text is turned into
+word and character 2/3-gram features, hashed (crc32, stable across processes) into `dim` signed
+buckets, log-scaled and L2-normalized. A query is vectorized the same way and scored against
+every row with one float32 mat-vec; `np.argpartition` picks the top k. This catches shared
+stems and partial words that plain substring search misses ("설비 고장 예측" -> an entry whose
+definition talks about 예측/고장), not true paraphrases.
+
+Rows live in `data/semantic.f32` (np.memmap, grown by doubling) so the OS pages the matrix
+instead of the Python heap holding it. `semantic.meta.json` records the key and text
+fingerprint of every row as of the last full load; on restart rows whose fingerprint still
+matches are reused instead of re-vectorized. As a store listener the index is patched per put.
+With several server processes only the one holding the flock on `semantic.lock` uses the file;
+the others keep their matrix in memory (rows are vectorized per process, in each one's order).
+
+Requires numpy; see `available()`.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only
+    fcntl = None
+
+from app.fuzzy import norm_key
+
+FIELD_WEIGHTS = (("kr", 2.0), ("en", 1.5), ("oneLine", 1.0), ("example", 0.5))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _features(text: str) -> Iterable[str]:
+    for word in _WORD_RE.findall((text or "").lower()):
+        yield "w:" + word
+        padded = f" {word} "
+        for n in (2, 3):
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    return "\x1f".join(str(item.get(f) or "") for f, _ in FIELD_WEIGHTS)
+
+
+class HashingVectorizer:
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _accumulate(self, acc: Dict[int, float], text: str, weight: float):
+        for feat in _features(text):
+            h = zlib.crc32(feat.encode("utf-8"))
+            idx = h % self.dim
+            acc[idx] = acc.get(idx, 0.0) + (weight if (h >> 31) & 1 else -weight)
+
+    def _finish(self, acc: Dict[int, float], out) -> bool:
+        out[:] = 0.0
+        for idx, v in acc.items():
+            # sublinear term frequency, sign kept
+            out[idx] = math.copysign(1.0 + math.log(abs(v)), v) if abs(v) >= 1.0 else v
+        norm = float(np.linalg.norm(out))
+        if norm == 0.0:
+            return False
+        out /= norm
+        return True
+
+    def item_into(self, item: Dict[str, Any], out) -> bool:
+        acc: Dict[int, float] = {}
+        for field, weight in FIELD_WEIGHTS:
+            self._accumulate(acc, str(item.get(field) or ""), weight)
+        return self._finish(acc, out)
+
+    def query(self, text: str):
+        acc: Dict[int, float] = {}
+        self._accumulate(acc, text, 1.0)
+        out = np.zeros(self.dim, dtype=np.float32)
+        return out if self._finish(acc, out) else None
+
+
+class SemanticIndex:
+    def __init__(self, path: Path, dim: int = 512):
+        self.path = path
+        self.meta_path = path.with_name(path.stem + ".meta.json")
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._capacity = 0
+        self._rows: Dict[str, int] = {}  # loose kr key -> row
+        self._items: List[Dict[str, Any]] = []  # row -> item
+        self._owner_fd = self._own()
+
+    # ---- storage -------------------------------------------------------
+
+    def _own(self) -> Optional[int]:
+        """Lock fd if this process owns the backing file (held for the process lifetime), else None."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path.with_name(self.path.stem + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+        return fd
+
+    def _open(self, capacity: int):
+        """(Re)map the backing file with room for `capacity` rows; existing rows are kept."""
+        capacity = max(capacity, 64)
+        if self._owner_fd is None:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self._matrix is not None:
+                n = min(len(self._matrix), capacity)
+                matrix[:n] = self._matrix[:n]
+            self._matrix, self._capacity = matrix, capacity
+            return
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = capacity * self.dim * 4
+        with open(self.path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def _ensure_row(self, row: int):
+        if row >= self._capacity:
+            self._open(max(row + 1, self._capacity * 2))
+
+    def _load_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("dim") == self.dim else None
+
+    def _save_meta(self, keys: List[str], fps: List[int]):
+        if self._owner_fd is None:
+            return
+        self._matrix.flush()
+        tmp = self.meta_path.with_name(f".{self.meta_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "keys": keys, "fps": fps}), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    # ---- store listener ------------------------------------------------
+
+    def reset(self, items: Iterable[Dict[str, Any]]):
+        with self._lock:
+            # stale rows are only trusted if the matrix file they were written to still exists
+            owner = self._owner_fd is not None
+            meta = (self._load_meta() if owner and self.path.exists() else None) or {"keys": [], "fps": []}
+            old_keys, old_fps = meta["keys"], meta["fps"]
+            self._rows, self._items = {}, []
+            unique = []
+            for it in items:
+                key = norm_key(it.get("kr", ""))
+                if key and key not in self._rows:  # duplicates: first wins, like the store
+                    self._rows[key] = len(unique)
+                    unique.append(it)
+            self._open(len(unique) + len(unique) // 4)
+            keys, fps = [], []
+            for row, it in enumerate(unique):
+                key = norm_key(it.get("kr", ""))
+                fp = zlib.crc32(item_text(it).encode("utf-8"))
+                if not (row < len(old_keys) and old_keys[row] == key and old_fps[row] == fp):
+                    self.vectorizer.item_into(it, self._matrix[row])
+                keys.append(key)
+                fps.append(fp)
+            self._items = unique
+            self._save_meta(keys, fps)
+
+    def replace(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        key = norm_key(new.get("kr", ""))
+        if not key:
+            return
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._items)
+                self._ensure_row(row)
+                self._rows[key] = row
+                self._items.append(new)
+            else:
+                self._items[row] = new
+            self.vectorizer.item_into(new, self._matrix[row])
+
+    # ---- queries -------------------------------------------------------
+
+    def scores(self, text: str) -> Optional[Tuple[Any, List[Dict[str, Any]]]]:
+        """(cosine score per row, items in row order) for `text`, or None if it has no features."""
+        q = self.vectorizer.query(text)
+        if q is None:
+            return None
+        with self._lock:
+            n = len(self._items)
+            return self._matrix[:n] @ q, list(self._items)
+
+    def search(self, text: str, k: int = 20, min_score: float = 0.0) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k (score, item), best first."""
+        found = self.scores(text)
+        if found is None:
+            return []
+        scores, items = found
+        if len(items) == 0:
+            return []
+        k = min(k, len(items))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), items[i]) for i in top if scores[i] >= min_score]
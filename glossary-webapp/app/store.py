@@ -0,0 +1,428 @@
+"""Glossary persistence: `glossary.json` snapshot + append-only change log.
+
+- Every edit appends one JSON line to the log (O(1)) and updates the in-memory view in place.
+- Once the log passes `compact_every` lines (and half the snapshot size, so compaction stays
+  amortized O(1) per edit on big glossaries) it is folded back into `glossary.json`
+  (temp file + fsync + os.replace, so readers never see a half-written file).
+- `batch()` groups many puts into one log write (bulk imports).
+- Replaying a `put` is idempotent, so a crash between the rename and the log truncation is harmless.
+- Every put stamps `updatedAt` (UTC, ISO 8601), which incremental exports filter on, and `rev`:
+  the store-wide op counter at the time it was logged (monotonic, never reused). An in-memory
+  index ordered by rev makes `changes_since(rev)` cost O(changes), not O(glossary).
+- Derived indexes register with `add_listener()` and are kept current incrementally: they get
+  `reset(items)` once the snapshot is loaded and `replace(old, new)` for every applied put
+  (`old` is None for inserts), under the store lock.
+
+Several processes (`uvicorn --workers N`) can share the files. `glossary.lock` is the flock
+target (exclusive for appends and compaction, shared for reloads) and holds two counters: a
+generation that every appended op advances and a compaction epoch. Reads compare them with
+what their in-memory view reflects (one pread) and, when another process wrote, replay just
+the new log tail, or reload everything if a compaction truncated the log in the meantime.
+Without fcntl (Windows) the store is single-process only.
+"""
+
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+from app.fuzzy import norm_key
+
+
+def write_json_atomic(path: Path, data: Any):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=2) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_items_atomic(path: Path, items: List[Dict[str, Any]]):
+    """Like write_json_atomic, but one item per line.
+
+    indent=2 forces json's pure-Python encoder (seconds for 100k terms); per-item dumps use
+    the C encoder and keep the file line-diffable.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        last = len(items) - 1
+        for i, it in enumerate(items):
+            f.write(json.dumps(it, ensure_ascii=False))
+            f.write("\n" if i == last else ",\n")
+        f.write("]\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def utc_now() -> str:
+    """Current time as stored in `updatedAt` (second precision, sorts lexically)."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+_HEADER = struct.Struct("<QQ")  # generation, compaction epoch
+
+
+class GlossaryStore:
+    def __init__(self, data_path: Path, log_path: Path, compact_every: int = 200):
+        self.data_path = data_path
+        self.log_path = log_path
+        self.lock_path = data_path.with_name(data_path.stem + ".lock")
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._items: Optional[List[Dict[str, Any]]] = None
+        self._by_kr: Dict[str, int] = {}
+        self._by_en: Dict[str, int] = {}
+        self._log_lines = 0
+        self._version = 0
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._listeners: List[Any] = []
+        # change index: parallel lists ordered by rev; superseded entries are skipped on read
+        self._change_revs: List[int] = []
+        self._change_keys: List[str] = []
+        # cross-process state: lock file fd, the generation and compaction epoch our view
+        # reflects, and how many log bytes we have consumed
+        self._fd: Optional[int] = None
+        self._gen = 0
+        self._rev_floor = 0
+        self._epoch = 0
+        self._log_offset = 0
+
+    # ---- cross-process lock and generation -----------------------------
+
+    def _lock_fd(self) -> int:
+        if self._fd is None:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    @contextmanager
+    def _flock(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        fd = self._lock_fd()
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _read_header(self) -> Tuple[int, int]:
+        if fcntl is None:
+            return self._gen, self._epoch
+        raw = os.pread(self._lock_fd(), _HEADER.size, 0)
+        return _HEADER.unpack(raw) if len(raw) == _HEADER.size else (0, 0)
+
+    def _write_header(self):
+        if fcntl is not None:
+            os.pwrite(self._lock_fd(), _HEADER.pack(self._gen, self._epoch), 0)
+
+    # ---- loading -------------------------------------------------------
+
+    def _load(self):
+        """Full load of snapshot + log. Caller holds the flock."""
+        items: List[Dict[str, Any]] = []
+        if self.data_path.exists():
+            items = json.loads(self.data_path.read_text(encoding="utf-8"))
+        self._items = items
+        self._reindex()
+        self._reindex_changes()
+        for listener in self._listeners:
+            listener.reset(items)
+
+        self._log_lines = 0
+        self._log_offset = 0
+        self._replay_tail()
+        self._gen, self._epoch = self._read_header()
+        # the counter file may lag the data (deleted, or data copied from elsewhere): new revs
+        # must still sort after every rev already on an item
+        self._rev_floor = self._change_revs[-1] if self._change_revs else 0
+        self._version += 1
+
+    def _replay_tail(self) -> bool:
+        """Apply the complete log lines past `_log_offset`. Caller holds the flock."""
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        end = data.rfind(b"\n") + 1  # a line without its newline is still being written
+        for line in data[:end].splitlines():
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue  # torn line after a crash
+            if op.get("op") == "put":
+                self._apply_put(op["item"])
+            self._log_lines += 1
+        self._log_offset += end
+        return end > 0
+
+    def _catch_up(self) -> bool:
+        """Apply other processes' writes; True if the view changed. Caller holds the flock."""
+        gen, epoch = self._read_header()
+        if gen == self._gen:
+            if epoch != self._epoch:
+                # compacted elsewhere with nothing appended since: same content, emptied log
+                self._epoch = epoch
+                self._log_offset = self._log_lines = 0
+            return False
+        if epoch != self._epoch:
+            self._load()  # compacted elsewhere: our log offset means nothing now
+            return True
+        self._replay_tail()
+        self._gen = gen
+        self._version += 1
+        return True
+
+    def _sync(self):
+        """Bring the in-memory view up to date. Caller holds self._lock."""
+        if self._items is None:
+            with self._flock(False):
+                self._load()
+        elif self._pending is None and self._read_header() != (self._gen, self._epoch):
+            # inside batch() the view stays put; the flush catches up under the write lock
+            with self._flock(False):
+                self._catch_up()
+
+    def stale(self) -> bool:
+        """True if another process wrote since this one last looked (one pread, no lock).
+
+        Lets async callers move the catch-up into a thread instead of running it on the loop.
+        """
+        return self._items is None or (self._pending is None and self._read_header() != (self._gen, self._epoch))
+
+    def _reindex(self):
+        self._by_kr = {}
+        self._by_en = {}
+        for idx, it in enumerate(self._items or []):
+            self._index_item(idx, it)
+
+    def _index_item(self, idx: int, item: Dict[str, Any]):
+        k = norm_key(item.get("kr", ""))
+        if k:
+            self._by_kr.setdefault(k, idx)
+        e = norm_key(item.get("en", ""))
+        if e:
+            self._by_en.setdefault(e, idx)
+
+    def _reindex_changes(self):
+        revs = sorted((it["rev"], idx) for idx, it in enumerate(self._items) if it.get("rev"))
+        self._change_revs = [r for r, _ in revs]
+        self._change_keys = [norm_key(self._items[idx].get("kr", "")) for _, idx in revs]
+
+    def _record_change(self, item: Dict[str, Any]):
+        rev = item.get("rev")
+        if not rev or (self._change_revs and rev <= self._change_revs[-1]):
+            return  # unversioned, or already indexed (re-applied after a reload)
+        self._change_revs.append(rev)
+        self._change_keys.append(norm_key(item.get("kr", "")))
+        if len(self._change_revs) > 2 * len(self._items) + 1024:
+            self._reindex_changes()  # drop superseded entries
+
+    def add_listener(self, listener):
+        """Register an incremental index (see module docstring); catches up if already loaded."""
+        with self._lock:
+            self._listeners.append(listener)
+            if self._items is not None:
+                listener.reset(self._items)
+
+    # ---- reads ---------------------------------------------------------
+
+    @property
+    def rev(self) -> int:
+        """Rev of the latest op in the view (shared by all processes on the same files)."""
+        with self._lock:
+            self._sync()
+            return max(self._gen, self._rev_floor)
+
+    @property
+    def tag(self) -> str:
+        """"<epoch>.<rev>" of the view: the same in every process on the same files and across
+        restarts, unlike `version`, so it can key ETags that any worker may revalidate."""
+        with self._lock:
+            self._sync()
+            return f"{self._epoch}.{max(self._gen, self._rev_floor)}"
+
+    def rev_hint(self) -> int:
+        """Latest rev written by any process, without the lock or a catch-up (one pread)."""
+        return self._read_header()[0] if self._items is not None else 0
+
+    def changes_since(self, rev: int, limit: int = 1000) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """(items put after `rev` in rev order, rev to resume from, more pending).
+
+        Each item appears once, at its latest rev. The caller is responsible for falling back to a
+        full snapshot when `rev` is 0 or ahead of `self.rev`.
+        """
+        with self._lock:
+            self._sync()
+            out: List[Dict[str, Any]] = []
+            i = bisect.bisect_right(self._change_revs, rev)
+            n = len(self._change_revs)
+            while i < n and len(out) < limit:
+                idx = self._by_kr.get(self._change_keys[i])
+                if idx is not None and self._items[idx].get("rev") == self._change_revs[i]:
+                    out.append(self._items[idx])
+                i += 1
+            return out, (self._change_revs[i - 1] if i < n else max(self._gen, self._rev_floor)), i < n
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the in-memory view does, including after other processes' writes."""
+        with self._lock:
+            self._sync()
+            return self._version
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Current items. Treat as read-only; write through put()."""
+        with self._lock:
+            self._sync()
+            return self._items
+
+    def get(self, kr: str) -> Optional[Dict[str, Any]]:
+        """Item whose `kr` matches (case- and whitespace-insensitive; see fuzzy.norm_key)."""
+        with self._lock:
+            self._sync()
+            idx = self._by_kr.get(norm_key(kr))
+            return None if idx is None else self._items[idx]
+
+    def find(self, term: str) -> Optional[Dict[str, Any]]:
+        """Item whose `kr` or `en` matches `term`; `kr` wins."""
+        with self._lock:
+            self._sync()
+            k = norm_key(term)
+            idx = self._by_kr.get(k)
+            if idx is None:
+                idx = self._by_en.get(k)
+            return None if idx is None else self._items[idx]
+
+    # ---- writes --------------------------------------------------------
+
+    def _apply_put(self, item: Dict[str, Any]):
+        k = norm_key(item.get("kr", ""))
+        idx = self._by_kr.get(k)
+        old = None
+        if idx is None:
+            self._items.append(item)
+            self._index_item(len(self._items) - 1, item)
+        else:
+            old = self._items[idx]
+            old_en = norm_key(old.get("en", ""))
+            self._items[idx] = item
+            if old_en and self._by_en.get(old_en) == idx:
+                del self._by_en[old_en]
+            self._index_item(idx, item)
+        self._record_change(item)
+        for listener in self._listeners:
+            listener.replace(old, item)
+
+    def put(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace the item with the same `kr`."""
+        return self.put_many([item])[0]
+
+    def put_many(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        items = list(items)
+        if not items:
+            return items
+        stamp = utc_now()
+        for it in items:
+            it["updatedAt"] = stamp
+            it.pop("rev", None)  # assigned by the store when logged; never trust a client's
+        with self._lock:
+            self._sync()
+            if self._pending is not None:
+                self._pending.extend(items)  # revs are assigned when the batch is written
+            else:
+                self._write(items)
+            for it in items:
+                self._apply_put(it)
+            self._version += 1
+            if self._pending is None:
+                self._maybe_compact()
+        return items
+
+    def _write(self, items: List[Dict[str, Any]]) -> bool:
+        """Assign revs to `items` and append them to the log under the exclusive flock, after
+        applying whatever other processes appended first (so the view follows log order).
+        True if anything was applied.
+        """
+        with self._flock(True):
+            changed = self._catch_up()
+            self._gen = max(self._gen, self._rev_floor)
+            for it in items:
+                self._gen += 1
+                it["rev"] = self._gen
+            data = "".join(json.dumps({"op": "put", "item": it}, ensure_ascii=False) + "\n"
+                           for it in items).encode("utf-8")
+            with open(self.log_path, "ab") as f:
+                if f.tell() > self._log_offset:
+                    # unterminated line left by a crashed writer: end it so ours parse
+                    data = b"\n" + data
+                f.write(data)
+                self._log_offset = f.tell()
+            self._log_lines += len(items)
+            self._write_header()
+        return changed
+
+    def _maybe_compact(self):
+        if self._log_lines >= max(self.compact_every, len(self._items) // 2):
+            self.compact()
+
+    @contextmanager
+    def batch(self):
+        """Buffer puts and write them to the log in one append on exit.
+
+        Puts are visible to reads immediately; the lock is held for the whole block.
+        """
+        with self._lock:
+            self._sync()
+            if self._pending is not None:
+                yield self  # nested: the outer batch flushes
+                return
+            self._pending = []
+            try:
+                yield self
+            finally:
+                pending, self._pending = self._pending, None
+                if pending and self._write(pending):
+                    # other processes' puts were applied over ours, but ours come later in the log
+                    for it in pending:
+                        self._apply_put(it)
+                    self._version += 1
+                else:
+                    for it in pending:
+                        self._record_change(it)  # now that it has a rev
+                self._maybe_compact()
+
+    def compact(self):
+        """Fold the change log into glossary.json atomically."""
+        with self._lock:
+            self._sync()
+            with self._flock(True):
+                self._catch_up()
+                write_items_atomic(self.data_path, self._items)
+                # truncate only after the snapshot is durable
+                open(self.log_path, "w", encoding="utf-8").close()
+                self._log_lines = self._log_offset = 0
+                self._epoch += 1
+                self._write_header()
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Snapshot copy, safe to serialize outside the lock."""
+        with self._lock:
+            self._sync()
+            return list(self._items)
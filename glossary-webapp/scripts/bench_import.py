@@ -0,0 +1,66 @@
+"""Benchmark the Excel import path without an LLM.
+
+Generates an N-row sheet (write-only), imports it into a throwaway store twice (fresh
+inserts, then all-duplicate updates) and prints rows/s and peak RSS.
+
+    python scripts/bench_import.py --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_MODE"] = "off"
+
+from openpyxl import Workbook  # noqa: E402
+
+from app.importer import run_import_job  # noqa: E402
+from app.store import GlossaryStore  # noqa: E402
+
+
+def make_sheet(path: Path, rows: int):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Glossary")
+    ws.append(["용어(KR)", "약어/EN", "분류", "한줄 정의", "예시", "KPI", "혼동되는 용어"])
+    for i in range(rows):
+        ws.append([f"용어 {i}", f"TERM{i}", "AI", f"정의 {i}", f"예시 {i}", "OEE, 불량률", "DX"])
+    wb.save(path)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sheet = tmp / "bench.xlsx"
+        t0 = time.perf_counter()
+        make_sheet(sheet, args.rows)
+        print(f"generated {args.rows} rows in {time.perf_counter() - t0:.1f}s ({sheet.stat().st_size / 1e6:.1f} MB)")
+
+        store = GlossaryStore(tmp / "glossary.json", tmp / "glossary.log.jsonl")
+        for label in ("insert", "update"):
+            job = {"id": label, "path": str(sheet), "fillMissing": False}
+            t0 = time.perf_counter()
+            asyncio.run(run_import_job(store, job, lambda j: None))
+            dt = time.perf_counter() - t0
+            r = job["report"]
+            print(f"{label}: {dt:.1f}s, {args.rows / dt:,.0f} rows/s, added={r['added']} updated={r['updated']}, "
+                  f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
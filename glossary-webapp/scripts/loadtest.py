@@ -0,0 +1,136 @@
+"""Local load test for the glossary API (no network, no LLM).
+
+Drives the ASGI app in-process through httpx's ASGITransport with N concurrent users doing
+a search / term / save mix against a throwaway copy of the glossary (padded to --terms
+entries), optionally while a bulk Excel import runs, and prints p50/p99 per endpoint.
+
+    python scripts/loadtest.py --users 50 --seconds 10
+    python scripts/loadtest.py --users 50 --seconds 10 --import-rows 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_MODE"] = "off"
+
+import httpx  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+from app import main as webapp  # noqa: E402
+from app.config import BASE_DIR  # noqa: E402
+from app.store import GlossaryStore  # noqa: E402
+
+MIX = [("search", 0.6), ("term", 0.3), ("save", 0.1)]
+
+
+def pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def seed(tmp: Path, terms: int) -> List[str]:
+    items = json.loads((BASE_DIR / "data" / "glossary.json").read_text(encoding="utf-8"))
+    cats = sorted({it.get("category", "AI") for it in items}) or ["AI"]
+    for i in range(max(0, terms - len(items))):
+        items.append({"kr": f"합성 용어 {i}", "en": f"SYN{i}", "category": cats[i % len(cats)],
+                      "oneLine": f"부하 테스트용 정의 {i}", "example": "", "kpi": ["OEE"], "confusions": []})
+    (tmp / "glossary.json").write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    return [it["kr"] for it in items]
+
+
+def make_sheet(path: Path, rows: int):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Glossary")
+    ws.append(["용어(KR)", "약어/EN", "분류", "한줄 정의"])
+    for i in range(rows):
+        ws.append([f"업로드 용어 {i}", f"UP{i}", "AI", f"정의 {i}"])
+    wb.save(path)
+
+
+async def user(client: httpx.AsyncClient, names: List[str], until: float, lat: Dict[str, List[float]],
+               errors: Dict[str, int], rnd: random.Random):
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    while time.perf_counter() < until:
+        kind = rnd.choices(kinds, weights)[0]
+        name = rnd.choice(names)
+        t0 = time.perf_counter()
+        if kind == "search":
+            r = await client.get("/api/search", params={"q": name[:2]})
+        elif kind == "term":
+            r = await client.get("/api/term", params={"term": name})
+        else:
+            r = await client.post("/api/save", json={"kr": name, "oneLine": f"수정 {rnd.random():.6f}"})
+        lat[kind].append(time.perf_counter() - t0)
+        if r.status_code >= 400:
+            errors[kind] += 1
+
+
+async def run(args, tmp: Path):
+    names = seed(tmp, args.terms)
+    webapp.store = GlossaryStore(tmp / "glossary.json", tmp / "glossary.log.jsonl")
+    webapp.store.items()  # load outside the measurement
+
+    lat: Dict[str, List[float]] = {k: [] for k, _ in MIX}
+    errors: Dict[str, int] = {k: 0 for k, _ in MIX}
+    transport = httpx.ASGITransport(app=webapp.app)
+    async with webapp.app.router.lifespan_context(webapp.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            job_id = None
+            if args.import_rows:
+                sheet = tmp / "upload.xlsx"
+                make_sheet(sheet, args.import_rows)
+                with open(sheet, "rb") as f:
+                    r = await client.post("/api/upload.xlsx", files={"file": ("upload.xlsx", f)},
+                                          data={"fillMissing": "off"})
+                job_id = r.json()["jobId"]
+
+            t0 = time.perf_counter()
+            until = t0 + args.seconds
+            await asyncio.gather(*(user(client, names, until, lat, errors, random.Random(i))
+                                   for i in range(args.users)))
+            elapsed = time.perf_counter() - t0
+
+            if job_id:
+                job = (await client.get(f"/api/jobs/{job_id}")).json()
+                print(f"import: {job.get('status')} {job.get('rowsDone')}/{job.get('rowsTotal')} rows during the run")
+
+    total = sum(len(v) for v in lat.values())
+    print(f"{args.users} users, {args.terms} terms, {elapsed:.1f}s, {total / elapsed:,.0f} req/s")
+    for kind, values in lat.items():
+        print(f"  {kind:<6} n={len(values):<6} p50={pct(values, 0.50) * 1000:7.1f} ms"
+              f"  p99={pct(values, 0.99) * 1000:7.1f} ms  errors={errors[kind]}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--terms", type=int, default=5000, help="pad the glossary copy to this many entries")
+    ap.add_argument("--import-rows", type=int, default=0, help="run a bulk import of this many rows meanwhile")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="glossary-loadtest-"))
+    # keep uploads and job files out of data/
+    webapp.JOBS_DIR = webapp.jobs.jobs_dir = tmp / "jobs"
+    try:
+        asyncio.run(run(args, tmp))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
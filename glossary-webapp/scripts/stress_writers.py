@@ -0,0 +1,121 @@
+"""Concurrent-writer stress test for GlossaryStore (what `uvicorn --workers N` does to it).
+
+Starts N processes on one throwaway data directory. Each does --puts single puts and a few
+batch() imports, mixing keys only it writes with keys every process overwrites, and reads
+between writes. A small --compact-every makes compactions race the appends. Afterwards it
+checks that
+
+- a fresh store sees every process-unique key with its last written value,
+- every shared key holds a value some process wrote,
+- once all are done, every process's in-memory view equals the fresh load, and
+- every item has a distinct rev and the change feed from rev 0 returns all of them.
+
+    python scripts/stress_writers.py --procs 8 --puts 300
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.store import GlossaryStore  # noqa: E402
+
+
+def open_store(root: Path, compact_every: int) -> GlossaryStore:
+    return GlossaryStore(root / "glossary.json", root / "glossary.log.jsonl", compact_every=compact_every)
+
+
+def view(store: GlossaryStore):
+    return sorted((it["kr"], it["definition"]) for it in store.export())
+
+
+def writer(root: Path, proc: int, puts: int, shared: int, compact_every: int, barrier, out):
+    store = open_store(root, compact_every)
+    rng = random.Random(proc)
+    mine = {}  # process-unique key -> last value written
+    writes = 0
+    for i in range(puts):
+        if rng.random() < 0.3:
+            kr = f"공유{rng.randrange(shared)}"
+        else:
+            kr = f"p{proc}k{i % (puts // 2 or 1)}"  # each unique key is written twice
+            mine[kr] = f"{proc}:{i}"
+        store.put({"kr": kr, "en": kr.upper(), "definition": f"{proc}:{i}"})
+        writes += 1
+        if i % 50 == 25:
+            with store.batch():
+                for j in range(20):
+                    mine[f"p{proc}b{i}j{j}"] = f"{proc}:b{i}"
+                    store.put({"kr": f"p{proc}b{i}j{j}", "definition": f"{proc}:b{i}"})
+            writes += 20
+        got = store.get(kr)
+        if got is None or got["definition"] != f"{proc}:{i}" and kr in mine:
+            out.put(("error", proc, f"own write {kr} not visible"))
+    barrier.wait()  # compare views only once nobody is writing any more
+    out.put(("done", proc, view(store), mine, writes))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--procs", type=int, default=8)
+    ap.add_argument("--puts", type=int, default=300, help="single puts per process")
+    ap.add_argument("--shared", type=int, default=20, help="keys every process writes")
+    ap.add_argument("--compact-every", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="glossary-stress-") as tmp:
+        root = Path(tmp)
+        out = mp.Queue()
+        barrier = mp.Barrier(args.procs)
+        t0 = time.perf_counter()
+        procs = [mp.Process(target=writer, args=(root, p, args.puts, args.shared, args.compact_every, barrier, out))
+                 for p in range(args.procs)]
+        for p in procs:
+            p.start()
+        views, errors, writes = {}, [], 0
+        expected_values = {}
+        while len(views) < len(procs):
+            msg = out.get()
+            if msg[0] == "error":
+                errors.append(msg[1:])
+                continue
+            _, proc, final_view, mine, n = msg
+            views[proc] = final_view
+            expected_values.update(mine)
+            writes += n
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        fresh = open_store(root, args.compact_every)
+        final = dict(view(fresh))
+        for kr, value in expected_values.items():
+            if final.get(kr) != value:
+                errors.append((kr, f"expected {value}, got {final.get(kr)}"))
+        writers = {f"{p}" for p in range(args.procs)}
+        for kr, value in final.items():
+            if kr.startswith("공유") and value.split(":")[0] not in writers:
+                errors.append((kr, f"unexpected value {value}"))
+        diverged = [p for p, v in sorted(views.items()) if v != view(fresh)]
+        revs = [it["rev"] for it in fresh.export()]
+        if len(set(revs)) != len(revs) or max(revs) != fresh.rev:
+            errors.append((None, f"revs not unique or head wrong: {len(revs) - len(set(revs))} dupes"))
+        if len(fresh.changes_since(0, limit=len(revs))[0]) != len(revs):
+            errors.append((None, "changes_since(0) does not return every item"))
+
+        print(f"{args.procs} processes, {writes} puts in {elapsed:.2f}s ({writes / elapsed:.0f} puts/s), "
+              f"{len(final)} items")
+        print(f"diverged final views: {diverged or 'none'}")
+        print(f"errors: {len(errors)}")
+        for e in errors[:20]:
+            print("  ", e)
+        sys.exit(1 if errors or diverged else 0)
+
+
+if __name__ == "__main__":
+    main()
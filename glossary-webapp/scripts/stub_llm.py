@@ -0,0 +1,93 @@
+"""Local stand-in for an OpenAI-compatible /chat/completions endpoint.
+
+Answers every request with a canned glossary draft (or an {"items": [...]} array for batch
+prompts) after an artificial delay, so bulk
+upload / LLM fill can be exercised without network access or API spend.
+
+    python scripts/stub_llm.py --port 9000 --delay 1.5 --fail-rate 0.05 --drop-rate 0.1
+    LLM_MODE=hchat LLM_ENDPOINT=http://127.0.0.1:9000/chat/completions LLM_API_KEY=x \
+        uvicorn app.main:app --port 8080
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def draft_for(term: str) -> dict:
+    return {
+        "kr": term,
+        "en": term.upper(),
+        "category": "AI",
+        "oneLine": f"{term}에 대한 테스트용 정의",
+        "example": f"{term} 적용 예시",
+        "kpi": ["OEE"],
+        "confusions": [],
+    }
+
+
+def dropped(term: str, rate: float) -> bool:
+    """Whether a batch answer leaves `term` out; by hash, so a term is dropped every time."""
+    return zlib.crc32(term.encode("utf-8")) % 1000 < rate * 1000
+
+
+class Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+    fail_rate = 0.0
+    drop_rate = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or b"{}")
+        time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.send_response(random.choice([429, 503]))
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        if "용어 목록:" in prompt:
+            listing = prompt.split("용어 목록:", 1)[1].split("\n\n", 1)[0]
+            terms = re.findall(r"^\d+\. (.+)$", listing, flags=re.M)
+            items = [draft_for(t.strip()) for t in terms if not dropped(t.strip(), self.drop_rate)]
+            content = json.dumps({"items": items}, ensure_ascii=False)
+        else:
+            m = re.search(r"용어: (.+)", prompt)
+            content = json.dumps(draft_for(m.group(1).strip() if m else "?"), ensure_ascii=False)
+        out = json.dumps({
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 2,
+                "completion_tokens": len(content) // 2,
+                "total_tokens": len(prompt) // 2 + len(content) // 2,
+            },
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=9000)
+    ap.add_argument("--delay", type=float, default=1.0, help="seconds per response")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of 429/503 answers")
+    ap.add_argument("--drop-rate", type=float, default=0.0, help="fraction of terms missing from batch answers")
+    args = ap.parse_args()
+    Handler.delay = args.delay
+    Handler.fail_rate = args.fail_rate
+    Handler.drop_rate = args.drop_rate
+    ThreadingHTTPServer(("127.0.0.1", args.port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class StubLLM:
+    """scripts/stub_llm.py on an ephemeral port, counting requests and the peak in flight."""
+
+    def __init__(self, delay: float = 0.0):
+        import stub_llm
+
+        stub = self
+        self.calls = 0
+        self.inflight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+        class Handler(stub_llm.Handler):
+            def do_POST(self):
+                with stub._lock:
+                    stub.calls += 1
+                    stub.inflight += 1
+                    stub.peak = max(stub.peak, stub.inflight)
+                try:
+                    super().do_POST()
+                finally:
+                    with stub._lock:
+                        stub.inflight -= 1
+
+        Handler.delay = delay
+        self.handler = Handler
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """app.llm pointed at a fresh stub server (hchat mode, no cache, fresh path stats)."""
+    from app import llm
+
+    server = StubLLM()
+    monkeypatch.setattr(llm, "LLM_MODE", "hchat")
+    monkeypatch.setattr(llm, "LLM_ENDPOINT", server.url)
+    monkeypatch.setattr(llm, "LLM_API_KEY", "x")
+    monkeypatch.setattr(llm, "cache", None)
+    monkeypatch.setattr(llm, "_async_client", None)
+    monkeypatch.setattr(llm, "_tokens_per_term", 300.0)
+    monkeypatch.setattr(llm, "path_stats", {
+        "single": {"calls": 0, "terms": 0, "tokens": 0, "seconds": 0.0},
+        "batch": {"calls": 0, "terms": 0, "tokens": 0, "seconds": 0.0, "failedTerms": 0},
+    })
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def glossary(tmp_path, monkeypatch):
+    """A fresh store under tmp_path swapped into app.main with its listeners and caches."""
+    from app import main
+    from app.exporter import VersionedExport, build_xlsx
+    from app.fuzzy import FuzzyIndex
+    from app.graph import RelatedGraph
+    from app.store import GlossaryStore
+
+    store = GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log")
+    graph, index = RelatedGraph(), FuzzyIndex()
+    store.add_listener(graph)
+    store.add_listener(index)
+    monkeypatch.setattr(main, "store", store)
+    monkeypatch.setattr(main, "graph", graph)
+    monkeypatch.setattr(main, "fuzzy_index", index)
+    monkeypatch.setattr(main, "semantic_index", None)
+    monkeypatch.setattr(main, "xlsx_export", VersionedExport(build_xlsx, "xlsx"))
+    monkeypatch.setattr(main, "_home_cache", {})
+    monkeypatch.setattr(main, "_search_cache", {"items": [], "keys": []})
+    return store
+
+
+@pytest.fixture
+def client(glossary):
+    """TestClient over app.main without the lifespan (no import workers)."""
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    return TestClient(main.app)
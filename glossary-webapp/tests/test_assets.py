@@ -0,0 +1,74 @@
+import os
+
+from app import assets as assets_module
+from app.assets import IMMUTABLE, StaticAssets, accepted_encodings, compress_variants, pick_variant
+
+
+def test_accepted_encodings_and_variant_choice():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {"gzip", "deflate"}
+    assert accepted_encodings("") == set()
+    variants = {"br": b"b", "gzip": b"g"}
+    assert pick_variant("gzip, br", b"raw", variants) == (b"b", "br")
+    assert pick_variant("gzip, br;q=0", b"raw", variants) == (b"g", "gzip")
+    assert pick_variant("identity", b"raw", variants) == (b"raw", None)
+
+
+def test_compress_variants_only_when_smaller():
+    text = b"body { color: red; }\n" * 100
+    assert set(compress_variants(text)) == ({"br", "gzip"} if assets_module.brotli else {"gzip"})
+    assert compress_variants(os.urandom(2048)) == {}
+
+
+def test_fingerprinted_names(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("a { color: red }")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG")
+    (tmp_path / ".hidden").write_text("x")
+    static = StaticAssets(tmp_path)
+
+    url = static.url("css/site.css")
+    assert url.startswith("/static/css/site.") and url.endswith(".css") and url != "/static/css/site.css"
+    asset, immutable = static.lookup(url[len("/static/"):])
+    assert asset.name == "css/site.css" and immutable
+    assert asset.media_type == "text/css" and asset.variants == {}  # too small to be worth it
+    assert static.lookup("css/site.css") == (asset, False)
+    assert static.lookup(".hidden") == (None, False)
+    assert static.url("missing.js") == "/static/missing.js"
+
+    # the URL (and the set digest) change with the content, not with unrelated files
+    (tmp_path / "css" / "site.css").write_text("a { color: blue }")
+    changed = StaticAssets(tmp_path)
+    assert changed.url("css/site.css") != url and changed.url("logo.png") == static.url("logo.png")
+    assert changed.digest != static.digest
+
+
+def test_static_endpoint_cache_headers(client):
+    from app.main import assets
+
+    url = assets.url("style.css")
+    res = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["cache-control"] == IMMUTABLE
+    assert res.headers["content-encoding"] == "gzip" and res.headers["vary"] == "Accept-Encoding"
+    assert res.content == assets.lookup("style.css")[0].data
+
+    res = client.get("/static/style.css")
+    assert res.headers["cache-control"] == "no-cache"
+    etag = res.headers["etag"]
+    assert client.get("/static/style.css", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/static/nope.css").status_code == 404
+
+
+def test_home_links_fingerprinted_assets_and_revalidates(client, glossary):
+    from app.main import assets
+
+    res = client.get("/")
+    assert res.status_code == 200 and res.headers["cache-control"] == "no-cache"
+    assert assets.url("style.css") in res.text and 'href="/static/style.css"' not in res.text
+    etag = res.headers["etag"]
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+    glossary.put({"kr": "설비종합효율"})
+    res = client.get("/", headers={"If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["etag"] != etag
+    assert "설비종합효율" in res.text
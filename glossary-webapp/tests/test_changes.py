@@ -0,0 +1,95 @@
+import json
+import threading
+
+import pytest
+
+from app import main
+
+
+def put_terms(store, *names):
+    for name in names:
+        store.put({"kr": name})
+    return store.rev
+
+
+def test_changes_since_pages_with_a_cursor(glossary):
+    put_terms(glossary, "가", "나", "다")
+    glossary.put({"kr": "가", "en": "A"})  # superseded entry: "가" comes back once, at its new rev
+
+    items, rev, more = glossary.changes_since(0, limit=2)
+    assert [it["kr"] for it in items] == ["나", "다"] and more
+    items, rev, more = glossary.changes_since(rev, limit=2)
+    assert [(it["kr"], it["en"]) for it in items] == [("가", "A")] and not more
+    assert rev == glossary.rev
+    assert glossary.changes_since(rev) == ([], rev, False)
+
+
+def test_changes_cursor_survives_a_reload(glossary, tmp_path):
+    from app.store import GlossaryStore
+
+    rev = put_terms(glossary, "가", "나")
+    glossary.compact()
+    put_terms(glossary, "다")
+    reopened = GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log")
+    items, head, more = reopened.changes_since(rev)
+    assert [it["kr"] for it in items] == ["다"] and head == reopened.rev and not more
+
+
+def test_changes_endpoint(client, glossary):
+    rev = put_terms(glossary, "가", "나")
+    body = client.get("/api/changes").json()
+    assert body["reset"] and body["rev"] == rev and len(body["items"]) == 2
+
+    put_terms(glossary, "다")
+    body = client.get("/api/changes", params={"since": rev}).json()
+    assert not body["reset"] and [it["kr"] for it in body["items"]] == ["다"]
+
+    for since in (-1, glossary.rev + 10):  # a rev this glossary never had: start over
+        assert client.get("/api/changes", params={"since": since}).json()["reset"]
+
+    body = client.get("/api/changes", params={"since": 0, "limit": 1}).json()
+    assert len(body["items"]) == 1 and body["more"]
+
+
+def read_events(client, headers=None, **params):
+    events = []
+    with client.stream("GET", "/api/changes/stream", params=params, headers=headers or {}) as res:
+        assert res.headers["content-type"].startswith("text/event-stream")
+        text = "".join(res.iter_text())
+    for frame in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def short_streams(monkeypatch):
+    monkeypatch.setattr(main, "CHANGES_STREAM_SECONDS", 0.4)
+    monkeypatch.setattr(main, "CHANGES_POLL_SECONDS", 0.02)
+
+
+def test_stream_pages_and_resumes(client, glossary, short_streams, monkeypatch):
+    monkeypatch.setattr(main, "CHANGES_LIMIT", 2)
+    put_terms(glossary, "가", "나", "다", "라", "마")
+
+    events = read_events(client, since=0)
+    assert [e for e, _, _ in events] == ["changes"] * 3
+    assert [it["kr"] for _, _, data in events for it in data["items"]] == ["가", "나", "다", "라", "마"]
+    assert events[-1][1] == glossary.rev
+
+    # an EventSource reconnecting sends the last id it saw, which wins over ?since=
+    resumed = read_events(client, headers={"Last-Event-ID": str(events[0][1])}, since=0)
+    assert [it["kr"] for _, _, data in resumed for it in data["items"]] == ["다", "라", "마"]
+
+    reset = read_events(client, since=-1)
+    assert reset[0][0] == "reset" and len(reset[0][2]["items"]) == 5
+
+
+def test_stream_sends_new_saves(client, glossary, short_streams):
+    put_terms(glossary, "가")
+    timer = threading.Timer(0.1, put_terms, (glossary, "새 용어"))
+    timer.start()
+    events = read_events(client)  # starts at the current rev: "가" is not sent
+    timer.join()
+    assert [(e, [it["kr"] for it in data["items"]]) for e, _, data in events] == [("changes", ["새 용어"])]
@@ -0,0 +1,41 @@
+import pytest
+
+from app import main
+
+
+@pytest.fixture
+def calls(glossary, monkeypatch):
+    glossary.put({"kr": "공장", "en": "Factory", "category": "운영"})
+    glossary.put({"kr": "스마트팩토리", "en": "Smart Factory", "category": "전략"})
+    out = []
+
+    async def generate(term):
+        out.append(term)
+        return {"kr": term, "en": "", "category": "운영", "oneLine": f"{term} 초안"}
+
+    monkeypatch.setattr(main, "allm_generate", generate)
+    return out
+
+
+def test_typo_neighbours_are_suggestions_not_blockers(client, calls):
+    res = client.post("/api/draft", data={"term": "공정"}).json()
+    assert res["ok"] and res["item"]["kr"] == "공정"
+    assert [s["kr"] for s in res["suggestions"]] == ["공장"]
+    assert calls == ["공정"]
+
+
+def test_loose_exact_match_blocks_until_forced(client, calls):
+    res = client.post("/api/draft", data={"term": "스마트 팩토리"}).json()
+    assert res["alreadyExists"] and res["similar"]
+    assert res["item"]["kr"] == "스마트팩토리"
+    assert calls == []
+
+    res = client.post("/api/draft", data={"term": "스마트 팩토리", "force": "on"}).json()
+    assert res["ok"] and res["item"]["kr"] == "스마트 팩토리"
+    assert calls == ["스마트 팩토리"]
+
+
+def test_identity_match_never_drafts(client, calls):
+    res = client.post("/api/draft", data={"term": "factory", "force": "on"}).json()
+    assert res["alreadyExists"] and res["item"]["kr"] == "공장"
+    assert calls == []
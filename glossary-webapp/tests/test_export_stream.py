@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app import exporter
+from app.exporter import iter_csv, iter_jsonl, iter_parquet, parquet_available, parse_since, select_items
+
+ITEMS = [
+    {"kr": f"용어{i}", "en": f"T{i}", "category": "AI" if i % 2 else "운영", "oneLine": "정의, \"인용\"",
+     "kpi": ["OEE", "불량률"], "confusions": [], "createdBy": "USER", "updatedAt": f"2024-01-{i + 1:02d}T00:00:00Z"}
+    for i in range(7)
+]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1700000000", "2023-11-14T22:13:20Z"),
+    ("2024-01-02", "2024-01-02T00:00:00Z"),
+    ("2024-01-02T12:00:00+09:00", "2024-01-02T03:00:00Z"),
+    ("2024-01-02T03:04:05Z", "2024-01-02T03:04:05Z"),
+])
+def test_parse_since(value, expected):
+    assert parse_since(value) == expected
+
+
+@pytest.mark.parametrize("value", ["inf", "-inf", "nan", "1e20", "yesterday", ""])
+def test_parse_since_rejects_with_value_error(value):
+    with pytest.raises(ValueError):
+        parse_since(value)
+
+
+def test_select_items_filters_lazily():
+    picked = select_items(iter(ITEMS), ["AI"], "2024-01-04T00:00:00Z")
+    assert [it["kr"] for it in picked] == ["용어3", "용어5"]
+    assert list(select_items([{"kr": "seed"}], None, "2024-01-01T00:00:00Z")) == []
+    assert [it["kr"] for it in select_items([{"kr": "seed"}])] == ["seed"]
+
+
+def test_csv_and_jsonl_stream_in_chunks(monkeypatch):
+    monkeypatch.setattr(exporter, "EXPORT_CHUNK", 3)
+
+    parts = list(iter_csv(ITEMS))
+    assert len(parts) == 3  # header + 3, 3, 1
+    rows = list(csv.reader(io.StringIO("".join(parts))))
+    assert rows[0] == exporter.EXPORT_FIELDS
+    assert rows[1][:4] == ["용어0", "T0", "운영", "정의, \"인용\""]
+    assert rows[1][5] == "OEE, 불량률"
+    assert len(rows) == 8
+
+    lines = "".join(iter_jsonl(ITEMS)).splitlines()
+    assert [json.loads(line) for line in lines] == ITEMS
+    assert len(list(iter_jsonl(ITEMS))) == 3
+
+    assert "".join(iter_csv([])) == ",".join(exporter.EXPORT_FIELDS) + "\n"
+    assert list(iter_jsonl([])) == []
+
+
+@pytest.mark.skipif(not parquet_available(), reason="needs pyarrow")
+def test_parquet_row_groups(monkeypatch):
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr(exporter, "EXPORT_CHUNK", 3)
+    data = b"".join(iter_parquet(ITEMS))
+    f = pq.ParquetFile(io.BytesIO(data))
+    assert f.metadata.num_row_groups == 3
+    table = f.read()
+    assert table.column("kr").to_pylist() == [it["kr"] for it in ITEMS]
+    assert table.column("kpi").to_pylist()[0] == ["OEE", "불량률"]
+
+
+def test_export_endpoints(client, glossary):
+    for it in ITEMS[:3]:
+        glossary.put(dict(it))
+
+    res = client.get("/api/export.jsonl", params={"category": "운영"})
+    assert res.status_code == 200
+    assert res.headers["x-glossary-rev"] == str(glossary.rev)
+    assert [json.loads(line)["kr"] for line in res.text.splitlines()] == ["용어0", "용어2"]
+
+    res = client.get("/api/export.csv", params={"modifiedSince": "2000-01-01"})
+    assert len(res.text.splitlines()) == 4
+    assert res.headers["x-snapshot-at"].endswith("Z")
+    assert client.get("/api/export.csv", params={"modifiedSince": "4102444800"}).text.count("\n") == 1
+
+
+@pytest.mark.parametrize("value", ["inf", "1e20", "not-a-date"])
+def test_bad_modified_since_is_a_400(client, value):
+    for fmt in ("csv", "jsonl"):
+        res = client.get(f"/api/export.{fmt}", params={"modifiedSince": value})
+        assert res.status_code == 400
+        assert res.json() == {"error": "BAD_MODIFIED_SINCE"}
@@ -0,0 +1,68 @@
+import io
+import threading
+
+from openpyxl import load_workbook
+
+from app.exporter import XLSX_HEADERS, VersionedExport, build_xlsx
+
+
+def test_build_xlsx_rows_and_styles():
+    items = [{"kr": "설비종합효율", "en": "OEE", "category": "성과", "kpi": ["OEE"], "confusions": ["OEM"]}]
+    ws = load_workbook(io.BytesIO(build_xlsx(items))).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert list(rows[0]) == XLSX_HEADERS
+    assert list(rows[1]) == ["설비종합효율", "OEE", "성과", None, None, "OEE", "OEM", "USER"]
+    assert ws["A1"].font.bold and ws["A2"].alignment.wrap_text
+
+
+def test_versioned_export_builds_once_per_tag(glossary):
+    builds = []
+
+    def build(items):
+        builds.append(len(items))
+        return f"{len(items)} items".encode()
+
+    export = VersionedExport(build, "txt")
+    glossary.put({"kr": "가"})
+    data, etag = export.get(glossary)
+    assert (data, export.get(glossary)) == (b"1 items", (b"1 items", etag))
+    assert builds == [1]
+
+    glossary.put({"kr": "나"})
+    data, etag2 = export.get(glossary)
+    assert data == b"2 items" and etag2 != etag
+    assert etag2 == f'"txt-{glossary.tag}"'
+    assert builds == [1, 2]
+
+
+def test_concurrent_downloads_share_one_build(glossary):
+    gate = threading.Event()
+    builds = []
+
+    def build(items):
+        builds.append(1)
+        gate.wait(5)
+        return b"x"
+
+    export = VersionedExport(build, "txt")
+    glossary.put({"kr": "가"})
+    threads = [threading.Thread(target=export.get, args=(glossary,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert builds == [1]
+
+
+def test_xlsx_endpoint_revalidates(client, glossary):
+    glossary.put({"kr": "설비종합효율", "en": "OEE"})
+    res = client.get("/api/export.xlsx")
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert load_workbook(io.BytesIO(res.content)).active["A2"].value == "설비종합효율"
+
+    assert client.get("/api/export.xlsx", headers={"If-None-Match": etag}).status_code == 304
+    glossary.put({"kr": "사이클 타임"})
+    res = client.get("/api/export.xlsx", headers={"If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["etag"] != etag
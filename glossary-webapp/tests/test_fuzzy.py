@@ -0,0 +1,93 @@
+import random
+
+from app.fuzzy import FuzzyIndex, decompose, levenshtein, loose_key, max_distance, norm_key
+
+ITEMS = [
+    {"kr": "설비종합효율", "en": "OEE"},
+    {"kr": "사이클 타임", "en": "Cycle Time"},
+    {"kr": "예방 정비", "en": "Preventive Maintenance"},
+    {"kr": "주문자 상표 부착 생산", "en": "OEM"},
+    {"kr": "불량률", "en": "Defect Rate"},
+]
+
+
+def krs(hits):
+    return [item["kr"] for _, item in hits]
+
+
+def test_typo_hits():
+    index = FuzzyIndex(ITEMS)
+    assert krs(index.similar("사이클 타입")) == ["사이클 타임"]  # one jamo off
+    assert krs(index.similar("Preventive Maintenence")) == ["예방 정비"]
+    assert index.similar("cycle-time")[0] == (0, ITEMS[1])
+
+
+def test_short_keys_need_exact_match():
+    index = FuzzyIndex(ITEMS)
+    assert krs(index.similar("OEE")) == ["설비종합효율"]
+    assert index.similar("OEF") == []
+    assert krs(index.similar("OEM")) == ["주문자 상표 부착 생산"]
+
+
+def test_short_hangul_keys_need_exact_match():
+    index = FuzzyIndex([{"kr": "공장", "en": ""}])
+    assert index.similar("공정")[0][0] == 1  # a suggestion only: api_draft blocks on distance 0
+    assert index.similar("공 장")[0][0] == 0
+    assert FuzzyIndex([{"kr": "가나", "en": ""}]).similar("가너") == []  # 4 jamo: exact only
+
+
+def test_loose_collisions_stay_separate_items():
+    c, cpp = {"kr": "C", "en": ""}, {"kr": "C++", "en": ""}
+    index = FuzzyIndex([c, cpp])
+    assert [item for _, item in index.similar("c")] == [c, cpp]
+    index.replace(cpp, {"kr": "C++", "en": "C plus plus"})
+    assert krs(index.similar("C")) == ["C", "C++"]
+
+
+def test_misses():
+    index = FuzzyIndex(ITEMS)
+    assert index.similar("") == []
+    assert index.similar("완전히 다른 용어") == []
+    assert index.similar("Preventive Maintenence", max_dist=0) == []
+
+
+def test_replace_moves_keys():
+    index = FuzzyIndex(ITEMS)
+    old = ITEMS[1]
+    new = {"kr": "사이클 타임", "en": "Takt Time"}
+    index.replace(old, new)
+    assert index.similar("Cycle Tima") == []
+    assert index.similar("Takt Tima")[0][1] is new
+    index.replace(None, {"kr": "리드 타임", "en": "Lead Time"})
+    assert krs(index.similar("리드 타입")) == ["리드 타임"]
+
+
+def test_incremental_matches_fresh_build_and_brute_force():
+    rng = random.Random(7)
+    syllables = "가나다라마바사아자차카타파하공정설비품질"
+    index = FuzzyIndex()
+    current = {}
+    for _ in range(500):
+        kr = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        item = {"kr": kr, "en": f"term {rng.randint(0, 50)}"}
+        index.replace(current.get(norm_key(kr)), item)
+        current[norm_key(kr)] = item
+
+    fresh = FuzzyIndex(current.values())
+    assert index._variants == fresh._variants
+    assert index._jamo == fresh._jamo
+
+    for _ in range(100):
+        term = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        j = decompose(loose_key(term))
+        budget = min(max_distance(j), 2)
+        expected = {}
+        for item in current.values():
+            for field in ("kr", "en"):
+                key = decompose(loose_key(item[field]))
+                limit_d = min(budget, max_distance(key))
+                d = levenshtein(j, key, limit_d)
+                if d <= limit_d:
+                    expected[item["kr"]] = min(d, expected.get(item["kr"], d))
+        got = {item["kr"]: d for d, item in index.similar(term, limit=len(current))}
+        assert got == expected
@@ -0,0 +1,67 @@
+from app.graph import RelatedGraph, kpi_node, term_node
+
+
+def names(related):
+    return sorted(r.get("kr") or r.get("kpi") for r in related)
+
+
+def make_graph(*items):
+    graph = RelatedGraph()
+    graph.reset(list(items))
+    return graph
+
+
+def test_edges_via_confusions_and_kpis():
+    ai = {"kr": "AI 전환", "en": "AX", "confusions": ["DX"], "kpi": ["OEE"]}
+    dx = {"kr": "디지털 전환", "en": "DX", "kpi": ["OEE"]}
+    graph = make_graph(ai, dx, {"kr": "외부", "confusions": ["AX", "없는 용어"]})
+
+    # confusions may name another item's en ("DX"), and edges at "AX" count for its kr
+    assert names(graph.related("AI 전환")) == ["OEE", "디지털 전환", "외부"]
+    assert names(graph.related("ax")) == names(graph.related("AI 전환"))
+    two = graph.related("외부", k=2)
+    assert [r["hops"] for r in two] == sorted(r["hops"] for r in two)
+    assert {r["kr"]: r["inGlossary"] for r in graph.related("외부")} == {"AI 전환": True, "없는 용어": False}
+
+    label, terms = graph.kpi_terms("oee")
+    assert label == "OEE" and [t["kr"] for t in terms] == ["AI 전환", "디지털 전환"]
+    assert graph.kpi_terms("MTBF") is None and graph.related("모르는 말") is None
+
+
+def test_replace_moves_edges():
+    old = {"kr": "설비종합효율", "confusions": ["가동률"], "kpi": ["OEE"]}
+    graph = make_graph(old)
+    graph.replace(old, {"kr": "설비종합효율", "confusions": ["성능률"], "kpi": ["OEE"]})
+    assert names(graph.related("설비종합효율")) == ["OEE", "성능률"]
+    assert graph.related("가동률") is None
+    assert [t["kr"] for t in graph.kpi_terms("OEE")[1]] == ["설비종합효율"]
+
+
+def test_labels_go_with_the_last_reference():
+    first = {"kr": "불량률", "en": "Defect Rate", "confusions": ["수율"], "kpi": ["ppm"]}
+    other = {"kr": "직행률", "confusions": ["수율"]}
+    graph = make_graph(first, other)
+
+    graph.replace(first, {"kr": "불량률"})
+    assert term_node("수율") in graph._labels  # 직행률 still links it
+    assert kpi_node("ppm") not in graph._labels and term_node("Defect Rate") not in graph._labels
+
+    graph.replace(other, {"kr": "직행률"})
+    assert set(graph._labels) == {term_node("불량률"), term_node("직행률")}
+
+    # a name that comes back later shows its new spelling, not the one that was dropped
+    graph.replace({"kr": "직행률"}, {"kr": "직행률", "kpi": ["PPM"]})
+    assert graph.kpi_terms("ppm")[0] == "PPM"
+
+
+def test_store_keeps_the_graph_current(client, glossary):
+    glossary.put({"kr": "사이클 타임", "en": "CT", "kpi": ["UPH"]})
+    glossary.put({"kr": "택트 타임", "confusions": ["사이클 타임"], "kpi": ["UPH"]})
+    res = client.get("/api/related", params={"term": "CT"})
+    assert names(res.json()["related"]) == ["UPH", "택트 타임"]
+    assert client.get("/api/kpi/uph").json()["kpi"] == "UPH"
+
+    glossary.put({"kr": "택트 타임"})
+    glossary.put({"kr": "사이클 타임"})
+    assert client.get("/api/kpi/UPH").status_code == 404
+    assert client.get("/api/related", params={"term": "사이클 타임"}).json()["related"] == []
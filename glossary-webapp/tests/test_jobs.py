@@ -0,0 +1,120 @@
+import asyncio
+import copy
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from app import importer, jobs
+from app.importer import run_import_job
+from app.jobs import JobQueue
+from app.store import GlossaryStore
+
+
+def make_sheet(path, terms):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["용어(KR)", "약어/EN", "분류", "한줄 정의"])
+    for kr in terms:
+        ws.append([kr, "", "AI", f"{kr} 정의"])
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.skipif(jobs.fcntl is None, reason="needs flock")
+def test_only_one_queue_claims_a_job(tmp_path):
+    first, second = JobQueue(tmp_path, None), JobQueue(tmp_path, None)
+    fd = first._claim("abc")
+    assert fd is not None
+    assert second._claim("abc") is None
+    first._release("abc", fd, finished=False)
+    assert (tmp_path / "abc.lock").exists()  # unfinished: the lock file stays
+
+    fd = second._claim("abc")
+    assert fd is not None
+    second._release("abc", fd, finished=True)
+    assert not (tmp_path / "abc.lock").exists()
+
+
+def test_start_resumes_interrupted_jobs(tmp_path):
+    ran = []
+
+    async def handler(job, checkpoint):
+        ran.append(job["id"])
+
+    queue = JobQueue(tmp_path, handler, workers=1)
+    upload = tmp_path / "upload.xlsx"
+    upload.write_bytes(b"x")
+    for i, status in enumerate(["running", "queued", "done", "failed"]):
+        queue.save({"id": f"job{i}", "status": status, "createdAt": i, "path": str(upload) if i == 0 else None})
+
+    async def main():
+        await queue.start()
+        for _ in range(100):
+            if queue.get("job0")["status"] == queue.get("job1")["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert ran == ["job0", "job1"]  # oldest first, finished jobs left alone
+    assert [queue.get(f"job{i}")["status"] for i in range(4)] == ["done", "done", "done", "failed"]
+    assert not upload.exists()
+    assert list(tmp_path.glob("*.lock")) == []
+
+
+def test_failed_job_records_the_error(tmp_path):
+    async def handler(job, checkpoint):
+        raise importer.ImportFailed("MISSING_KR_COLUMN", ["A", "B"])
+
+    queue = JobQueue(tmp_path, handler)
+    queue.save({"id": "bad", "status": "queued"})
+    assert asyncio.run(queue._run("bad")) is True
+    job = queue.get("bad")
+    assert (job["status"], job["error"], job["errorDetail"]) == ("failed", "MISSING_KR_COLUMN", ["A", "B"])
+    assert queue.get("../bad") is None
+
+
+def test_resumed_chunk_is_not_counted_twice(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_CHUNK", 2)
+    store = GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log")
+    store.put({"kr": "기존"})
+    sheet = make_sheet(tmp_path / "in.xlsx", ["가", "나", "다", "기존", "라"])
+    saved, calls = [], []
+
+    class Crash(Exception):
+        pass
+
+    def crashing(job):
+        calls.append(1)
+        if len(calls) == 5:  # the checkpoint after chunk 2, whose puts are already in the log
+            raise Crash
+        saved.append(copy.deepcopy(job))
+
+    job = {"id": "imp", "path": sheet}
+    with pytest.raises(Crash):
+        asyncio.run(run_import_job(store, job, crashing))
+    job = json.loads(json.dumps(saved[-1]))  # what a restarted process reads from the job file
+    assert job["nextRow"] == 4 and job["chunkAdded"] == {"row": 4, "rows": [4]}
+    assert job["report"]["added"] == 2
+
+    # a new process re-applies chunk 2 ("다", "기존"): "다" is in the store now but was added by this job
+    store = GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log")
+    asyncio.run(run_import_job(store, job, lambda j: None))
+    report = job["report"]
+    assert (report["added"], report["updated"], report["skipped"]) == (4, 1, 0)
+    assert job["rowsDone"] == 5 and "chunkAdded" not in job
+    assert job["count"] == 5
+
+
+def test_import_counts_and_skips(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_CHUNK", 2)
+    store = GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log")
+    sheet = make_sheet(tmp_path / "in.xlsx", ["가", "", "나", "가"])
+    checkpoints = []
+    job = {"id": "imp", "path": sheet}
+    asyncio.run(run_import_job(store, job, lambda j: checkpoints.append(j.get("nextRow"))))
+    report = job["report"]
+    assert (report["added"], report["updated"], report["skipped"]) == (2, 1, 1)
+    assert job["rowsTotal"] == 4 and job["nextRow"] == 6
+    assert checkpoints[-1] == 6
@@ -0,0 +1,66 @@
+import asyncio
+
+from stub_llm import dropped
+
+from app import llm
+from app.llm_cache import LLMCache
+
+TERMS = [f"용어{i}" for i in range(10)]
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await llm.close_async_client()
+
+    return asyncio.run(main())
+
+
+def test_batch_elements_missing_from_the_answer_are_retried_singly(stub):
+    stub.handler.drop_rate = 0.3
+    missing = [t for t in TERMS if dropped(t, 0.3)]
+    assert 0 < len(missing) < len(TERMS)
+
+    results = run(llm.generate_many(TERMS, concurrency=4))
+
+    assert [r["kr"] for r in results] == TERMS
+    assert llm.path_stats["batch"]["calls"] == 1
+    assert llm.path_stats["batch"]["failedTerms"] == len(missing)
+    assert llm.path_stats["single"]["terms"] == len(missing)
+    assert stub.calls == 1 + len(missing)
+
+
+def test_batches_split_by_size_and_fill_the_single_term_cache(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BATCH_MAX", 4)
+    monkeypatch.setattr(llm, "cache", LLMCache(tmp_path / "c.sqlite3", ttl=0, max_bytes=1 << 20))
+
+    results = run(llm.generate_many(TERMS, concurrency=2))
+    assert [r["kr"] for r in results] == TERMS
+    assert stub.calls == 3  # 4 + 4 + 2
+
+    again = run(llm.generate_many(TERMS + ["새 용어"], concurrency=2))
+    assert [r["kr"] for r in again] == TERMS + ["새 용어"]
+    assert stub.calls == 4  # only the new term went out
+    assert run(llm.allm_generate("용어3")) == results[3]
+    assert stub.calls == 4
+
+
+def test_whole_batch_failure_falls_back_to_single_requests(stub, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BATCH_MAX", 5)
+    stub.handler.drop_rate = 1.0
+
+    results = run(llm.generate_many(TERMS[:5], concurrency=5))
+
+    assert [r["kr"] for r in results] == TERMS[:5]
+    assert llm.path_stats["batch"]["failedTerms"] == 5
+    assert stub.calls == 6
+
+
+def test_batch_timeout_scales_with_terms(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BATCH_TIMEOUT", 0)
+    monkeypatch.setattr(llm, "LLM_ROW_TIMEOUT", 90)
+    assert llm.batch_timeout(4) == 360
+    monkeypatch.setattr(llm, "LLM_BATCH_TIMEOUT", 120)
+    assert llm.batch_timeout(4) == 120
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from app import llm, llm_cache
+from app.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_then_ttl_expiry(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=clock))
+    cache = LLMCache(tmp_path / "c.sqlite3", ttl=60, max_bytes=1 << 20)
+    cache.put("k", "v", latency_ms=1500.0, tokens=300)
+
+    clock.now += 59
+    assert cache.get("k") == "v"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.get("k") is None  # deleted on the expired read
+
+    st = cache.stats()
+    assert (st["hits"], st["misses"], st["entries"], st["bytes"]) == (1, 2, 0, 0)
+    assert st["savedSeconds"] == 1.5 and st["savedTokens"] == 300
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=clock))
+    cache = LLMCache(tmp_path / "c.sqlite3", ttl=0, max_bytes=1000)
+    for i in range(4):
+        clock.now += 1
+        cache.put(f"k{i}", "x" * 240)
+    clock.now += 1
+    assert cache.get("k0") is not None  # k0 is now the most recent; k1 the oldest
+
+    clock.now += 1
+    cache.put("k4", "x" * 240)  # 1200 > 1000: evict down to 900
+
+    assert cache.stats()["bytes"] <= 900
+    assert cache.get("k1") is None and cache.get("k2") is None
+    assert cache.get("k0") is not None and cache.get("k4") is not None
+
+
+def test_size_is_tracked_across_reopen(tmp_path):
+    path = tmp_path / "c.sqlite3"
+    cache = LLMCache(path, ttl=0, max_bytes=1 << 20)
+    cache.put("k", "가나다")
+    cache.put("k", "가나")  # replace: size is adjusted, not added
+    assert cache.stats()["bytes"] == 6
+    assert LLMCache(path, ttl=0, max_bytes=1 << 20).stats()["bytes"] == 6
+
+
+def test_allm_generate_answers_repeats_from_cache(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "cache", LLMCache(tmp_path / "c.sqlite3", ttl=0, max_bytes=1 << 20))
+
+    async def main():
+        try:
+            return [await llm.allm_generate("예지 정비") for _ in range(3)]
+        finally:
+            await llm.close_async_client()
+
+    first, second, third = asyncio.run(main())
+    assert first == second == third
+    assert stub.calls == 1
+    assert llm.cache.stats()["hits"] == 2
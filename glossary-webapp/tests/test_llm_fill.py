@@ -0,0 +1,36 @@
+import asyncio
+
+from app import llm
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await llm.close_async_client()
+
+    return asyncio.run(main())
+
+
+def test_generate_many_keeps_order_and_concurrency_bound(stub, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BATCH_MAX", 1)
+    stub.handler.delay = 0.05
+    terms = [f"용어{i}" for i in range(12)]
+
+    results = run(llm.generate_many(terms, concurrency=3))
+
+    assert [r["kr"] for r in results] == terms
+    assert stub.calls == 12
+    assert 1 < stub.peak <= 3
+
+
+def test_failed_rows_come_back_as_exceptions(stub, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BATCH_MAX", 1)
+    monkeypatch.setattr(llm, "LLM_ROW_TIMEOUT", 0.2)
+    stub.handler.delay = 1.0
+
+    results = run(llm.generate_many(["느린 용어"], concurrency=1))
+
+    assert isinstance(results[0], RuntimeError)
+    assert "timed out" in str(results[0])
@@ -0,0 +1,127 @@
+import json
+import os
+
+import pytest
+
+from app import semantic
+from app.semantic import SemanticIndex
+
+pytestmark = pytest.mark.skipif(not semantic.available(), reason="needs numpy")
+
+ITEMS = [
+    {"kr": "예지 보전", "en": "PdM", "oneLine": "설비 고장을 미리 예측해 정비하는 방식"},
+    {"kr": "설비종합효율", "en": "OEE", "oneLine": "가동률, 성능, 품질을 곱한 설비 효율"},
+    {"kr": "불량률", "en": "Defect Rate", "oneLine": "생산량 중 불량품 비율"},
+]
+
+
+def open_index(path, **kw):
+    """A SemanticIndex that counts how many rows it vectorizes."""
+    index = SemanticIndex(path, **kw)
+    index.vectorized = 0
+    item_into = index.vectorizer.item_into
+
+    def counting(item, out):
+        index.vectorized += 1
+        return item_into(item, out)
+
+    index.vectorizer.item_into = counting
+    return index
+
+
+def close(index):
+    """Give up the backing file, as a process exit would."""
+    if index._owner_fd is not None:
+        os.close(index._owner_fd)
+        index._owner_fd = None
+
+
+def top(index, text):
+    return [it["kr"] for _, it in index.search(text, k=1)]
+
+
+def test_search_ranks_shared_stems(tmp_path):
+    index = open_index(tmp_path / "semantic.f32")
+    index.reset(ITEMS)
+    assert top(index, "설비 고장 예측") == ["예지 보전"]
+    assert top(index, "oee") == ["설비종합효율"]
+    assert index.search("!!!") == []
+    close(index)
+
+
+def test_restart_reuses_unchanged_rows(tmp_path):
+    path = tmp_path / "semantic.f32"
+    first = open_index(path)
+    first.reset(ITEMS)
+    assert first.vectorized == 3
+    before = first.search("설비 효율", k=3)
+    close(first)
+
+    again = open_index(path)
+    again.reset(ITEMS)
+    assert again.vectorized == 0  # rows come straight from the memmap
+    assert again.search("설비 효율", k=3) == before
+    close(again)
+
+    edited = [dict(ITEMS[0]), dict(ITEMS[1], oneLine="설비 종합 효율 지표"), dict(ITEMS[2])]
+    changed = open_index(path)
+    changed.reset(edited)
+    assert changed.vectorized == 1
+    close(changed)
+
+    reordered = open_index(path)
+    reordered.reset(list(reversed(edited)))  # rows are matched by position
+    assert reordered.vectorized == 2
+    close(reordered)
+
+
+def test_rebuilds_without_the_matrix_file_or_on_a_new_dim(tmp_path):
+    path = tmp_path / "semantic.f32"
+    first = open_index(path)
+    first.reset(ITEMS)
+    close(first)
+
+    path.unlink()  # meta alone is not trusted
+    rebuilt = open_index(path)
+    rebuilt.reset(ITEMS)
+    assert rebuilt.vectorized == 3 and top(rebuilt, "불량품") == ["불량률"]
+    close(rebuilt)
+
+    other_dim = open_index(path, dim=256)
+    other_dim.reset(ITEMS)
+    assert other_dim.vectorized == 3
+    assert json.loads(other_dim.meta_path.read_text())["dim"] == 256
+    close(other_dim)
+
+
+def test_puts_grow_the_matrix(tmp_path):
+    path = tmp_path / "semantic.f32"
+    index = open_index(path)
+    index.reset(ITEMS)
+    assert index._capacity == 64
+    for i in range(100):
+        index.replace(None, {"kr": f"용어{i}", "oneLine": f"정의 번호{i}"})
+    assert index._capacity == 128
+    assert path.stat().st_size == 128 * index.dim * 4
+    assert top(index, "번호77") == ["용어77"]
+
+    old = ITEMS[2]
+    index.replace(old, dict(old, oneLine="수율의 반대"))
+    assert len(index._items) == 103 and top(index, "수율의 반대") == ["불량률"]
+    close(index)
+
+
+def test_second_process_keeps_its_matrix_in_memory(tmp_path):
+    path = tmp_path / "semantic.f32"
+    owner = open_index(path)
+    owner.reset(ITEMS)
+    meta = owner.meta_path.read_text()
+
+    other = open_index(path)
+    assert other._owner_fd is None
+    other.reset(ITEMS[:1])
+    assert other.vectorized == 1  # never trusts the owner's rows
+    assert not isinstance(other._matrix, semantic.np.memmap)
+    assert owner.meta_path.read_text() == meta
+    assert top(owner, "불량품") == ["불량률"]
+    close(owner)
@@ -0,0 +1,110 @@
+"""GlossaryStore replay and compaction across processes (writers run as subprocesses)."""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from app.store import GlossaryStore, fcntl
+
+ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="multi-process store needs fcntl")
+
+
+def make_store(tmp_path, compact_every=200):
+    return GlossaryStore(tmp_path / "glossary.json", tmp_path / "glossary.log", compact_every=compact_every)
+
+
+def run_writer(tmp_path, body, compact_every=200):
+    """Run `body` in a fresh interpreter with `store` bound to the same files."""
+    script = textwrap.dedent(f"""
+        from pathlib import Path
+        from app.store import GlossaryStore
+        base = Path({str(tmp_path)!r})
+        store = GlossaryStore(base / "glossary.json", base / "glossary.log", compact_every={compact_every})
+    """) + textwrap.dedent(body)
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+
+
+def test_reader_replays_other_process_appends(tmp_path):
+    store = make_store(tmp_path)
+    store.put({"kr": "설비종합효율", "en": "OEE"})
+    tag = store.tag
+
+    run_writer(tmp_path, """
+        store.put({"kr": "사이클 타임", "en": "Cycle Time"})
+        store.put({"kr": "설비종합효율", "en": "Overall Equipment Effectiveness"})
+    """)
+
+    assert store.stale()
+    assert store.get(" 사이클  타임")["en"] == "Cycle Time"
+    assert store.get("설비종합효율")["en"] == "Overall Equipment Effectiveness"
+    assert len(store.items()) == 2
+    assert store.tag != tag
+    revs = [it["rev"] for it in store.items()]
+    assert len(set(revs)) == 2
+
+
+def test_reader_reloads_after_other_process_compacts(tmp_path):
+    store = make_store(tmp_path)
+    store.put_many({"kr": f"용어{i}", "en": f"term {i}"} for i in range(5))
+    epoch = store.tag.split(".")[0]
+
+    run_writer(tmp_path, """
+        store.put({"kr": "용어9", "en": "term 9"})
+        store.compact()
+        store.put({"kr": "용어10", "en": "term 10"})
+    """)
+
+    assert store.tag.split(".")[0] != epoch
+    assert sorted(it["kr"] for it in store.items()) == sorted([f"용어{i}" for i in range(5)] + ["용어9", "용어10"])
+    # the snapshot holds everything before the compaction, the log only what came after
+    snapshot = json.loads((tmp_path / "glossary.json").read_text(encoding="utf-8"))
+    assert len(snapshot) == 6
+    assert len((tmp_path / "glossary.log").read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_writes_from_both_processes_keep_log_order(tmp_path):
+    store = make_store(tmp_path, compact_every=3)
+    store.put({"kr": "정비", "en": "Maintenance"})
+
+    run_writer(tmp_path, """
+        for i in range(7):  # crosses compact_every twice
+            store.put({"kr": f"부품{i}", "en": f"part {i}"})
+    """, compact_every=3)
+
+    store.put({"kr": "부품3", "en": "Part Three"})  # catches up, then overrides the other process
+    assert store.get("부품3")["en"] == "Part Three"
+    assert len(store.items()) == 8
+
+    fresh = make_store(tmp_path)
+    assert {it["kr"]: it["en"] for it in fresh.items()} == {it["kr"]: it["en"] for it in store.items()}
+    assert max(it["rev"] for it in fresh.items()) == store.get("부품3")["rev"]
+
+
+def test_same_content_gives_same_tag_in_every_process(tmp_path):
+    store = make_store(tmp_path)
+    store.put({"kr": "수율", "en": "Yield"})
+    out = tmp_path / "tag.txt"
+    run_writer(tmp_path, f"""
+        Path({str(out)!r}).write_text(store.tag)
+    """)
+    assert out.read_text() == store.tag
+
+
+def test_loose_variants_are_distinct_terms(tmp_path):
+    store = make_store(tmp_path)
+    store.put({"kr": "C", "en": "C language"})
+    store.put({"kr": "C++", "en": "C plus plus"})
+    store.put({"kr": "OEE", "en": "Overall Equipment Effectiveness"})
+    store.put({"kr": "OEE.", "en": "OEE, abbreviated"})
+
+    assert len(store.items()) == 4
+    assert store.get("c")["en"] == "C language"
+    assert store.get("C++")["en"] == "C plus plus"
+    assert store.find("oee.")["en"] == "OEE, abbreviated"
+    assert [it["kr"] for it in store.changes_since(0)[0]] == ["C", "C++", "OEE", "OEE."]
@@ -0,0 +1,64 @@
+import re
+import zipfile
+
+import openpyxl
+
+from app.xlsx_stream import iter_rows, sheet_rows
+
+
+def write_book(path, rows, active_title="용어집"):
+    wb = openpyxl.Workbook()
+    wb.active.title = "다른 시트"
+    ws = wb.create_sheet(active_title)
+    for row in rows:
+        ws.append(row)
+    wb.active = wb.index(ws)
+    wb.save(path)
+
+
+def rewrite_sheet(path, fn):
+    """Rewrite the worksheet XML of a saved book (to mimic other writers)."""
+    with zipfile.ZipFile(path) as zf:
+        entries = {name: zf.read(name) for name in zf.namelist()}
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in entries.items():
+            if name.startswith("xl/worksheets/sheet"):
+                data = fn(data.decode("utf-8")).encode("utf-8")
+            zf.writestr(name, data)
+
+
+def test_reads_active_sheet_written_by_openpyxl(tmp_path):
+    path = tmp_path / "glossary.xlsx"
+    write_book(path, [
+        ["한글", "영문", "설명"],
+        ["설비종합효율", "OEE", None],
+        ["사이클 타임", "Cycle Time", 42],
+        [None, None, None],
+        ["불량률", None, "품질 지표"],
+    ])
+    rows = list(iter_rows(str(path)))
+    assert rows[0] == (1, ("한글", "영문", "설명"))
+    assert rows[1] == (2, ("설비종합효율", "OEE"))
+    assert rows[2] == (3, ("사이클 타임", "Cycle Time", 42))
+    assert rows[-1] == (5, ("불량률", None, "품질 지표"))
+    assert sheet_rows(str(path)) == 5
+
+
+def test_gaps_in_columns_are_filled(tmp_path):
+    path = tmp_path / "gaps.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = "한글"
+    wb.active["D1"] = "비고"
+    wb.save(path)
+    assert list(iter_rows(str(path))) == [(1, ("한글", None, None, "비고"))]
+
+
+def test_lowercase_and_missing_cell_refs(tmp_path):
+    path = tmp_path / "refs.xlsx"
+    write_book(path, [["정비", "Maintenance", "메모"]])
+    rewrite_sheet(path, lambda xml: re.sub(r'<c r="([A-Z]+)(\d+)"', lambda m: f'<c r="{m[1].lower()}{m[2]}"', xml))
+    assert list(iter_rows(str(path))) == [(1, ("정비", "Maintenance", "메모"))]
+
+    write_book(path, [["정비", "Maintenance", "메모"]])
+    rewrite_sheet(path, lambda xml: re.sub(r'<c r="[A-Z]+\d+"', "<c", xml))
+    assert list(iter_rows(str(path))) == [(1, ("정비", "Maintenance", "메모"))]
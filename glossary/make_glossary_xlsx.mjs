@@ -7,6 +7,12 @@ import path from 'node:path';
 // Defaults:
 //   outPath:      ./AI_DX_Glossary_Manufacturing.xlsx
 //   sourceJson:   ../glossary-webapp/data/glossary.json
+// sourceJson may also be a .jsonl file or a running webapp's export URL, e.g.
+//   http://127.0.0.1:8000/api/export.jsonl?category=AI
+// (JSON Lines are read one entry per line instead of parsing one big document)
+// or the webapp's change feed, which keeps a local mirror and only downloads edits:
+//   node make_glossary_xlsx.mjs out.xlsx http://127.0.0.1:8000/api/changes [mirrorPath]
+// (mirrorPath defaults to ./glossary.mirror.json; the first run downloads everything)
 
 const outPath = process.argv[2]
   || path.resolve('./AI_DX_Glossary_Manufacturing.xlsx');
@@ -14,9 +20,54 @@ const outPath = process.argv[2]
 const sourceJsonPath = process.argv[3]
   || path.resolve('../glossary-webapp/data/glossary.json');
 
-const raw = await fs.readFile(sourceJsonPath, 'utf-8');
+const isUrl = /^https?:\/\//.test(sourceJsonPath);
+const isChangeFeed = isUrl && /\/api\/changes\/?$/.test(sourceJsonPath);
+
+// Bring the local mirror ({rev, items}) up to date through /api/changes and return its items.
+async function syncMirror(feedUrl, mirrorPath) {
+  let mirror = null;
+  try {
+    mirror = JSON.parse(await fs.readFile(mirrorPath, 'utf-8'));
+  } catch {
+    // no mirror yet: the feed sends a full reset
+  }
+  const byKr = new Map((mirror?.items || []).map(e => [e.kr, e]));
+  let rev = mirror ? mirror.rev : null;
+  let changed = 0;
+  for (;;) {
+    const url = rev === null ? feedUrl : `${feedUrl}?since=${rev}`;
+    const res = await fetch(url);
+    if (!res.ok) throw new Error(`GET ${url}: ${res.status}`);
+    const page = await res.json();
+    if (page.reset) byKr.clear();
+    for (const e of page.items) byKr.set(e.kr, e);
+    changed += page.items.length;
+    rev = page.rev;
+    if (!page.more) break;
+  }
+  const items = [...byKr.values()];
+  await fs.writeFile(mirrorPath, JSON.stringify({ rev, items }));
+  console.log(`Synced: ${changed} changed entries, rev ${rev}`);
+  return items;
+}
+
+let raw;
+if (isChangeFeed) {
+  raw = null;
+} else if (isUrl) {
+  const res = await fetch(sourceJsonPath);
+  if (!res.ok) throw new Error(`GET ${sourceJsonPath}: ${res.status}`);
+  raw = await res.text();
+} else {
+  raw = await fs.readFile(sourceJsonPath, 'utf-8');
+}
+const isJsonl = /\.jsonl(\?|$)/.test(sourceJsonPath);
 /** @type {Array<{kr:string,en?:string,category?:string,oneLine?:string,example?:string,kpi?:string[],confusions?:string[],ask?:string[]}>} */
-const entries = JSON.parse(raw);
+const entries = isChangeFeed
+  ? await syncMirror(sourceJsonPath, process.argv[4] || path.resolve('./glossary.mirror.json'))
+  : isJsonl
+    ? raw.split('\n').filter(line => line.trim()).map(line => JSON.parse(line))
+    : JSON.parse(raw);
 
 const rows = entries.map(e => ({
   kr: e.kr || '',
@@ -0,0 +1,438 @@
+"""카카오뱅크 입출금 문자 / 은행 거래내역 CSV -> payments, expenses 일괄 입력.
+
+폰의 SmsReceiver는 새로 오는 문자만 넣는다. 예전 문자 백업이나 은행에서 내려받은 거래내역을
+한꺼번에 넣을 때 쓴다. 문자 형식은 SmsParser.kt와 같다 (입금 -> payments, 출금 -> expenses).
+
+- 입력은 줄 단위로 읽으면서 `BATCH`건씩 파싱/매칭해 executemany로 넣고, 전체를 트랜잭션 하나로
+  커밋한다. 중간에 실패하면 아무것도 들어가지 않는다.
+- 입금자명 -> 세대 매칭은 DB에서 한 번 만든 색인(딕셔너리)으로 한다:
+    1. 입금자명에 호실 번호가 있으면(예: "201박진환") 그 세대
+    2. 지난 납부에서 확인된 입금자명 (부모님 이름으로 보내는 경우 등)
+    3. 임차인 이름 (동명이인이면 입금액이 월세와 같은 세대)
+    4. 그래도 없으면 입금액이 월세와 같은 임대중 세대가 하나뿐일 때 그 세대
+  상태는 월세 이상이면 PAID, 모자라면 PARTIAL, 월세를 모르거나 4번으로 찾았으면 PENDING(확인필요).
+  못 찾은 입금은 앱과 똑같이 unitId "" / PENDING으로 넣는다.
+- 중복 방지: 원문(공백 정리)의 해시. DB에 이미 있는 문자(폰이 넣은 것 포함)와 같은 입력 안의 중복은
+  건너뛰므로 같은 파일을 몇 번 넣어도 결과가 같다. 해시는 rawSms에서 계산하므로 Room 스키마에
+  열이나 테이블을 더하지 않는다. CSV는 같은 날 같은 사람이 같은 금액을 두 번 보내면 행이 똑같을 수
+  있어서, 파일 안에서 n번째(2번째부터) 나온 같은 행은 원문 끝에 " #n"을 붙여 따로 센다. 같은 파일이나
+  기간이 겹치는 거래내역을 다시 넣어도 n번째끼리 겹치므로 그대로 건너뛴다.
+
+문자에는 연도가 없다. 줄 앞에 날짜("2024-01-23 11:59:00<탭>[Web발신] ...")가 있으면 그 연도를 쓰고,
+없으면 `year`(첫 문자의 연도)부터 시작해 월이 거꾸로 가면(12월 -> 1월) 다음 해로 넘긴다. 그래서
+날짜 없는 백업은 시간순이어야 한다.
+
+CSV는 머리행에서 열을 찾는다: 거래일시, 구분(입금/출금), 거래금액(또는 입금액/출금액), 내용/적요,
+잔액. 문자 백업 CSV(date, body 열)는 body를 문자로 파싱한다. 인코딩은 UTF-8, 안 되면 CP949.
+
+    python config/bank_ingest.py --db data/pinehill.db sms.txt --year 2022 --dry-run
+    python config/bank_ingest.py --db data/pinehill.db 거래내역.csv
+"""
+
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ledger import SEOUL, monthly_rent, month_of_epoch_ms
+
+BATCH = 1000
+MAX_UNMATCHED = 50  # 결과에 보여줄 못 찾은 입금 수
+
+# SmsParser.kt와 같은 정규식
+DATETIME_RE = re.compile(r"(\d{2})/(\d{2})\s+(\d{2}):(\d{2})")
+DEPOSIT_RE = re.compile(r"입금\s+([\d,]+)원")
+WITHDRAWAL_RE = re.compile(r"출금\s+([\d,]+)원")
+SENDER_RE = re.compile(r"원\s+(.+?)\s+잔액")
+COUNTERPARTY_RE = re.compile(r"원\s+(.+?)(?:\s+잔액|$)")
+
+STAMP_RE = re.compile(r"^(\d{4})[-./](\d{1,2})[-./](\d{1,2})[ T](\d{1,2}):(\d{2})(?::\d{2})?\s+")
+CSV_DATE_RE = re.compile(r"(\d{4})\D(\d{1,2})\D(\d{1,2})(?:\D+(\d{1,2}):(\d{2}))?")
+ROOM_RE = re.compile(r"(?<!\d)(\d{3,4})(?!\d)")
+NAME_NOISE_RE = re.compile(r"[\s\d()\[\]_.\-]")
+
+SQL_UNITS = "SELECT unitId, roomNo, status, targetPrice FROM units"
+SQL_TENANTS = "SELECT tenantKey, name, unitId FROM tenants ORDER BY createdAt"
+SQL_ALIASES = """
+    SELECT senderName, tenantKey, unitId
+    FROM payments
+    WHERE senderName IS NOT NULL AND unitId != '' AND status != 'PENDING'
+    ORDER BY paidAt
+"""
+SQL_RAW = """
+    SELECT rawSms FROM payments WHERE rawSms IS NOT NULL
+    UNION ALL
+    SELECT rawSms FROM expenses WHERE rawSms IS NOT NULL
+"""
+SQL_INSERT_PAYMENT = """
+    INSERT INTO payments (tenantKey, unitId, month, paidAt, amount, senderName, source, status,
+                          statusOverride, rawSms, createdAt)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+"""
+SQL_INSERT_EXPENSE = """
+    INSERT INTO expenses (spentAt, amount, category, memo, unitId, month, source, rawSms, createdAt)
+    VALUES (?, ?, 'OTHER', ?, NULL, ?, ?, ?, ?)
+"""
+
+
+class IngestError(Exception):
+    pass
+
+
+class Transaction(NamedTuple):
+    kind: str  # "입금" | "출금"
+    at: int  # epoch ms
+    amount: int
+    name: Optional[str]  # 입금자명 / 받는 분
+    raw: str  # rawSms에 저장할 원문
+    source: str  # Room PaymentSource/ExpenseSource: SMS | MANUAL
+
+
+def epoch_ms(year: int, month: int, day: int, hour: int = 0, minute: int = 0) -> int:
+    """문자/거래내역의 시각은 서울 시간 (원장의 월과 같은 기준)"""
+    return int(datetime(year, month, day, hour, minute, tzinfo=SEOUL).timestamp()) * 1000
+
+
+def message_hash(raw: str) -> bytes:
+    return hashlib.sha1(" ".join(raw.split()).encode()).digest()
+
+
+def parse_amount(text: str) -> int:
+    return int(text.replace(",", ""))
+
+
+def parse_sms(text: str, year: int, source: str = "SMS") -> Optional[Transaction]:
+    """카카오뱅크 입출금 문자 하나 -> Transaction (다른 문자면 None)"""
+    flat = " ".join(text.split())
+    when = DATETIME_RE.search(flat)
+    if when is None:
+        return None
+    if "입금" in flat:
+        kind, amount, name = "입금", DEPOSIT_RE.search(flat), SENDER_RE.search(flat)
+    elif "출금" in flat:
+        kind, amount, name = "출금", WITHDRAWAL_RE.search(flat), COUNTERPARTY_RE.search(flat)
+    else:
+        return None
+    if amount is None:
+        return None
+    month, day, hour, minute = map(int, when.groups())
+    try:
+        at = epoch_ms(year, month, day, hour, minute)
+    except (OverflowError, ValueError):
+        return None
+    return Transaction(kind, at, parse_amount(amount.group(1)), name.group(1).strip() if name else None,
+                       text.strip(), source)
+
+
+def sms_messages(lines: Iterable[str]) -> Iterator[Tuple[Optional[tuple], str]]:
+    """줄 -> (날짜 접두어 또는 None, 문자 원문). 여러 줄 문자는 다음 문자가 시작될 때까지 이어 붙인다."""
+    stamp, parts = None, []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        m = STAMP_RE.match(line)
+        body = line[m.end():] if m else line
+        # 날짜 줄, [Web발신] 줄, [Web발신] 바로 다음이 아닌 [카카오뱅크] 줄 = 다음 문자
+        if parts and (m or body.startswith("[Web발신]")
+                      or (body.startswith("[카카오뱅크]") and parts != ["[Web발신]"])):
+            yield stamp, "\n".join(parts)
+            parts = []
+        if not parts:
+            stamp = tuple(map(int, m.groups())) if m else None
+        parts.append(body)
+    if parts:
+        yield stamp, "\n".join(parts)
+
+
+def read_sms(lines: Iterable[str], year: int) -> Iterator[Optional[Transaction]]:
+    """문자 백업(텍스트) -> Transaction. 입출금 문자가 아니면 None."""
+    last_month = None
+    for stamp, text in sms_messages(lines):
+        if stamp:
+            year = stamp[0]
+        else:
+            when = DATETIME_RE.search(text)
+            if when:
+                month = int(when.group(1))
+                if last_month is not None and month < last_month:
+                    year += 1  # 12월 -> 1월
+                last_month = month
+        yield parse_sms(text, year)
+
+
+def find_column(header: List[str], *names: str) -> Optional[int]:
+    """머리행에서 열 찾기: 이름이 같은 열 먼저, 없으면 이름을 포함하는 열"""
+    keys = [h.replace(" ", "").lower() for h in header]
+    for exact in (True, False):
+        for name in names:
+            for i, key in enumerate(keys):
+                if key == name if exact else name in key:
+                    return i
+    return None
+
+
+def parse_csv_date(text: str) -> Optional[int]:
+    text = text.strip()
+    if text.isdigit() and len(text) >= 12:  # 문자 백업 앱의 epoch ms
+        return int(text)
+    m = CSV_DATE_RE.search(text)
+    if m is None:
+        return None
+    y, mo, d, h, mi = (int(v) if v else 0 for v in m.groups())
+    try:
+        return epoch_ms(y, mo, d, h, mi)
+    except (OverflowError, ValueError):
+        return None
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Optional[Transaction]]:
+    """은행 거래내역 CSV 또는 문자 백업 CSV -> Transaction. 쓸 수 없는 행이면 None."""
+    rows = csv.reader(lines)
+    header = next(rows, None)
+    if not header:
+        raise IngestError("empty CSV")
+    date_col = find_column(header, "거래일시", "거래일자", "일시", "일자", "date")
+    body_col = find_column(header, "body", "본문", "문자")
+    if date_col is None:
+        raise IngestError(f"CSV needs a date column (거래일시/date): {header}")
+    if body_col is not None:
+        for row in rows:
+            at = parse_csv_date(row[date_col]) if len(row) > max(date_col, body_col) else None
+            yield parse_sms(row[body_col], datetime.fromtimestamp(at / 1000, SEOUL).year) if at else None
+        return
+
+    kind_col = find_column(header, "구분", "입출금", "type")
+    amount_col = find_column(header, "거래금액", "금액", "amount")
+    in_col = find_column(header, "입금액", "맡기신금액")
+    out_col = find_column(header, "출금액", "찾으신금액")
+    name_col = find_column(header, "내용", "적요", "기재내용", "받는분", "보낸분", "name", "memo")
+    if amount_col is None and in_col is None:
+        raise IngestError(f"CSV needs an amount column (거래금액 or 입금액/출금액): {header}")
+
+    def cell(row, col):
+        return row[col].strip() if col is not None and col < len(row) else ""
+
+    occurrences = Counter()  # 같은 행이 파일에서 몇 번째인지 (중복 방지 키에 넣음)
+    for row in rows:
+        at = parse_csv_date(cell(row, date_col))
+        try:
+            if in_col is not None:
+                deposit = parse_amount(cell(row, in_col).rstrip("원") or "0")
+                withdrawal = parse_amount(cell(row, out_col).rstrip("원") or "0")
+                kind, amount = ("입금", deposit) if deposit else ("출금", withdrawal)
+            else:
+                amount = parse_amount(cell(row, amount_col).rstrip("원").replace("+", ""))
+                kind = cell(row, kind_col)
+                kind = "출금" if "출금" in kind or (not kind and amount < 0) else "입금"
+                amount = abs(amount)
+        except ValueError:
+            yield None
+            continue
+        if at is None or amount <= 0:
+            yield None
+            continue
+        raw = ",".join(c.strip() for c in row)
+        occurrences[raw] += 1
+        if occurrences[raw] > 1:
+            raw += f" #{occurrences[raw]}"
+        yield Transaction(kind, at, amount, cell(row, name_col) or None, raw, "MANUAL")
+
+
+def normalize_name(name: str) -> str:
+    return NAME_NOISE_RE.sub("", name)
+
+
+class MatchIndex:
+    """입금자명/금액 -> (tenantKey, unitId, 상태, 찾은 방법). DB에서 한 번 만들고 딕셔너리로만 찾는다."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.rent = {}  # unitId -> 월세
+        self.rooms = {}  # "201" -> unitId
+        self.by_rent = {}  # 월세 -> [임대중 unitId]
+        for unit_id, room_no, status, price in conn.execute(SQL_UNITS):
+            rent = monthly_rent(price)
+            self.rent[unit_id] = rent
+            self.rooms[str(room_no)] = unit_id
+            if status == "RENTED" and rent:
+                self.by_rent.setdefault(rent, []).append(unit_id)
+        self.current = {}  # unitId -> 현재 임차인 tenantKey (나중에 등록된 쪽)
+        self.names = {}  # 이름 -> {unitId: tenantKey}
+        for tenant_key, name, unit_id in conn.execute(SQL_TENANTS):
+            self.current[unit_id] = tenant_key
+            self.names.setdefault(normalize_name(name), {})[unit_id] = tenant_key
+        self.aliases = {}  # 확인된 입금자명 -> (tenantKey, unitId), 최근 납부가 이김
+        for sender, tenant_key, unit_id in conn.execute(SQL_ALIASES):
+            name = normalize_name(sender)
+            if name:
+                self.aliases[name] = (tenant_key, unit_id)
+
+    def _find(self, sender: Optional[str], amount: int) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        if sender:
+            room = ROOM_RE.search(sender)
+            if room and room.group(1) in self.rooms:
+                unit_id = self.rooms[room.group(1)]
+                return self.current.get(unit_id), unit_id, "room"
+            name = normalize_name(sender)
+            if name in self.aliases:
+                return (*self.aliases[name], "alias")
+            candidates = self.names.get(name, {})
+            if len(candidates) > 1:  # 동명이인: 입금액이 월세와 같은 세대
+                candidates = {u: k for u, k in candidates.items() if self.rent.get(u) == amount}
+            if len(candidates) == 1:
+                (unit_id, tenant_key), = candidates.items()
+                return tenant_key, unit_id, "name"
+        units = self.by_rent.get(amount, [])
+        if len(units) == 1:
+            return self.current.get(units[0]), units[0], "rent"
+        return None, None, None
+
+    def match(self, sender: Optional[str], amount: int) -> Tuple[Optional[str], str, str, str]:
+        tenant_key, unit_id, how = self._find(sender, amount)
+        if unit_id is None:
+            return None, "", "PENDING", "none"
+        rent = self.rent.get(unit_id)
+        if how == "rent" or not rent:
+            status = "PENDING"
+        else:
+            status = "PAID" if amount >= rent else "PARTIAL"
+        return tenant_key, unit_id, status, how
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest(conn: sqlite3.Connection, transactions: Iterable[Optional[Transaction]], dry_run: bool = False,
+           batch: int = BATCH) -> dict:
+    """Transaction들을 트랜잭션 하나로 넣고 건수를 돌려준다. dry_run이면 끝에 롤백.
+
+    conn은 쓰기 가능한 autocommit 커넥션(`isolation_level=None`, `open_writer()`). 색인과 기존 해시는
+    쓰기 잠금(BEGIN IMMEDIATE)을 잡은 뒤 읽으므로 그 사이에 다른 쓰기가 끼어들지 않는다.
+    """
+    t0 = time.perf_counter()
+    now = int(time.time() * 1000)
+    counts = Counter()
+    by_status, by_match = Counter(), Counter()
+    unmatched = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        index = MatchIndex(conn)
+        seen = {message_hash(raw) for (raw,) in conn.execute(SQL_RAW)}
+        for chunk in batched(transactions, batch):
+            payments, expenses = [], []
+            for t in chunk:
+                counts["read"] += 1
+                if t is None:
+                    counts["skipped"] += 1
+                    continue
+                digest = message_hash(t.raw)
+                if digest in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(digest)
+                month = month_of_epoch_ms(t.at)
+                if t.kind == "입금":
+                    tenant_key, unit_id, status, how = index.match(t.name, t.amount)
+                    by_status[status] += 1
+                    by_match[how] += 1
+                    if how == "none" and len(unmatched) < MAX_UNMATCHED:
+                        unmatched.append({"paidAt": t.at, "amount": t.amount, "senderName": t.name})
+                    payments.append((tenant_key, unit_id, month, t.at, t.amount, t.name, t.source, status,
+                                     t.raw, now))
+                else:
+                    expenses.append((t.at, t.amount, t.name or "", month, t.source, t.raw, now))
+            conn.executemany(SQL_INSERT_PAYMENT, payments)
+            conn.executemany(SQL_INSERT_EXPENSE, expenses)
+            counts["payments"] += len(payments)
+            counts["expenses"] += len(expenses)
+        conn.execute("ROLLBACK" if dry_run else "COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return {
+        "read": counts["read"],
+        "payments": counts["payments"],
+        "expenses": counts["expenses"],
+        "duplicates": counts["duplicates"],
+        "skipped": counts["skipped"],
+        "byStatus": dict(by_status),
+        "byMatch": dict(by_match),
+        "unmatched": unmatched,
+        "dryRun": dry_run,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp949")  # 국내 은행 CSV는 대개 EUC-KR/CP949
+
+
+def detect_format(text: str) -> str:
+    first = next((line for line in text.splitlines() if line.strip()), "")
+    return "csv" if "," in first and not DATETIME_RE.search(first) else "sms"
+
+
+def read_transactions(text: str, fmt: str = "auto", year: Optional[int] = None) -> Iterator[Optional[Transaction]]:
+    """입력 텍스트 -> Transaction 제너레이터 (fmt: sms | csv | auto)"""
+    if fmt == "auto":
+        fmt = detect_format(text)
+    lines = iter(text.splitlines())
+    if fmt == "csv":
+        return read_csv(lines)
+    if fmt == "sms":
+        return read_sms(lines, year or datetime.now(SEOUL).year)
+    raise IngestError(f"unknown format: {fmt}")
+
+
+def open_writer(path: str, timeout: float = 30.0) -> sqlite3.Connection:
+    """쓰기용 커넥션 (브리지 풀은 읽기 전용). 트랜잭션은 ingest()가 직접 연다."""
+    if not os.path.exists(path):
+        raise IngestError(f"database not found: {path}")
+    return sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+
+
+def main():
+    import argparse
+    import json
+    import sys
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="+", help="문자 백업(텍스트) 또는 거래내역 CSV, '-'는 표준 입력")
+    ap.add_argument("--db", default=os.getenv("DATABASE_URL", "/data/pinehill.db"))
+    ap.add_argument("--format", choices=["auto", "sms", "csv"], default="auto")
+    ap.add_argument("--year", type=int, default=None, help="날짜 없는 문자 백업의 첫 연도 (기본: 올해)")
+    ap.add_argument("--dry-run", action="store_true", help="매칭 결과만 보고 DB에는 넣지 않음")
+    args = ap.parse_args()
+
+    def transactions():
+        for path in args.files:
+            data = sys.stdin.buffer.read() if path == "-" else open(path, "rb").read()
+            yield from read_transactions(decode(data), args.format, args.year)
+
+    conn = open_writer(args.db)
+    try:
+        result = ingest(conn, transactions(), dry_run=args.dry_run)
+    except IngestError as e:
+        sys.exit(f"error: {e}")
+    finally:
+        conn.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
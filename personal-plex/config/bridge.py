@@ -1,15 +1,439 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Path, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from collections import deque
 import sqlite3
+import asyncio
+import gzip
+import hashlib
+import hmac
 import json
-from typing import Optional, List
+import queue
+import re
+import threading
+import time
+import zlib
+import httpx
+from typing import Callable, Optional, List, Union
 import os
 
-app = FastAPI(title="Pinehill Bridge", version="1.0.0")
+try:
+    import orjson  # 있으면 JSON 인코딩이 몇 배 빠름
+except ImportError:
+    orjson = None
+
+from bank_ingest import IngestError, decode, ingest, open_writer, read_transactions
+from ledger import Ledger, current_month
+from llm_tools import ConversationCache, ToolError, build_tools, compact
+from replica import ReplicaConflict, ReplicaError, apply_changeset, open_replica, replica_state
+from sheets_sync import SheetsError, SheetsSync, read_tables
+
+DB_PATH = os.getenv("DATABASE_URL", "/data/pinehill.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))  # = 동시에 도는 쿼리 수 (DB 전용 스레드 수)
+DB_QUEUE_MAX = int(os.getenv("DB_QUEUE_MAX", "256"))  # 이보다 많이 기다리면 503
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "5"))  # 초, 큐 대기 포함
+GOOGLE_SHEET_URL = os.getenv("GOOGLE_SHEET_URL", "")
+SHEETS_SYNC_INTERVAL = float(os.getenv("SHEETS_SYNC_INTERVAL", "60"))  # 초
+DB_WATCH_INTERVAL = float(os.getenv("DB_WATCH_INTERVAL", "0.5"))  # 초, DB 변경 감지 주기
+INGEST_MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(32 * 1024 * 1024)))  # 입금 가져오기 본문 상한
+REPLICA_MAX_BYTES = int(os.getenv("REPLICA_MAX_BYTES", str(64 * 1024 * 1024)))  # changeset 상한 (gzip은 푼 크기)
+BRIDGE_TOKEN = os.getenv("BRIDGE_TOKEN", "")  # 쓰기 API(복제 적용, 입금 가져오기)의 Bearer 토큰, 없으면 쓰기 거부
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))  # 이보다 큰 응답만 gzip
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))  # DB 세대당 보관할 응답 수
+SUMMARY_MAX_MONTHS = int(os.getenv("SUMMARY_MAX_MONTHS", "120"))  # /api/summary 기간 상한 (달 수)
+TOOL_CACHE_CONVERSATIONS = int(os.getenv("TOOL_CACHE_CONVERSATIONS", "256"))
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "3600"))  # 초, 마지막 호출 기준
+TOOL_DEDUP = os.getenv("TOOL_DEDUP", "on") == "on"  # 같은 대화의 같은 결과는 ref만 보냄
+SHEETS_CHECKPOINT = os.getenv("SHEETS_CHECKPOINT", os.path.join(os.path.dirname(DB_PATH), "sheets_sync.json"))
+
+
+class ConnectionPool:
+    """워커 프로세스별 읽기 전용 SQLite 커넥션 풀.
+
+    커넥션은 필요할 때 최대 `size`개까지 만들고 재사용한다. `mode=ro` + `query_only`라서
+    브리지가 DB를 바꿀 일은 없고, row_factory와 statement 캐시는 커넥션마다 한 번만 설정된다
+    (같은 SQL 문자열이면 sqlite3가 컴파일된 statement를 재사용).
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()  # (epoch, conn)
+        self._created = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro",
+            uri=True,
+            check_same_thread=False,  # 풀에서 꺼낸 스레드가 바뀔 수 있음 (한 번에 한 스레드만 사용)
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _checkout(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+                epoch = self._epoch
+            if create:
+                try:
+                    return epoch, self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # 모두 사용 중이면 반납될 때까지 대기. reset() 이전 커넥션은 반납될 때 큐로 오지 않고 닫혀
+            # 자리만 비므로, 큐만 기다리지 말고 잠깐마다 새로 열 수 있는지 다시 본다
+            try:
+                return self._idle.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    @contextmanager
+    def connection(self):
+        epoch, conn = self._checkout()
+        while epoch != self._epoch:  # reset() 이전 커넥션: 예전 파일을 보고 있음
+            self._discard(conn)
+            epoch, conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            if epoch == self._epoch:
+                self._idle.put((epoch, conn))
+            else:
+                self._discard(conn)
+
+    def _discard(self, conn: sqlite3.Connection):
+        conn.close()
+        with self._lock:
+            self._created -= 1
+
+    def reset(self):
+        """DB 파일이 통째로 바뀌었을 때: 열린 커넥션은 반납되는 대로 닫고 새로 연다."""
+        with self._lock:
+            self._epoch += 1
+        self.close_idle()
+
+    def close_idle(self):
+        while True:
+            try:
+                _, conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+pool = ConnectionPool(DB_PATH, DB_POOL_SIZE + 1)  # +1: 백그라운드 Sheets 동기화용
+
+
+def prepare_db(path: str):
+    """브리지용 DB 설정. 파일에 저장되는 설정이라 DB 파일마다 한 번이면 된다.
+
+    - WAL: 앱/동기화 쪽 쓰기가 브리지의 읽기를 막지 않는다.
+    - payments (month, status, amount), expenses (month, amount) 인덱스: 기간/상태 조회와
+      월별 집계가 테이블을 읽지 않고 인덱스만으로 끝난다. Room 스키마에 없는 인덱스라 이름에
+      bridge_를 붙인다.
+
+    볼륨이 읽기 전용이거나 DB가 아직 없으면 그냥 넘어간다.
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS bridge_payments_month_status ON payments (month, status, amount)")
+            conn.execute("CREATE INDEX IF NOT EXISTS bridge_expenses_month ON expenses (month, amount)")
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class DataVersionWatcher:
+    """DB 변경 감지. `check()`는 DB가 바뀔 때마다 올라가는 세대 번호를 돌려준다.
+
+    `check()`는 stat/PRAGMA에 파일이 바뀌면 prepare_db(쓰기 커넥션, CREATE INDEX)까지 하므로
+    이벤트 루프에서 부르지 않는다. `start()`가 띄운 스레드가 주기적으로 확인해 `generation`에
+    올려 두고, 핸들러는 그 값만 읽는다. 브리지가 직접 쓴 뒤(입금 가져오기, 복제 적용)에는 그
+    스레드에서 바로 `check()`를 불러 다음 요청부터 새 세대가 보이게 한다.
+
+    `PRAGMA data_version`은 커넥션마다 따로 세는 값이라 풀 커넥션끼리 비교할 수 없다. 그래서
+    쓰기를 하지 않는 전용 커넥션 하나로만 읽는다(다른 커넥션/프로세스의 커밋이면 값이 바뀜).
+    폰에서 DB 파일을 통째로 복사해 교체하면 기존 커넥션은 예전 파일을 계속 보므로, 파일
+    inode도 함께 보고 바뀌었으면 prepare_db를 다시 하고 다시 연결하며 풀도 리셋한다.
+
+    세대 번호는 프로세스마다 따로 세므로 ETag에는 `tag_of(generation)`을 쓴다. 세대가 올라갈 때
+    DB/WAL 파일 상태(inode, 크기, mtime)로 만든 값이라 같은 파일을 보는 워커끼리, 재시작한 뒤에도
+    같다. 다른 프로세스의 쓰기는 다음 확인(`DB_WATCH_INTERVAL`, 기본 0.5초)까지 안 보이므로 그 사이
+    워커마다 태그가 잠깐 다를 수 있고, 그동안의 재검증은 304 대신 200을 받는다.
+    """
+
+    TAGS_KEPT = 16  # 진행 중인 요청이 잡고 있을 만한 최근 세대 수
+
+    def __init__(self, path: str, pool: ConnectionPool):
+        self.path = path
+        self.pool = pool
+        self.generation = 0
+        self._tags = {}
+        self._conn = None
+        self._file = None
+        self._seen = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _file_id(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_dev
+
+    def _state_tag(self) -> str:
+        parts = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if path != self.path and not st.st_size:
+                continue  # 빈 WAL은 커넥션이 열리고 닫힐 때 생겼다 지워진다
+            parts.append(f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}")
+        return hashlib.blake2b("|".join(parts).encode(), digest_size=6).hexdigest()
+
+    @property
+    def file_id(self):
+        """마지막으로 확인한 DB 파일의 (inode, device). 파일을 통째로 바꾸면 달라진다."""
+        return self._file
+
+    def tag_of(self, generation: int) -> Optional[str]:
+        """세대의 파일 상태 태그 (오래된 세대면 None)."""
+        return self._tags.get(generation)
+
+    def check(self) -> int:
+        with self._lock:
+            file_id = self._file_id()
+            if file_id != self._file:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                    self.pool.reset()
+                self._file = file_id
+                self._seen = None
+                prepare_db(self.path)
+            try:
+                if self._conn is None:
+                    self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+                version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn, version = None, None
+            if version is None or version != self._seen:
+                self._seen = version
+                # 태그를 먼저 넣어 둬야 새 세대를 읽은 핸들러가 바로 찾는다
+                self._tags[self.generation + 1] = self._state_tag()
+                self._tags.pop(self.generation + 1 - self.TAGS_KEPT, None)
+                self.generation += 1
+            return self.generation
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                pass  # 볼륨이 잠깐 안 보이는 등: 다음 주기에 다시 확인
+
+    def start(self, interval: float):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="db-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+db_watcher = DataVersionWatcher(DB_PATH, pool)
+
+
+class _Job:
+    __slots__ = ("lock", "started", "abandoned", "conn")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = False
+        self.abandoned = False
+        self.conn = None
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+class DBExecutor:
+    """DB 작업 전용 스레드 풀 (스레드 수 = 커넥션 수).
+
+    async 핸들러는 쿼리를 `await db_executor.run(fn, ...)`로 넘긴다. `fn(conn, ...)`은 풀 커넥션을
+    받아 DB 스레드에서 돈다. 동시에 도는 쿼리는 `workers`개까지이고 나머지는 큐에서 기다린다.
+    - 큐 길이가 `queue_max`이면 새 요청은 바로 503 + Retry-After (버스트가 스레드/커넥션을 늘리지 않음)
+    - 제출부터 `timeout`초가 지나면 504. 아직 큐에 있으면 실행하지 않고, 실행 중이면
+      `conn.interrupt()`로 쿼리를 끊는다.
+    `metrics()`는 큐 깊이, 대기/실행 시간 분포와 거절/시간 초과 수를 돌려준다.
+    """
+
+    def __init__(self, pool: ConnectionPool, workers: int, queue_max: int, timeout: float):
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.queue_max = queue_max
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.counts = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "errors": 0, "maxQueued": 0}
+        self._waits = deque(maxlen=4096)  # 큐 대기 시간 (초)
+        self._runs = deque(maxlen=4096)  # 실행 시간 (초)
+
+    def _work(self, job: _Job, submitted_at: float, fn, args):
+        with job.lock:
+            if job.abandoned:  # 기다리다 시간 초과된 요청: 실행하지 않음
+                return None
+            job.started = True
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self._waits.append(started - submitted_at)
+        try:
+            with self.pool.connection() as conn:
+                with job.lock:
+                    job.conn = conn
+                try:
+                    return fn(conn, *args)
+                finally:
+                    with job.lock:  # 풀에 돌려주기 전에: 이후 interrupt()가 다른 요청의 쿼리를 끊지 않게
+                        job.conn = None
+        finally:
+            with self._lock:
+                self.running -= 1
+                self._runs.append(time.perf_counter() - started)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queued >= self.queue_max:
+                self.counts["rejected"] += 1
+                raise HTTPException(status_code=503, detail="DB queue full", headers={"Retry-After": "1"})
+            self.queued += 1
+            self.counts["submitted"] += 1
+            self.counts["maxQueued"] = max(self.counts["maxQueued"], self.queued)
+        job = _Job()
+        future = self._executor.submit(self._work, job, time.perf_counter(), fn, args)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with job.lock:
+                if job.started:
+                    if job.conn is not None:
+                        job.conn.interrupt()
+                else:
+                    job.abandoned = True
+            with self._lock:
+                if not job.started:
+                    self.queued -= 1
+                self.counts["timeouts"] += 1
+            raise HTTPException(status_code=504, detail=f"query took longer than {self.timeout:g}s")
+        except HTTPException:
+            raise
+        except Exception as e:
+            with self._lock:
+                self.counts["errors"] += 1
+            raise HTTPException(status_code=500, detail=str(e))
+        with self._lock:
+            self.counts["completed"] += 1
+        return result
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits, runs = list(self._waits), list(self._runs)
+            out = {"workers": self.workers, "queued": self.queued, "running": self.running,
+                   "queueMax": self.queue_max, **self.counts}
+        out["waitMs"] = {"p50": round(percentile(waits, 50) * 1000, 2), "p99": round(percentile(waits, 99) * 1000, 2)}
+        out["runMs"] = {"p50": round(percentile(runs, 50) * 1000, 2), "p99": round(percentile(runs, 99) * 1000, 2)}
+        return out
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+db_executor = DBExecutor(pool, DB_POOL_SIZE, DB_QUEUE_MAX, DB_QUERY_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await asyncio.to_thread(db_watcher.check)  # prepare_db + 첫 세대
+    db_watcher.start(DB_WATCH_INTERVAL)
+    if sheets_worker:
+        sheets_worker.start()
+    yield
+    if sheets_worker:
+        sheets_worker.stop()
+    db_watcher.stop()
+    await tool_client.aclose()
+    db_executor.shutdown()
+    pool.close_idle()
+
+
+app = FastAPI(title="Pinehill Bridge", version="1.0.0", lifespan=lifespan)
+
 
 def get_db_connection():
-    db_path = os.getenv("DATABASE_URL", "/data/pinehill.db")
-    return sqlite3.connect(db_path)
+    """풀에서 커넥션을 빌린다: `with get_db_connection() as conn: ...`
+
+    핸들러에서는 쓰지 말고 `db_executor.run()`으로 넘긴다 (백그라운드 스레드 전용).
+    """
+    return pool.connection()
+
+
+# 쿼리 문자열은 상수로 두어 커넥션별 statement 캐시가 그대로 재사용되게 한다
+SQL_UNITS = "SELECT unitId, roomNo, floor, status, roomType, targetPrice FROM units"
+SQL_UNIT = "SELECT * FROM units WHERE unitId = ?"
+SQL_PAYMENTS_BY_MONTH = """
+    SELECT unitId, month, status, amount, paidAt
+    FROM payments
+    WHERE month = ?
+"""
+SQL_PAYMENT_STATS = """
+    SELECT
+        COUNT(CASE WHEN status = 'PAID' THEN 1 END) as paid_count,
+        COUNT(CASE WHEN status = 'PENDING' THEN 1 END) as pending_count,
+        COUNT(CASE WHEN status = 'UNPAID' THEN 1 END) as unpaid_count,
+        SUM(amount) as total_paid
+    FROM payments
+    WHERE month = ?
+"""
+SQL_EXPENSE_STATS = """
+    SELECT SUM(amount) as total_expense, COUNT(*) as expense_count
+    FROM expenses
+    WHERE month = ?
+"""
+
 
 class UnitStatus(BaseModel):
     unitId: str
@@ -24,122 +448,648 @@ class PaymentInfo(BaseModel):
     month: str
     status: str
     amount: int
-    paidAt: Optional[str]
+    paidAt: Optional[int]  # 입금 시각 (epoch ms, Room의 Long)
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class GenerationCache:
+    """DB 세대별 결과 캐시. 더 새로운 세대(`db_watcher.generation`)가 오면 통째로 비운다.
+
+    세대는 늘기만 한다. 바뀌는 순간 예전 세대를 잡고 시작한 요청이 아직 돌고 있을 수 있는데,
+    이 요청은 캐시를 못 쓸 뿐 비우지는 않는다 (두 세대가 번갈아 비우면 캐시가 계속 헛돈다).
+    """
+
+    def __init__(self, max_entries: int = 0):
+        self.max_entries = max_entries  # 0 = 제한 없음
+        self._generation = None
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, generation: int):
+        with self._lock:
+            if self._generation is None or generation > self._generation:
+                self._generation = generation
+                self._data = {}
+            elif generation < self._generation:
+                return None
+            return self._data.get(key)
+
+    def put(self, key: str, generation: int, value):
+        with self._lock:
+            if generation == self._generation:
+                if self.max_entries and len(self._data) >= self.max_entries:
+                    self._data.pop(next(iter(self._data)))  # 가장 먼저 넣은 것부터
+                self._data[key] = value
+
+
+summary_cache = GenerationCache()
+response_cache = GenerationCache(RESPONSE_CACHE_SIZE)
+INSTANCE = os.urandom(4).hex()  # 태그가 없는 세대용: 다른 워커의 세대 번호와 겹치지 않게
+
+
+def make_etag(generation: int, variant: str = "") -> str:
+    """DB 파일 상태 태그로 만든 ETag라 워커/재시작과 무관하다 (DataVersionWatcher 참고)."""
+    tag = db_watcher.tag_of(generation) or f"{INSTANCE}-{generation}"
+    return f'W/"{tag}{"-" + variant if variant else ""}"'
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+def encode_entry(conn: sqlite3.Connection, render: Callable[[sqlite3.Connection], bytes]):
+    body = render(conn)
+    return body, gzip.compress(body, 6) if len(body) >= GZIP_MIN_SIZE else None
+
+
+async def cached_response(request: Request, generation: int, render: Callable[[sqlite3.Connection], bytes],
+                          media_type: str = "application/json", variant: str = "") -> Response:
+    """DB 세대 기반 조건부 응답.
+
+    ETag는 (DB 파일 상태[, variant])라서 DB가 그대로면 어느 워커든 If-None-Match에 304를 돌려준다. 본문은
+    URL별로 세대가 바뀔 때까지 인코딩된 바이트(큰 것은 gzip본까지)로 보관한다. 날짜처럼 DB 밖의
+    값에 따라 결과가 달라지면 variant에 넣는다. render(conn)과 gzip은 DB 스레드에서 돈다.
+    """
+    etag = make_etag(generation, variant)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    key = f"{request.url.path}?{request.url.query}#{variant}"
+    entry = response_cache.get(key, generation)
+    if entry is None:
+        entry = await db_executor.run(encode_entry, render)
+        # 렌더링 전에 잡은 세대로 저장: 그 사이 DB가 바뀌었으면 다음 check()에서 버려진다
+        response_cache.put(key, generation, entry)
+    body, compressed = entry
+    if compressed is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        body = compressed
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def gzip_stream(chunks):
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip 헤더
+    async for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok", "service": "pinehill-bridge"}
 
 @app.get("/api/units", response_model=List[UnitStatus])
-def get_units():
+async def get_units(request: Request):
     """모든 세대 현황 조회"""
-    try:
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT unitId, roomNo, floor, status, roomType, targetPrice FROM units")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [UnitStatus(
-            unitId=row["unitId"],
-            roomNo=row["roomNo"],
-            floor=row["floor"],
-            status=row["status"],
-            roomType=row["roomType"],
-            targetPrice=row["targetPrice"]
-        ) for row in rows]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    def render(conn):
+        return dumps([dict(row) for row in conn.execute(SQL_UNITS)])
+
+    return await cached_response(request, db_watcher.generation, render)
 
 @app.get("/api/units/{unit_id}/status")
-def get_unit_status(unit_id: str):
+async def get_unit_status(request: Request, unit_id: str = Path(..., description="세대 ID (예: PINE-201)")):
     """특정 세대 상세 조회"""
-    try:
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM units WHERE unitId = ?", (unit_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
+    def render(conn):
+        row = conn.execute(SQL_UNIT, (unit_id,)).fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Unit not found")
-        
-        return dict(row)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return dumps(dict(row))
+
+    return await cached_response(request, db_watcher.generation, render)
 
 @app.get("/api/payments/{month}", response_model=List[PaymentInfo])
-def get_payments_by_month(month: str):
+async def get_payments_by_month(request: Request, month: str = Path(..., description="청구 월 (YYYY-MM)")):
     """월별 납부 현황 조회 (YYYY-MM)"""
-    try:
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT unitId, month, status, amount, paidAt 
-            FROM payments 
-            WHERE month = ?
-        """, (month,))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [PaymentInfo(
-            unitId=row["unitId"],
-            month=row["month"],
-            status=row["status"],
-            amount=row["amount"],
-            paidAt=row["paidAt"]
-        ) for row in rows]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    def render(conn):
+        return dumps([dict(row) for row in conn.execute(SQL_PAYMENTS_BY_MONTH, (month,))])
+
+    return await cached_response(request, db_watcher.generation, render)
+
+def monthly_summary(conn: sqlite3.Connection, month: str, generation: int) -> dict:
+    cached = summary_cache.get(month, generation)
+    if cached is not None:
+        return cached
+    # 납부 통계
+    payment_stats = conn.execute(SQL_PAYMENT_STATS, (month,)).fetchone()
+    # 지출 통계
+    expense_stats = conn.execute(SQL_EXPENSE_STATS, (month,)).fetchone()
+
+    summary = {
+        "month": month,
+        "payments": {
+            "paid": payment_stats[0],
+            "pending": payment_stats[1],
+            "unpaid": payment_stats[2],
+            "totalAmount": payment_stats[3] or 0
+        },
+        "expenses": {
+            "totalAmount": expense_stats[0] or 0,
+            "count": expense_stats[1]
+        }
+    }
+    summary_cache.put(month, generation, summary)
+    return summary
+
 
 @app.get("/api/summary/{month}")
-def get_monthly_summary(month: str):
-    """월별 요약 통계"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # 납부 통계
-        cursor.execute("""
-            SELECT 
-                COUNT(CASE WHEN status = 'PAID' THEN 1 END) as paid_count,
-                COUNT(CASE WHEN status = 'PENDING' THEN 1 END) as pending_count,
-                COUNT(CASE WHEN status = 'UNPAID' THEN 1 END) as unpaid_count,
-                SUM(amount) as total_paid
-            FROM payments 
-            WHERE month = ?
-        """, (month,))
-        payment_stats = cursor.fetchone()
-        
-        # 지출 통계
-        cursor.execute("""
-            SELECT SUM(amount) as total_expense, COUNT(*) as expense_count
-            FROM expenses 
-            WHERE month = ?
-        """, (month,))
-        expense_stats = cursor.fetchone()
-        
-        conn.close()
-        
-        return {
-            "month": month,
-            "payments": {
-                "paid": payment_stats[0],
-                "pending": payment_stats[1],
-                "unpaid": payment_stats[2],
-                "totalAmount": payment_stats[3] or 0
-            },
-            "expenses": {
-                "totalAmount": expense_stats[0] or 0,
-                "count": expense_stats[1]
-            }
+async def get_monthly_summary(request: Request, month: str = Path(..., description="월 (YYYY-MM)")):
+    """월별 요약 통계 (DB가 바뀌기 전까지는 캐시에서 바로 응답)"""
+    generation = db_watcher.generation
+    return await cached_response(request, generation, lambda conn: dumps(monthly_summary(conn, month, generation)))
+
+MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+NDJSON_CHUNK = 500
+PAYMENT_STATUSES = {"PAID", "PARTIAL", "UNPAID", "PENDING"}  # Room PaymentStatus
+FROM_DOC = "시작 월 (YYYY-MM)"
+TO_DOC = "끝 월 (YYYY-MM, 생략하면 from과 같음)"
+
+# 기간 요약: 납부/지출을 UNION ALL로 합쳐 월별로 한 번에 집계
+SQL_SUMMARY_RANGE = """
+    SELECT
+        month,
+        COUNT(CASE WHEN kind = 'p' AND status = 'PAID' THEN 1 END) as paid_count,
+        COUNT(CASE WHEN kind = 'p' AND status = 'PENDING' THEN 1 END) as pending_count,
+        COUNT(CASE WHEN kind = 'p' AND status = 'UNPAID' THEN 1 END) as unpaid_count,
+        SUM(CASE WHEN kind = 'p' THEN amount END) as total_paid,
+        SUM(CASE WHEN kind = 'e' THEN amount END) as total_expense,
+        COUNT(CASE WHEN kind = 'e' THEN 1 END) as expense_count
+    FROM (
+        SELECT 'p' as kind, month, status, amount FROM payments WHERE month BETWEEN ? AND ?
+        UNION ALL
+        SELECT 'e' as kind, month, NULL, amount FROM expenses WHERE month BETWEEN ? AND ?
+    )
+    GROUP BY month
+"""
+# 한 행을 SQLite(json_object)가 바로 JSON 한 줄로 만든다: 행마다 dict + json.dumps보다 몇 배 빠름.
+# (month, unitId, paymentId) 키셋으로 NDJSON_CHUNK 행씩 끊어 읽어 청크 사이에 커넥션을 잡지 않는다.
+SQL_PAYMENTS_RANGE = """
+    SELECT month, unitId, paymentId,
+        json_object('unitId', unitId, 'month', month, 'status', status, 'amount', amount, 'paidAt', paidAt)
+    FROM payments
+    WHERE month BETWEEN ? AND ?{status_filter} AND (month, unitId, paymentId) > (?, ?, ?)
+    ORDER BY month, unitId, paymentId
+    LIMIT ?
+"""
+
+
+def month_range(start: str, end: str) -> List[str]:
+    """"2024-11" ~ "2025-02" -> ["2024-11", "2024-12", "2025-01", "2025-02"]"""
+    y, m = map(int, start.split("-"))
+    out = []
+    while True:
+        month = f"{y:04d}-{m:02d}"
+        if month > end:
+            return out
+        out.append(month)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def parse_range(start: str, end: Optional[str], max_months: int = 0):
+    end = end or start
+    if not MONTH_RE.match(start or "") or not MONTH_RE.match(end) or start > end:
+        raise HTTPException(status_code=400, detail="from/to must be YYYY-MM with from <= to")
+    (y0, m0), (y1, m1) = map(int, start.split("-")), map(int, end.split("-"))
+    if max_months and (y1 - y0) * 12 + m1 - m0 >= max_months:
+        raise HTTPException(status_code=400, detail=f"from/to may span at most {max_months} months")
+    return start, end
+
+
+def summary_from_row(month: str, row) -> dict:
+    """SQL_SUMMARY_RANGE 한 행(없으면 None) -> /api/summary/{month}와 같은 모양"""
+    return {
+        "month": month,
+        "payments": {
+            "paid": row["paid_count"] if row else 0,
+            "pending": row["pending_count"] if row else 0,
+            "unpaid": row["unpaid_count"] if row else 0,
+            "totalAmount": (row["total_paid"] if row else None) or 0
+        },
+        "expenses": {
+            "totalAmount": (row["total_expense"] if row else None) or 0,
+            "count": row["expense_count"] if row else 0
         }
+    }
+
+
+def ndjson(items) -> bytes:
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+@app.get("/api/summary")
+async def get_summary_range(request: Request, start: str = Query(..., alias="from", description=FROM_DOC),
+                      end: Optional[str] = Query(None, alias="to", description=TO_DOC)):
+    """기간 요약 통계 (JSON Lines, 한 줄에 한 달). 데이터가 없는 달도 0으로 포함.
+
+    예: /api/summary?from=2025-01&to=2025-12 -> 올해 수납 추이를 한 번에
+    """
+    start, end = parse_range(start, end, SUMMARY_MAX_MONTHS)  # 빈 달도 한 줄씩 만들므로 기간에 상한
+    months = month_range(start, end)
+    generation = db_watcher.generation
+
+    def render(conn):
+        cached = [summary_cache.get(month, generation) for month in months]
+        if any(c is None for c in cached):
+            rows = {row["month"]: row for row in conn.execute(SQL_SUMMARY_RANGE, (start, end, start, end))}
+            cached = []
+            for month in months:
+                summary = summary_from_row(month, rows.get(month))
+                summary_cache.put(month, generation, summary)
+                cached.append(summary)
+        return ndjson(cached)
+
+    # 많아야 SUMMARY_MAX_MONTHS 줄이라 스트리밍(줄마다 스레드 왕복)보다 한 번에 보내는 편이 빠르다
+    return await cached_response(request, generation, render, media_type="application/x-ndjson")
+
+
+@app.get("/api/payments")
+async def get_payments_range(request: Request, start: str = Query(..., alias="from", description=FROM_DOC),
+                       end: Optional[str] = Query(None, alias="to", description=TO_DOC),
+                       status: Optional[str] = Query(None, description="상태, 쉼표로 여러 개 (PAID,PARTIAL,UNPAID,PENDING)")):
+    """기간 납부 내역 (JSON Lines, 월/세대 순). status는 쉼표로 여러 개: status=UNPAID,PARTIAL"""
+    start, end = parse_range(start, end)
+    statuses = [s.strip().upper() for s in (status or "").split(",") if s.strip()]
+    if not set(statuses) <= PAYMENT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {sorted(PAYMENT_STATUSES)}")
+    sql = SQL_PAYMENTS_RANGE.format(
+        status_filter=f" AND status IN ({','.join('?' * len(statuses))})" if statuses else "")
+    params = (start, end, *statuses)
+    # 길이가 정해지지 않은 스트림이라 본문은 캐시하지 않고 ETag/304만
+    etag = make_etag(db_watcher.generation)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    def fetch(conn, after):
+        return conn.execute(sql, (*params, *after, NDJSON_CHUNK)).fetchall()
+
+    async def rows():
+        after = ("", "", 0)
+        while True:
+            chunk = await db_executor.run(fetch, after)
+            if not chunk:
+                return
+            yield "".join(row[3] + "\n" for row in chunk).encode()
+            if len(chunk) < NDJSON_CHUNK:
+                return
+            after = tuple(chunk[-1][:3])
+
+    body = rows()
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+ledger = Ledger()
+
+
+def current_ledger(conn: sqlite3.Connection, generation: int) -> Ledger:
+    """DB가 바뀌었으면 새 납부 행만 원장에 반영하고 돌려준다 (복제로 기존 행이 고쳐졌거나 DB 파일이
+    바뀌었으면 다시 계산)"""
+    if ledger.generation != generation:
+        ledger.refresh(conn, generation, epoch=(db_watcher.file_id, replica_state(conn)["rewrites"]))
+    return ledger
+
+
+AS_OF_DOC = "기준 월 (YYYY-MM, 생략하면 서울 기준 이번 달)"
+
+
+def parse_as_of(as_of: Optional[str]) -> str:
+    as_of = as_of or current_month()
+    if not MONTH_RE.match(as_of):
+        raise HTTPException(status_code=400, detail="asOf must be YYYY-MM")
+    return as_of
+
+
+@app.get("/api/arrears")
+async def get_arrears(request: Request, as_of: Optional[str] = Query(None, alias="asOf", description=AS_OF_DOC),
+                include_all: bool = Query(False, alias="all", description="연체 없는 세대도 포함")):
+    """임대중 세대 연체 현황 (기준 월까지 월세 합 - 받은 금액 합), 연체액 큰 순.
+
+    세대별 누계에서 바로 계산하므로 납부 이력 길이와 상관없이 세대 수만큼만 든다.
+    all=true면 연체 없는 세대(선납은 arrears 0)도 포함.
+    """
+    as_of = parse_as_of(as_of)
+    generation = db_watcher.generation
+
+    def render(conn):
+        units = current_ledger(conn, generation).arrears(as_of, include_all)
+        return dumps({
+            "asOf": as_of,
+            "totalArrears": sum(u["arrears"] for u in units),
+            "units": units
+        })
+
+    # asOf를 생략하면 달이 바뀔 때 결과도 바뀌므로 기준 월을 ETag에 넣는다
+    return await cached_response(request, generation, render, variant=as_of)
+
+
+@app.get("/api/units/{unit_id}/ledger")
+async def get_unit_ledger(request: Request, unit_id: str = Path(..., description="세대 ID (예: PINE-201)"),
+                    as_of: Optional[str] = Query(None, alias="asOf", description=AS_OF_DOC)):
+    """세대 월별 원장: 달마다 청구/입금/누적 잔액"""
+    as_of = parse_as_of(as_of)
+    generation = db_watcher.generation
+
+    def render(conn):
+        statement = current_ledger(conn, generation).statement(unit_id, as_of)
+        if statement is None:
+            raise HTTPException(status_code=404, detail="Unit not found or rent unknown")
+        return dumps(statement)
+
+    return await cached_response(request, generation, render, variant=as_of)
+
+
+class SheetsWorker:
+    """DB가 바뀔 때마다 Google Sheets에 반영하는 백그라운드 스레드 (GOOGLE_SHEET_URL이 있을 때만)"""
+
+    def __init__(self, syncer: SheetsSync, interval: float):
+        self.syncer = syncer
+        self.interval = interval
+        self.synced_generation = None
+        self.status = {"lastSyncAt": None, "lastResult": None, "lastError": None}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self, force: bool = False) -> Optional[dict]:
+        """DB가 마지막 동기화 이후 바뀌었으면(force면 항상) diff를 보낸다"""
+        with self._lock:
+            generation = db_watcher.check()
+            if not force and generation == self.synced_generation:
+                return None
+            # 스냅샷만 읽고 커넥션은 바로 반납: 네트워크 대기 중에 풀을 잡지 않음
+            with get_db_connection() as conn:
+                tables = read_tables(conn)
+            try:
+                result = self.syncer.push(tables)
+            except Exception as e:
+                self.status["lastError"] = str(e)
+                raise
+            self.synced_generation = generation
+            self.status.update(lastSyncAt=int(time.time() * 1000), lastResult=result, lastError=None)
+            return result
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception:
+                pass  # status["lastError"]에 남기고 다음 주기에 다시 시도
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sheets-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+sheets_worker = SheetsWorker(SheetsSync(GOOGLE_SHEET_URL, SHEETS_CHECKPOINT), SHEETS_SYNC_INTERVAL) \
+    if GOOGLE_SHEET_URL else None
+
+
+@app.get("/api/sync/sheets")
+async def get_sheets_sync_status():
+    """Google Sheets 동기화 상태"""
+    if not sheets_worker:
+        return {"enabled": False}
+    return {"enabled": True, "interval": sheets_worker.interval, **sheets_worker.status}
+
+
+@app.post("/api/sync/sheets")
+async def run_sheets_sync():
+    """바뀐 행을 지금 바로 시트에 반영 (주기를 기다리지 않음)"""
+    if not sheets_worker:
+        raise HTTPException(status_code=503, detail="GOOGLE_SHEET_URL is not set")
+    try:
+        # 스냅샷 읽기와 시트 요청이 모두 블로킹이라 스레드에서
+        return await asyncio.to_thread(sheets_worker.sync, True)
+    except SheetsError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def require_token(request: Request):
+    """쓰기 API는 `Authorization: Bearer <BRIDGE_TOKEN>`이 있어야 한다. BRIDGE_TOKEN이 없으면 모두 거부.
+
+    포트가 공유기 안 전체에 열려 있으므로, 토큰 없이는 누구나 납부를 넣거나 테이블을 바꿀 수 있다.
+    """
+    if not BRIDGE_TOKEN:
+        raise HTTPException(status_code=403, detail="write endpoints are disabled: set BRIDGE_TOKEN")
+    given = request.headers.get("authorization", "").encode()
+    if not hmac.compare_digest(given, f"Bearer {BRIDGE_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="invalid or missing bearer token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+async def read_body(request: Request, limit: int) -> bytes:
+    """요청 본문을 limit 바이트까지만 받는다. 넘으면 다 받기 전에 413"""
+    too_large = HTTPException(status_code=413, detail=f"body exceeds {limit} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+
+def gunzip(data: bytes, limit: int) -> bytes:
+    """gzip 본문을 limit 바이트까지만 푼다. 넘으면 413 (작은 gzip 폭탄이 메모리를 다 쓰지 않게)"""
+    z = zlib.decompressobj(wbits=31)
+    out = z.decompress(data, limit + 1)
+    if len(out) > limit:
+        raise HTTPException(status_code=413, detail=f"decompressed body exceeds {limit} bytes")
+    if not z.eof:
+        raise ValueError("truncated gzip body")
+    return out
+
+
+@app.post("/api/ingest/bank")
+async def ingest_bank(request: Request,
+                      fmt: str = Query("auto", alias="format", description="sms | csv | auto"),
+                      year: Optional[int] = Query(None, description="날짜 없는 문자 백업의 첫 연도 (기본: 올해)"),
+                      dry_run: bool = Query(False, alias="dryRun", description="매칭 결과만 보고 넣지 않음")):
+    """입출금 문자 백업/은행 거래내역 CSV(요청 본문)를 payments/expenses에 넣는다 (bank_ingest.py)
+
+    풀은 읽기 전용이라 쓰기 커넥션을 따로 연다. 이미 있는 문자는 건너뛰므로 다시 보내도 된다.
+    본문이 INGEST_MAX_BYTES보다 크면 413 (나눠서 보낸다). 납부를 넣으므로 BRIDGE_TOKEN 필요.
+    """
+    require_token(request)
+    text = decode(await read_body(request, INGEST_MAX_BYTES))
+
+    def run():
+        conn = open_writer(DB_PATH)
+        try:
+            if not dry_run and replica_state(conn)["source"]:
+                # 폰에서 복제 중인 DB: 여기서 넣은 행은 paymentId가 폰과 겹치고 다음 full 스냅샷에 지워진다
+                raise HTTPException(status_code=409, detail="DB is replicated from the phone; "
+                                                            "ingest there or use dryRun")
+            result = ingest(conn, read_transactions(text, fmt, year), dry_run=dry_run)
+        finally:
+            conn.close()
+        if not dry_run:
+            db_watcher.check()  # 감시 주기를 기다리지 않고 다음 요청부터 새 세대로
+        return result
+
+    try:
+        return await asyncio.to_thread(run)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.OperationalError as e:  # 다른 쓰기가 오래 잡고 있거나 볼륨이 읽기 전용
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.get("/api/replica")
+async def get_replica_state():
+    """폰 -> 브리지 복제 상태: 마지막으로 적용한 changeset의 source(폰 DB ID)와 version"""
+    if not os.path.exists(DB_PATH):
+        return replica_state(None)
+    return await db_executor.run(replica_state)
+
+
+@app.post("/api/replica/changeset")
+async def apply_replica_changeset(request: Request):
+    """폰이 보낸 changeset(JSON, `Content-Encoding: gzip` 가능)을 트랜잭션 하나로 적용 (replica.py)
+
+    base가 브리지 version과 이어지지 않으면 409와 현재 상태를 돌려준다. 폰은 그 version부터 다시 보낸다.
+    본문은 받은 크기도, gzip을 푼 크기도 REPLICA_MAX_BYTES까지 (넘으면 413). BRIDGE_TOKEN 필요.
+    """
+    require_token(request)
+    body = await read_body(request, REPLICA_MAX_BYTES)
+    try:
+        if request.headers.get("content-encoding") == "gzip":
+            body = gunzip(body, REPLICA_MAX_BYTES)
+        changeset = json.loads(body)
+    except (zlib.error, ValueError):
+        raise HTTPException(status_code=400, detail="body must be a JSON changeset")
+
+    def run():
+        conn = open_replica(DB_PATH)
+        try:
+            result = apply_changeset(conn, changeset)
+        finally:
+            conn.close()
+        db_watcher.check()
+        return result
+
+    try:
+        return await asyncio.to_thread(run)
+    except ReplicaConflict as e:
+        raise HTTPException(status_code=409, detail={"msg": str(e), **e.state})
+    except ReplicaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.OperationalError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# LLM 도구: 라우트에서 만든 목록 + 짧은 결과 형식 (llm_tools.py)
+TOOL_EXCLUDE = {"get_sheets_sync_status", "list_tools", "get_metrics", "get_replica_state"}
+tool_cache = ConversationCache(TOOL_CACHE_CONVERSATIONS, TOOL_CACHE_TTL)
+# 도구 호출은 같은 앱에 HTTP 없이 내부 요청으로 보낸다: 검증/캐시/ETag를 라우트와 그대로 공유
+tool_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bridge",
+                                headers={"Accept-Encoding": "identity"})
+_tools = None
+
+
+def get_tools():
+    global _tools
+    if _tools is None:  # 모든 라우트가 등록된 뒤 첫 호출에서 만든다
+        _tools = build_tools(app, TOOL_EXCLUDE)
+    return _tools
+
+
+class ToolCall(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = None
+    arguments: Union[dict, str, None] = None
+    function: Optional[dict] = None  # OpenAI tool_calls[i]를 그대로 보내도 됨
+    conversationId: Optional[str] = None
+
+
+@app.get("/api/tools")
+async def list_tools():
+    """LLM 함수 호출용 도구 목록 (OpenAI `tools` 형식, Ollama /api/chat에 그대로 전달)"""
+    return {"tools": [tool.spec() for tool in get_tools().values()]}
+
+
+@app.post("/api/tools/call")
+async def call_tool(call: ToolCall):
+    """도구 실행 -> `role: tool` 메시지 (content는 짧은 키의 JSON 문자열)"""
+    name, args = call.name, call.arguments
+    if call.function:
+        name, args = call.function.get("name", name), call.function.get("arguments", args)
+    if isinstance(args, str):
+        try:
+            args = json.loads(args) if args.strip() else {}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="arguments must be a JSON object")
+    args = args or {}
+    tool = get_tools().get(name)
+    if tool is None:
+        raise HTTPException(status_code=404, detail=f"unknown tool: {name}")
+
+    def message(content: str) -> dict:
+        return {"role": "tool", "tool_call_id": call.id, "name": name, "content": content}
+
+    try:
+        path, query = tool.request(args)
+    except ToolError as e:
+        return message(dumps({"err": 400, "msg": str(e)}).decode())
+    key = f"{path}?{sorted(query.items())}"
+    cached = tool_cache.get(call.conversationId, key) if call.conversationId else None
+    headers = {"If-None-Match": cached[0]} if cached and cached[0] else {}
+
+    r = await tool_client.get(path, params=query, headers=headers)
+    if r.status_code == 304 and cached:
+        etag, content, ref = cached
+        if TOOL_DEDUP:
+            return message(dumps({"same": ref, "note": f"DB 변경 없음, 결과 #{ref} 그대로"}).decode())
+        return message(content)
+    if r.status_code != 200:
+        try:
+            detail = r.json().get("detail")
+        except ValueError:
+            detail = r.text
+        return message(dumps({"err": r.status_code, "msg": detail}).decode())
+
+    if r.headers.get("content-type", "").startswith("application/x-ndjson"):
+        data = [json.loads(line) for line in r.text.splitlines() if line]
+    else:
+        data = r.json()
+    result = compact(name, data)
+
+    def render(ref: int) -> str:
+        return dumps({"ref": ref, **result} if isinstance(result, dict) else {"ref": ref, "data": result}).decode()
+
+    if not call.conversationId:
+        return message(dumps(result).decode())
+    return message(tool_cache.put(call.conversationId, key, r.headers.get("etag"), render))
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """DB 실행기 상태: 큐 깊이, 대기/실행 시간(p50/p99), 거절(503)/시간 초과(504) 수"""
+    return {"db": db_executor.metrics(), "dbGeneration": db_watcher.generation}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,188 @@
+"""세대별 임대료 원장 (미납/연체 계산).
+
+세대마다 월세(`targetPrice` "보증금-월세", 만원 단위)와 원장 시작 월을 두고, 받은 금액을 누적해
+둔다. 시작 월은 현재 임차인(가장 나중에 등록된 임차인)의 입주 월: 그 임차인 앞으로 기록된 첫 납부
+월과 임차인 등록 월 중 빠른 쪽이다. 공실 기간이나 이전 임차인 몫을 청구하지 않도록 그보다 앞선
+납부도 세지 않는다. 임차인이 없는 세대만 그 세대의 첫 납부 월부터 센다.
+연체액 = 시작 월부터 기준 월까지의 월세 합 - 시작 월 이후 받은 금액 합.
+
+받은 금액: PAID/PARTIAL은 기록된 금액 그대로, PENDING(확인필요)도 돈은 들어온 것이라 센다 (매칭만
+확인 전). UNPAID는 금액이 있어도(사용자가 미납으로 고친 입금) 세지 않는다.
+
+누계는 납부 행이 추가될 때 증분으로 갱신한다: `refresh()`는 마지막으로 반영한 paymentId
+이후의 행만 읽고, 이미 반영한 행은 다시 세지 않는다. 기존 행을 고치거나 지우는 쪽(replica.py의
+rewrites, DB 파일 교체)이 알려 주는 `epoch`가 바뀌면 처음부터 다시 계산한다. 마지막으로 반영한 행이
+없어졌거나 달라졌으면(더 오래된 DB로 바뀜) 그것도 다시 계산한다 (PK 조회 한 번). 세대/임차인 정보는
+작아서 매번 다시 읽는다.
+
+월은 Asia/Seoul 기준이다 (컨테이너의 로컬 시간대는 보통 UTC).
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    SEOUL = ZoneInfo("Asia/Seoul")
+except (ImportError, KeyError):  # tzdata 없음: 1988년 이후 서머타임이 없어 고정 +9로 충분
+    SEOUL = timezone(timedelta(hours=9), "Asia/Seoul")
+
+SQL_UNITS = "SELECT unitId, status, targetPrice FROM units"
+SQL_TENANTS = "SELECT unitId, tenantKey, name, createdAt FROM tenants ORDER BY createdAt"
+RECEIVED = "CASE WHEN status = 'UNPAID' THEN 0 ELSE COALESCE(amount, 0) END"  # 받은 금액으로 세는 몫
+SQL_LAST = f"SELECT unitId, month, {RECEIVED} FROM payments WHERE paymentId = ?"
+SQL_NEW_PAYMENTS = f"""
+    SELECT paymentId, unitId, tenantKey, month, {RECEIVED}
+    FROM payments
+    WHERE paymentId > ?
+    ORDER BY paymentId
+"""
+
+
+def monthly_rent(target_price: Optional[str]) -> Optional[int]:
+    """"500-50" -> 500000 (원). 형식이 다르면 None"""
+    try:
+        return int(str(target_price).split("-")[1].strip()) * 10_000
+    except (IndexError, ValueError):
+        return None
+
+
+def month_index(month: str) -> int:
+    y, m = month.split("-")
+    return int(y) * 12 + int(m) - 1
+
+
+def month_of_index(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def month_of_epoch_ms(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, SEOUL).strftime("%Y-%m")
+
+
+def current_month() -> str:
+    return datetime.now(SEOUL).strftime("%Y-%m")
+
+
+class Ledger:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.generation = None  # 마지막으로 반영한 DB 세대
+        self.epoch = None  # 마지막으로 반영한 기존 행 수정 번호
+        self.units: Dict[str, dict] = {}  # unitId -> {status, rent, tenant, tenantKey, tenantMonth}
+
+    def _reset(self):
+        self._last_id = 0
+        self._last_row = None  # 마지막으로 반영한 행의 (unitId, month, 받은 금액)
+        self._by_month: Dict[str, Dict[str, int]] = {}  # unitId -> {month: 받은 금액}
+        self._first: Dict[str, str] = {}  # unitId -> 첫 납부 기록 월
+        self._tenant_first: Dict[str, str] = {}  # tenantKey -> 그 임차인 앞으로 된 첫 납부 기록 월
+        self._last_paid: Dict[str, str] = {}  # unitId -> 마지막으로 돈이 들어온 월
+        self._since: Dict[str, Tuple[str, int]] = {}  # unitId -> (시작 월, 그 뒤 받은 금액), refresh마다 비움
+
+    def refresh(self, conn, generation=None, epoch=None):
+        """DB 변경 후 호출. 새 납부 행만 반영하고, epoch가 달라졌거나 마지막 행이 바뀌었으면 다시 계산."""
+        with self._lock:
+            if generation is not None and generation == self.generation:
+                return  # 다른 요청이 먼저 반영함
+            units = {}
+            for unit_id, status, price in conn.execute(SQL_UNITS):
+                units[unit_id] = {"status": status, "rent": monthly_rent(price), "tenant": None,
+                                  "tenantKey": None, "tenantMonth": None}
+            for unit_id, tenant_key, name, created_at in conn.execute(SQL_TENANTS):
+                if unit_id in units:  # 나중에 등록된 임차인이 덮어씀 = 현재 임차인
+                    units[unit_id].update(tenant=name, tenantKey=tenant_key,
+                                          tenantMonth=month_of_epoch_ms(created_at) if created_at else None)
+            self.units = units
+            self._since = {}
+
+            if epoch != self.epoch or (
+                    self._last_id and conn.execute(SQL_LAST, (self._last_id,)).fetchone() != self._last_row):
+                self._reset()  # 반영했던 행이 수정/삭제됨
+            self.epoch = epoch
+            for payment_id, unit_id, tenant_key, month, amount in conn.execute(SQL_NEW_PAYMENTS, (self._last_id,)):
+                self._apply(unit_id, tenant_key, month, amount)
+                self._last_id = payment_id
+                self._last_row = (unit_id, month, amount)
+            self.generation = generation
+
+    def _apply(self, unit_id: str, tenant_key: Optional[str], month: str, amount: int):
+        months = self._by_month.setdefault(unit_id, {})
+        months[month] = months.get(month, 0) + amount
+        if unit_id not in self._first or month < self._first[unit_id]:
+            self._first[unit_id] = month
+        if tenant_key and (tenant_key not in self._tenant_first or month < self._tenant_first[tenant_key]):
+            self._tenant_first[tenant_key] = month
+        if amount > 0 and month > self._last_paid.get(unit_id, ""):
+            self._last_paid[unit_id] = month
+
+    def _start(self, unit_id: str) -> Optional[str]:
+        """현재 임차인의 입주 월. 임차인이 없는 세대만 첫 납부 월."""
+        unit = self.units[unit_id]
+        if unit["tenantKey"] is None:
+            return self._first.get(unit_id)
+        months = [m for m in (self._tenant_first.get(unit["tenantKey"]), unit["tenantMonth"]) if m]
+        return min(months) if months else None
+
+    def _received_since(self, unit_id: str, start: str) -> int:
+        cached = self._since.get(unit_id)
+        if cached is None or cached[0] != start:
+            total = sum(a for m, a in self._by_month.get(unit_id, {}).items() if m >= start)
+            cached = self._since[unit_id] = (start, total)
+        return cached[1]
+
+    def balance(self, unit_id: str, as_of: str) -> Optional[dict]:
+        """한 세대의 원장 요약. 월세를 모르거나 기록이 전혀 없으면 None."""
+        unit = self.units.get(unit_id)
+        start = self._start(unit_id) if unit else None
+        if unit is None or unit["rent"] is None or start is None:
+            return None
+        months_due = max(0, month_index(as_of) - month_index(start) + 1)
+        expected = months_due * unit["rent"]
+        received = self._received_since(unit_id, start)
+        arrears = max(0, expected - received)
+        return {
+            "unitId": unit_id,
+            "tenant": unit["tenant"],
+            "status": unit["status"],
+            "monthlyRent": unit["rent"],
+            "since": start,
+            "expected": expected,
+            "received": received,
+            "arrears": arrears,
+            "monthsBehind": round(arrears / unit["rent"], 1),
+            "lastPaidMonth": self._last_paid.get(unit_id),
+        }
+
+    def arrears(self, as_of: str, include_all: bool = False) -> List[dict]:
+        """임대중 세대의 연체 현황, 연체액 큰 순. include_all이면 연체 없는 세대도 포함."""
+        with self._lock:
+            out = []
+            for unit_id, unit in self.units.items():
+                if unit["status"] != "RENTED":
+                    continue
+                row = self.balance(unit_id, as_of)
+                if row is not None and (include_all or row["arrears"] > 0):
+                    out.append(row)
+        out.sort(key=lambda r: (-r["arrears"], r["unitId"]))
+        return out
+
+    def statement(self, unit_id: str, as_of: str) -> Optional[dict]:
+        """월별 원장: 청구, 입금, 누적 잔액(+면 미납). 기준 월 이후 선납분은 마지막 달에 합산."""
+        with self._lock:
+            summary = self.balance(unit_id, as_of)
+            if summary is None:
+                return None
+            rent = summary["monthlyRent"]
+            end = month_index(as_of)
+            by_month = self._by_month.get(unit_id, {})
+            later = sum(amount for month, amount in by_month.items() if month_index(month) > end)
+            rows, running = [], 0
+            for index in range(month_index(summary["since"]), end + 1):
+                month = month_of_index(index)
+                received = by_month.get(month, 0) + (later if index == end else 0)
+                running += rent - received
+                rows.append({"month": month, "due": rent, "received": received, "balance": running})
+        return {**summary, "months": rows}
@@ -0,0 +1,246 @@
+"""LLM 함수 호출(Ollama/Open WebUI)용 도구 어댑터.
+
+브리지의 GET 라우트에서 OpenAI 형식 도구 목록을 만든다: 이름은 라우트 함수 이름, 설명은 docstring,
+인자는 path/query 파라미터(별칭, 타입, Query/Path의 description)에서 가져온다. 라우트를 추가하면
+도구도 따라 생긴다.
+
+도구 결과는 모델 컨텍스트에 그대로 들어가므로 짧게 만든다: 목록은 `cols` + `rows` 표 하나로, 키는
+짧게, 합계/상태별 건수는 미리 계산해서 넣고 긴 내역은 잘라낸다. CPU로 도는 Ollama에서는 프롬프트
+토큰 수가 곧 응답 시간이다.
+
+대화별 결과 캐시: 같은 대화에서 같은 호출이 다시 오면 ETag(If-None-Match)로 DB가 그대로인지만
+확인하고, 그대로면 결과를 다시 보내지 않고 앞 결과 번호(`ref`)만 돌려준다.
+"""
+
+import threading
+import time
+import typing
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+TOOL_MAX_ROWS = 30  # 내역을 그대로 보여줄 최대 행 수 (넘으면 요약만)
+
+
+class ToolError(Exception):
+    pass
+
+
+def param_schema(field) -> dict:
+    annotation = field.field_info.annotation
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    base = args[0] if args else annotation
+    schema = {"type": {bool: "boolean", int: "integer", float: "number"}.get(base, "string")}
+    if field.field_info.description:
+        schema["description"] = field.field_info.description
+    if not field.field_info.is_required() and field.default is not None:
+        schema["default"] = field.default
+    return schema
+
+
+class Tool:
+    def __init__(self, route):
+        self.route = route
+        self.name = route.name
+        self.path_params = route.dependant.path_params
+        self.query_params = route.dependant.query_params
+
+    def spec(self) -> dict:
+        fields = self.path_params + self.query_params
+        description = (self.route.description or self.route.summary or self.name).split("\n\n")[0]
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": " ".join(description.split()),
+                "parameters": {
+                    "type": "object",
+                    "properties": {f.alias: param_schema(f) for f in fields},
+                    "required": [f.alias for f in fields if f.field_info.is_required()],
+                },
+            },
+        }
+
+    def request(self, args: dict) -> Tuple[str, Dict[str, str]]:
+        """도구 인자 -> (경로, 쿼리 파라미터)"""
+        values = {}
+        for field in self.path_params:
+            if args.get(field.alias) in (None, ""):
+                raise ToolError(f"missing argument: {field.alias}")
+            values[field.alias] = quote(str(args[field.alias]), safe="")
+        path = self.route.path.format(**values)
+        query = {}
+        for field in self.query_params:
+            value = args.get(field.alias)
+            if value is None or value == "":
+                if field.field_info.is_required():
+                    raise ToolError(f"missing argument: {field.alias}")
+                continue
+            query[field.alias] = ("true" if value else "false") if isinstance(value, bool) else str(value)
+        return path, query
+
+
+def build_tools(app, exclude=()) -> Dict[str, Tool]:
+    """`/api/` 아래 GET 라우트 -> 도구 (exclude의 라우트 이름은 제외)"""
+    tools = {}
+    for route in app.routes:
+        if "GET" in (getattr(route, "methods", None) or ()) and route.path.startswith("/api/") \
+                and route.name not in exclude:
+            tools[route.name] = Tool(route)
+    return tools
+
+
+def table(items: List[dict], columns: List[Tuple[str, str]]) -> dict:
+    """[{...}, ...] -> {"cols": [짧은 이름...], "rows": [[...], ...]}"""
+    return {"cols": [short for short, _ in columns], "rows": [[it.get(key) for _, key in columns] for it in items]}
+
+
+def compact_units(units: List[dict]) -> dict:
+    return {
+        "n": len(units),
+        "byStatus": dict(Counter(u["status"] for u in units)),
+        **table(units, [("id", "unitId"), ("st", "status"), ("type", "roomType"), ("price", "targetPrice")]),
+    }
+
+
+def compact_unit(unit: dict) -> dict:
+    return {"id": unit.get("unitId"), "room": unit.get("roomNo"), "floor": unit.get("floor"),
+            "st": unit.get("status"), "type": unit.get("roomType"), "price": unit.get("targetPrice")}
+
+
+def compact_month_payments(rows: List[dict]) -> dict:
+    not_paid = [r for r in rows if r["status"] != "PAID"]
+    return {
+        "n": len(rows),
+        "sum": sum(r["amount"] or 0 for r in rows),
+        "byStatus": dict(Counter(r["status"] for r in rows)),
+        "notPaid": table(sorted(not_paid, key=lambda r: r["unitId"]),
+                         [("id", "unitId"), ("st", "status"), ("amt", "amount")]),
+    }
+
+
+def summary_row(s: dict) -> list:
+    p, e = s["payments"], s["expenses"]
+    return [s["month"], p["paid"], p["pending"], p["unpaid"], p["totalAmount"], e["totalAmount"],
+            p["totalAmount"] - e["totalAmount"]]
+
+
+SUMMARY_COLS = ["m", "paid", "pend", "unpaid", "in", "out", "net"]
+
+
+def compact_summary(s: dict) -> dict:
+    return dict(zip(SUMMARY_COLS, summary_row(s)), expN=s["expenses"]["count"])
+
+
+def compact_summary_range(months: List[dict]) -> dict:
+    rows = [summary_row(s) for s in months]
+    income, spent = sum(r[4] for r in rows), sum(r[5] for r in rows)
+    return {"in": income, "out": spent, "net": income - spent, "cols": SUMMARY_COLS, "rows": rows}
+
+
+def compact_payments_range(rows: List[dict]) -> dict:
+    by_month: Dict[str, Counter] = {}
+    sums: Dict[str, int] = {}
+    for r in rows:
+        by_month.setdefault(r["month"], Counter())[r["status"]] += 1
+        sums[r["month"]] = sums.get(r["month"], 0) + (r["amount"] or 0)
+    out = {
+        "n": len(rows),
+        "sum": sum(sums.values()),
+        "cols": ["m", "paid", "partial", "unpaid", "pend", "sum"],
+        "rows": [[m, c["PAID"], c["PARTIAL"], c["UNPAID"], c["PENDING"], sums[m]] for m, c in by_month.items()],
+    }
+    if len(rows) <= TOOL_MAX_ROWS:
+        out["items"] = table(rows, [("m", "month"), ("id", "unitId"), ("st", "status"), ("amt", "amount")])
+    return out
+
+
+def compact_arrears(data: dict) -> dict:
+    return {
+        "asOf": data["asOf"],
+        "total": data["totalArrears"],
+        "n": len(data["units"]),
+        **table(data["units"], [("id", "unitId"), ("name", "tenant"), ("rent", "monthlyRent"), ("owed", "arrears"),
+                                ("mo", "monthsBehind"), ("last", "lastPaidMonth")]),
+    }
+
+
+def compact_ledger(data: dict) -> dict:
+    months = data["months"]
+    shown = months[-TOOL_MAX_ROWS:]
+    out = {"id": data["unitId"], "name": data["tenant"], "rent": data["monthlyRent"], "since": data["since"],
+           "owed": data["arrears"], "mo": data["monthsBehind"]}
+    if len(months) > len(shown):
+        out["omitted"] = len(months) - len(shown)  # 앞쪽(오래된) 달은 생략
+    out.update(table(shown, [("m", "month"), ("due", "due"), ("in", "received"), ("bal", "balance")]))
+    return out
+
+
+COMPACT = {
+    "get_units": compact_units,
+    "get_unit_status": compact_unit,
+    "get_payments_by_month": compact_month_payments,
+    "get_monthly_summary": compact_summary,
+    "get_summary_range": compact_summary_range,
+    "get_payments_range": compact_payments_range,
+    "get_arrears": compact_arrears,
+    "get_unit_ledger": compact_ledger,
+}
+
+
+def compact(name: str, data):
+    """라우트 응답 -> 도구 결과. 전용 형식이 없으면 dict 목록만 표로 바꾼다."""
+    fn = COMPACT.get(name)
+    if fn is not None:
+        return fn(data)
+    if isinstance(data, list) and data and all(isinstance(d, dict) for d in data):
+        keys = list(data[0])
+        return {"n": len(data), **table(data, [(k, k) for k in keys])}
+    return data
+
+
+class ConversationCache:
+    """대화 ID -> {호출 키: (ETag, 결과 문자열, ref 번호)}. 오래 안 쓴 대화부터 버린다."""
+
+    def __init__(self, max_conversations: int = 256, ttl: float = 3600.0):
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self._data: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _conversation(self, conversation: str, create: bool = True) -> Optional[dict]:
+        now = time.monotonic()
+        # 지금 대화부터 꺼내 둔다: 가득 찼을 때 이 대화가 가장 오래됐다고 버려지면 ref 번호가 1부터 다시 붙는다
+        conv = self._data.pop(conversation, None)
+        if conv is not None and now - conv["t"] > self.ttl:
+            conv = None
+        room = 1 if conv is not None or create else 0  # 다시 넣을 자리
+        while self._data:  # 만료됐거나 자리가 없으면 가장 오래 안 쓴 대화부터 정리
+            oldest = next(iter(self._data.values()))
+            if now - oldest["t"] <= self.ttl and len(self._data) + room <= self.max_conversations:
+                break
+            self._data.popitem(last=False)
+        if conv is None:
+            if not create:  # 조회만으로는 빈 대화를 만들지 않는다 (다른 대화를 밀어내지 않게)
+                return None
+            conv = {"calls": {}, "n": 0, "t": now}
+        conv["t"] = now
+        self._data[conversation] = conv
+        return conv
+
+    def get(self, conversation: str, key: str) -> Optional[Tuple[str, str, int]]:
+        with self._lock:
+            conv = self._conversation(conversation, create=False)
+            return conv["calls"].get(key) if conv else None
+
+    def put(self, conversation: str, key: str, etag: Optional[str], render: Callable[[int], str]) -> str:
+        """새 ref 번호로 결과를 만들어(render(ref)) 저장하고 돌려준다"""
+        with self._lock:
+            conv = self._conversation(conversation)
+            conv["n"] += 1
+            content = render(conv["n"])
+            conv["calls"][key] = (etag, content, conv["n"])
+            return content
+
+    def __len__(self):
+        return len(self._data)
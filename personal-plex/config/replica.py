@@ -0,0 +1,320 @@
+"""폰(Room DB) -> 브리지 증분 복제 (행 버전 changeset).
+
+폰 앱(ChangeLog.kt)은 트리거로 `change_log`에 바뀐 행(테이블, 키, 삭제 여부)을 버전 번호와 함께
+남긴다. 행마다 마지막 변경 하나만 남기므로 살아 있는 행의 기록은 테이블 행 수보다 커지지 않지만, 지운 행의
+기록(삭제 표시)은 그대로 쌓인다. 브리지가 받았다고 확인한 version(push 응답) 이하의 삭제 표시는
+prune_change_log()로 지우고, 지운 범위는 change_log_pruned에 남긴다. changeset은 브리지가 마지막으로
+받은 버전 이후에 바뀐 행만 담는다:
+
+    {"format": "pinehill-changeset/1", "source": "<폰 DB ID>", "base": 120, "head": 135, "full": false,
+     "tables": {"payments": {"cols": [...], "rows": [[...], ...], "deleted": [123, ...]}, ...},
+     "schema": ["CREATE TABLE ...", ...]}   # full일 때만
+
+폰은 `GET /api/replica`로 브리지의 (source, version)을 보고, source가 자기 DB ID와 같으면 그 version
+이후만, 다르면(처음이거나 폰 DB를 새로 만든 경우) 전체 스냅샷(full)을 보낸다. 그 version이 정리한 범위
+안이면(브리지 DB를 백업에서 되돌린 경우 등) 빠진 삭제가 있을 수 있으므로 역시 전체 스냅샷을 보낸다. 보내는
+양은 DB 크기가 아니라 바뀐 행 수에 비례한다.
+
+브리지는 changeset 하나를 트랜잭션 하나(BEGIN IMMEDIATE)로 적용한다. WAL이라 읽는 쪽은 적용 전이나
+적용 후만 보고 중간 상태는 보지 않는다. 파일을 통째로 복사할 때처럼 쓰는 중인 파일을 읽을 일도 없다.
+- base가 브리지 version과 다르거나 source가 다르면 적용하지 않고 ReplicaConflict(현재 상태)를 낸다.
+- head가 이미 적용한 version 이하면 아무것도 하지 않는다 (같은 changeset을 다시 보내도 안전).
+- full이면 네 테이블을 비우고 스냅샷으로 채운다. 테이블이 없으면(빈 DB) schema로 만든다.
+
+`rewrites`는 이미 있던 납부 행을 고치거나 지운 적용마다 1씩 오른다. 원장(ledger.py)은 새 행만 더하므로
+이 값이 바뀌면 처음부터 다시 계산한다 (확인필요 입금에 세대를 지정하면 금액은 그대로이고 unitId만 바뀜).
+
+install_change_log()/export_changeset()/prune_change_log()는 ChangeLog.kt와 같은 일을 파이썬으로 한다
+(폰 DB 사본에서 보내거나 시험할 때).
+
+    python config/replica.py export phone.db --since 120 > changes.json
+    curl -H "Content-Type: application/json" -H "Authorization: Bearer $BRIDGE_TOKEN" \\
+        --data-binary @changes.json http://localhost:8001/api/replica/changeset
+    python config/replica.py prune phone.db 135     # 응답의 version
+"""
+
+import re
+import sqlite3
+import time
+from typing import List, Optional
+
+FORMAT = "pinehill-changeset/1"
+TABLES = {"units": "unitId", "tenants": "tenantKey", "payments": "paymentId", "expenses": "expenseId"}  # 부모 먼저
+
+SQL_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS bridge_replica (
+        source TEXT NOT NULL PRIMARY KEY,
+        version INTEGER NOT NULL,
+        rewrites INTEGER NOT NULL,
+        appliedAt INTEGER NOT NULL
+    )
+"""
+SQL_STATE = "SELECT source, version, rewrites, appliedAt FROM bridge_replica"
+SCHEMA_RE = re.compile(r"^\s*CREATE\s+(UNIQUE\s+)?(TABLE|INDEX)\s+(?!IF\s+NOT\s+EXISTS)", re.IGNORECASE)
+
+
+class ReplicaError(Exception):
+    pass
+
+
+class ReplicaConflict(ReplicaError):
+    """브리지 상태와 이어지지 않는 changeset. state를 보고 그 version부터(또는 full로) 다시 보낸다."""
+
+    def __init__(self, message: str, state: dict):
+        super().__init__(message)
+        self.state = state
+
+
+def replica_state(conn: Optional[sqlite3.Connection]) -> dict:
+    """마지막으로 적용한 changeset (복제한 적이 없거나 DB가 없으면(conn None) source None, version 0)"""
+    try:
+        row = conn.execute(SQL_STATE).fetchone() if conn is not None else None
+    except sqlite3.OperationalError:  # bridge_replica 테이블 없음
+        row = None
+    if row is None:
+        return {"source": None, "version": 0, "rewrites": 0, "appliedAt": None}
+    return dict(zip(("source", "version", "rewrites", "appliedAt"), row))
+
+
+def change_log_sql() -> List[str]:
+    """change_log 테이블/트리거 (ChangeLog.kt의 install()과 같은 SQL)"""
+    statements = [
+        "CREATE TABLE IF NOT EXISTS change_log (version INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "tbl TEXT NOT NULL, rowKey NOT NULL, deleted INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS change_log_row ON change_log (tbl, rowKey)",
+        "CREATE TABLE IF NOT EXISTS change_log_meta (dbId TEXT NOT NULL)",
+        "INSERT INTO change_log_meta (dbId) SELECT lower(hex(randomblob(8))) "
+        "WHERE NOT EXISTS (SELECT 1 FROM change_log_meta)",
+        "CREATE TABLE IF NOT EXISTS change_log_pruned (version INTEGER NOT NULL)",
+        "INSERT INTO change_log_pruned (version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM change_log_pruned)",
+    ]
+    for table, key in TABLES.items():
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS change_log_{table}_insert AFTER INSERT ON {table} BEGIN "
+            f"DELETE FROM change_log WHERE tbl = '{table}' AND rowKey = NEW.{key}; "
+            f"INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('{table}', NEW.{key}, 0); END",
+            f"CREATE TRIGGER IF NOT EXISTS change_log_{table}_update AFTER UPDATE ON {table} BEGIN "
+            f"DELETE FROM change_log WHERE tbl = '{table}' AND rowKey IN (OLD.{key}, NEW.{key}); "
+            f"INSERT INTO change_log (tbl, rowKey, deleted) SELECT '{table}', OLD.{key}, 1 "
+            f"WHERE OLD.{key} IS NOT NEW.{key}; "
+            f"INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('{table}', NEW.{key}, 0); END",
+            f"CREATE TRIGGER IF NOT EXISTS change_log_{table}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM change_log WHERE tbl = '{table}' AND rowKey = OLD.{key}; "
+            f"INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('{table}', OLD.{key}, 1); END",
+        ]
+    return statements
+
+
+def install_change_log(conn: sqlite3.Connection):
+    for sql in change_log_sql():
+        conn.execute(sql)
+
+
+def pruned_version(conn: sqlite3.Connection) -> int:
+    """이 version 이하의 삭제 표시는 정리됐다 (change_log_pruned가 없는 예전 DB는 0)"""
+    try:
+        return conn.execute("SELECT version FROM change_log_pruned").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def prune_change_log(conn: sqlite3.Connection, acked: int) -> int:
+    """브리지가 받은 version(acked) 이하의 삭제 표시를 지운다. 지운 개수를 돌려준다.
+
+    살아 있는 행의 기록은 증분 export가 행을 찾는 데 쓰므로 남긴다. 정리한 범위(change_log_pruned)보다
+    오래된 since로 export하면 전체 스냅샷이 된다.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        count = conn.execute("DELETE FROM change_log WHERE deleted = 1 AND version <= ?", (acked,)).rowcount
+        conn.execute("UPDATE change_log_pruned SET version = MAX(version, ?)", (acked,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return count
+
+
+def export_changeset(conn: sqlite3.Connection, since: int = 0, full: bool = False) -> dict:
+    """since 이후 바뀐 행(full이면 전체) -> changeset. 한 읽기 트랜잭션 안에서 읽는다.
+
+    since가 정리한 범위(prune_change_log) 안이면 빠진 삭제가 있을 수 있으므로 full로 만든다.
+    """
+    conn.execute("BEGIN")
+    try:
+        source = conn.execute("SELECT dbId FROM change_log_meta").fetchone()[0]
+        full = full or since < pruned_version(conn)
+        since = 0 if full else since
+        head = conn.execute("SELECT COALESCE(MAX(version), 0) FROM change_log").fetchone()[0]
+        tables = {}
+        for table, key in TABLES.items():
+            if full:
+                cur = conn.execute(f"SELECT * FROM {table}")
+            else:
+                cur = conn.execute(f"SELECT t.* FROM change_log c JOIN {table} t ON t.{key} = c.rowKey "
+                                   f"WHERE c.tbl = ? AND c.version > ? AND c.deleted = 0 ORDER BY c.version",
+                                   (table, since))
+            cols = [d[0] for d in cur.description]
+            rows = [list(r) for r in cur]
+            deleted = [] if full else [k for (k,) in conn.execute(
+                "SELECT rowKey FROM change_log WHERE tbl = ? AND version > ? AND deleted = 1", (table, since))]
+            if rows or deleted:
+                tables[table] = {"cols": cols, "rows": rows, "deleted": deleted}
+        changeset = {"format": FORMAT, "source": source, "base": since, "head": head, "full": full, "tables": tables}
+        if full:
+            names = ", ".join(f"'{t}'" for t in TABLES)
+            changeset["schema"] = [sql for (sql,) in conn.execute(
+                f"SELECT sql FROM sqlite_master WHERE type IN ('table', 'index') AND tbl_name IN ({names}) "
+                f"AND sql IS NOT NULL ORDER BY type DESC")]
+        return changeset
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def ensure_schema(conn: sqlite3.Connection, schema: List[str]):
+    """full 스냅샷의 CREATE TABLE/INDEX 중 없는 것만 만든다 (그 밖의 문장은 거부)"""
+    for sql in schema:
+        if not SCHEMA_RE.match(sql) or ";" in sql.rstrip().rstrip(";"):
+            raise ReplicaError(f"schema accepts only CREATE TABLE/INDEX: {sql[:80]}")
+        conn.execute(SCHEMA_RE.sub(lambda m: m.group(0) + "IF NOT EXISTS ", sql, count=1))
+
+
+def validate(changeset) -> dict:
+    if not isinstance(changeset, dict) or changeset.get("format") != FORMAT:
+        raise ReplicaError(f"format must be {FORMAT}")
+    if not isinstance(changeset.get("source"), str) or not changeset["source"]:
+        raise ReplicaError("source is required")
+    for field in ("base", "head"):
+        if not isinstance(changeset.get(field, 0), int):
+            raise ReplicaError(f"{field} must be an integer")
+    tables = changeset.get("tables") or {}
+    if not isinstance(tables, dict) or set(tables) - set(TABLES):
+        raise ReplicaError(f"tables must be a subset of {list(TABLES)}")
+    return tables
+
+
+def apply_changeset(conn: sqlite3.Connection, changeset: dict) -> dict:
+    """changeset을 트랜잭션 하나로 적용. conn은 쓰기 가능한 autocommit 커넥션 (`open_replica()`)."""
+    t0 = time.perf_counter()
+    tables = validate(changeset)
+    source, full = changeset["source"], bool(changeset.get("full"))
+    base, head = changeset.get("base", 0), changeset.get("head", 0)
+    upserted = deleted = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(SQL_STATE_TABLE)
+        current = replica_state(conn)
+        if not full:
+            if current["source"] != source:
+                raise ReplicaConflict("unknown source, send a full snapshot", current)
+            if head <= current["version"]:
+                conn.execute("ROLLBACK")
+                return {"applied": False, **current, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+            if base != current["version"]:
+                raise ReplicaConflict(f"base {base} does not follow bridge version {current['version']}", current)
+        if full:
+            ensure_schema(conn, changeset.get("schema") or [])
+        columns = {t: {r[1] for r in conn.execute(f"PRAGMA table_info({t})")} for t in TABLES}
+        if not all(columns.values()):
+            raise ReplicaError("database has no Pinehill tables, send a full snapshot with schema")
+        last_payment = conn.execute("SELECT COALESCE(MAX(paymentId), 0) FROM payments").fetchone()[0]
+        rewrote = full
+
+        # 지우기는 자식 테이블부터, 넣기/고치기는 부모 테이블부터
+        for table in reversed(list(TABLES)):
+            if full:
+                conn.execute(f"DELETE FROM {table}")
+                continue
+            keys = (tables.get(table) or {}).get("deleted") or []
+            if keys:
+                conn.executemany(f"DELETE FROM {table} WHERE {TABLES[table]} = ?", [(k,) for k in keys])
+                deleted += len(keys)
+                rewrote = rewrote or table == "payments"
+        for table, key in TABLES.items():
+            part = tables.get(table) or {}
+            cols, rows = part.get("cols") or [], part.get("rows") or []
+            if not rows:
+                continue
+            unknown = set(cols) - columns[table]
+            if unknown or key not in cols:
+                raise ReplicaError(f"{table}: unknown columns {sorted(unknown)} or missing key {key}")
+            if table == "payments" and not rewrote:
+                i = cols.index(key)
+                rewrote = any(row[i] <= last_payment for row in rows)
+            conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(cols)}) "
+                             f"VALUES ({', '.join('?' * len(cols))})", rows)
+            upserted += len(rows)
+
+        rewrites = current["rewrites"] + (1 if rewrote else 0)
+        now = int(time.time() * 1000)
+        conn.execute("DELETE FROM bridge_replica")
+        conn.execute("INSERT INTO bridge_replica VALUES (?, ?, ?, ?)", (source, head, rewrites, now))
+        conn.execute("COMMIT")
+    except (sqlite3.IntegrityError, sqlite3.ProgrammingError, TypeError) as e:
+        conn.execute("ROLLBACK")
+        raise ReplicaError(str(e))
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return {"applied": True, "source": source, "version": head, "rewrites": rewrites, "appliedAt": now,
+            "full": full, "upserted": upserted, "deleted": deleted,
+            "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+def open_replica(path: str, timeout: float = 30.0) -> sqlite3.Connection:
+    """복제 적용용 쓰기 커넥션. 파일이 없으면 만든다 (첫 full 스냅샷)."""
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def main():
+    import argparse
+    import json
+    import sys
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    ex = sub.add_parser("export", help="change_log가 있는 DB -> changeset JSON (표준 출력)")
+    ex.add_argument("db")
+    ex.add_argument("--since", type=int, default=0)
+    ex.add_argument("--full", action="store_true", help="전체 스냅샷")
+    ex.add_argument("--install", action="store_true", help="change_log 트리거가 없으면 설치")
+    pr = sub.add_parser("prune", help="브리지가 받은 version 이하의 삭제 표시 정리")
+    pr.add_argument("db")
+    pr.add_argument("acked", type=int, help="브리지 version (push 응답 또는 GET /api/replica)")
+    ap_apply = sub.add_parser("apply", help="changeset JSON -> 브리지 DB")
+    ap_apply.add_argument("db")
+    ap_apply.add_argument("changeset", help="JSON 파일, '-'는 표준 입력")
+    args = ap.parse_args()
+
+    if args.command == "export":
+        conn = sqlite3.connect(args.db, isolation_level=None)
+        try:
+            if args.install:
+                install_change_log(conn)
+            json.dump(export_changeset(conn, args.since, args.full), sys.stdout, ensure_ascii=False)
+        finally:
+            conn.close()
+        return
+    if args.command == "prune":
+        conn = sqlite3.connect(args.db, isolation_level=None)
+        try:
+            print(json.dumps({"pruned": prune_change_log(conn, args.acked)}))
+        finally:
+            conn.close()
+        return
+    changeset = json.load(sys.stdin if args.changeset == "-" else open(args.changeset, encoding="utf-8"))
+    conn = open_replica(args.db)
+    try:
+        print(json.dumps(apply_changeset(conn, changeset)))
+    except ReplicaConflict as e:
+        sys.exit(f"conflict: {e} (bridge: {json.dumps(e.state)})")
+    except ReplicaError as e:
+        sys.exit(f"error: {e}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""pinehill.db -> Google Sheets 동기화 (공유용 현황/납부 시트).
+
+rental-app-spec.md 대로 시트에는 요약/현황만 올린다: `현황` 탭(호실, 층, 상태, 타입, 희망가)과
+`납부` 탭(월, 호실, 상태, 입금액, 입금일; 한 세대의 한 달 납부는 한 행으로 합침). 임차인 이름,
+전화번호, SMS 원문은 올리지 않는다.
+
+동기화는 diff 기반이다. 체크포인트 파일(JSON)에 탭별로 `키 -> [시트 행 번호, 내용 해시]`를 두고,
+DB 스냅샷과 비교해 바뀐 행만 보낸다. 새 행은 빈 행(삭제된 키의 자리)부터 채우고 없으면 맨 아래에
+붙인다. 인접한 행은 한 범위로 묶고, 모든 범위를 `values:batchUpdate` 한 번(셀이 많으면 몇 번)으로
+보낸다. 요청 사이 간격은 분당 `SHEETS_RATE`회로 제한하고, 429/5xx/네트워크 오류는 지수 백오프로
+재시도한다. 체크포인트는 요청이 성공할 때마다 원자적으로 저장하므로 중간에 실패해도 다음 동기화가
+남은 행만 다시 보낸다.
+
+체크포인트 옆 `.lock` 파일의 flock으로 여러 워커(`uvicorn --workers N`)가 동시에 돌아도 한 번에
+하나만 동기화한다. fcntl이 없으면(Windows) 한 프로세스 안에서만 막는다.
+
+로컬 테스트: `python scripts/fake_sheets.py --port 9100` 을 띄우고
+
+    python config/sheets_sync.py --db data/pinehill.db --api-base http://127.0.0.1:9100/v4 \\
+        --sheet-url https://docs.google.com/spreadsheets/d/local-test/edit
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없음
+    fcntl = None
+
+from ledger import SEOUL
+
+SHEETS_API_BASE = os.getenv("SHEETS_API_BASE", "https://sheets.googleapis.com/v4")
+SHEETS_RATE = float(os.getenv("SHEETS_RATE", "50"))  # 분당 요청 수 (Sheets 쓰기 쿼터: 분당 60)
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+SHEETS_MAX_CELLS = int(os.getenv("SHEETS_MAX_CELLS", "40000"))  # batchUpdate 한 번에 보낼 셀 수 상한
+SHEETS_TIMEOUT = float(os.getenv("SHEETS_TIMEOUT", "30"))
+SCOPE = "https://www.googleapis.com/auth/spreadsheets"
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+_local_lock = threading.Lock()  # fcntl이 없을 때 _exclusive가 쓰는 잠금
+
+
+class SheetsError(Exception):
+    pass
+
+
+class Tab:
+    def __init__(self, name: str, header: List[str]):
+        self.name = name
+        self.header = header
+
+    def range(self, first_row: int, last_row: int) -> str:
+        return f"'{self.name}'!A{first_row}:{column_letter(len(self.header))}{last_row}"
+
+
+UNITS_TAB = Tab("현황", ["호실", "층", "상태", "타입", "희망가"])
+PAYMENTS_TAB = Tab("납부", ["월", "호실", "상태", "입금액", "입금일"])
+TABS = [UNITS_TAB, PAYMENTS_TAB]
+
+SQL_UNIT_ROWS = "SELECT unitId, floor, status, roomType, targetPrice FROM units"
+SQL_PAYMENT_ROWS = "SELECT month, unitId, status, amount, paidAt FROM payments ORDER BY paymentId"
+
+
+def column_letter(n: int) -> str:
+    """1 -> A, 27 -> AA"""
+    out = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        out = chr(65 + r) + out
+    return out
+
+
+def spreadsheet_id(url: str) -> str:
+    """https://docs.google.com/spreadsheets/d/<id>/edit -> <id> (id만 넘겨도 됨)"""
+    m = re.search(r"/spreadsheets/d/([A-Za-z0-9_-]+)", url)
+    return m.group(1) if m else url.strip()
+
+
+def read_tables(conn: sqlite3.Connection) -> Dict[str, Dict[str, list]]:
+    """DB 스냅샷 -> 탭 이름 -> {키: 행 값}. 납부는 (월, 호실)별로 합치고 상태는 마지막 행 기준."""
+    units = {}
+    for unit_id, floor, status, room_type, price in conn.execute(SQL_UNIT_ROWS):
+        units[unit_id] = [unit_id, floor, status, room_type or "", price or ""]
+    payments = {}
+    for month, unit_id, status, amount, paid_at in conn.execute(SQL_PAYMENT_ROWS):
+        key = f"{month}|{unit_id}"
+        row = payments.get(key)
+        paid = datetime.fromtimestamp(paid_at / 1000, SEOUL).strftime("%Y-%m-%d") if paid_at else ""
+        if row is None:
+            payments[key] = [month, unit_id, status, amount or 0, paid]
+        else:
+            row[2] = status
+            row[3] += amount or 0
+            row[4] = max(row[4], paid)
+    return {UNITS_TAB.name: units, PAYMENTS_TAB.name: payments}
+
+
+def row_hash(values: list) -> str:
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def default_token_source() -> Optional[Callable[[], str]]:
+    """GOOGLE_SERVICE_ACCOUNT_FILE(서비스 계정 JSON, google-auth 필요) 또는 GOOGLE_SHEETS_TOKEN.
+    둘 다 없으면 인증 헤더 없이 보낸다 (fake_sheets.py용)."""
+    sa_file = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
+    if sa_file:
+        from google.auth.transport.requests import Request
+        from google.oauth2 import service_account
+        creds = service_account.Credentials.from_service_account_file(sa_file, scopes=[SCOPE])
+
+        def token():
+            if not creds.valid:
+                creds.refresh(Request())
+            return creds.token
+        return token
+    static = os.getenv("GOOGLE_SHEETS_TOKEN")
+    return (lambda: static) if static else None
+
+
+class SheetsClient:
+    """Sheets REST v4 최소 클라이언트: 요청 간격 제한 + 재시도"""
+
+    def __init__(self, sheet_id: str, base: str = SHEETS_API_BASE, token: Optional[Callable[[], str]] = None,
+                 rate: float = SHEETS_RATE, max_retries: int = SHEETS_MAX_RETRIES, timeout: float = SHEETS_TIMEOUT):
+        self.sheet_id = sheet_id
+        self.base = base.rstrip("/")
+        self.token = token
+        self.interval = 60.0 / rate if rate > 0 else 0.0
+        self.max_retries = max_retries
+        self.http = httpx.Client(timeout=timeout)
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+
+    def _wait_turn(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def request(self, method: str, path: str, body: Optional[dict] = None, params: Optional[dict] = None) -> dict:
+        url = f"{self.base}/spreadsheets/{self.sheet_id}{path}"
+        for attempt in range(self.max_retries + 1):
+            self._wait_turn()
+            headers = {"Authorization": f"Bearer {self.token()}"} if self.token else {}
+            self.calls += 1
+            try:
+                r = self.http.request(method, url, json=body, params=params, headers=headers)
+            except httpx.TransportError as e:
+                error, retry_after = str(e), None
+            else:
+                if r.status_code < 400:
+                    return r.json() if r.content else {}
+                if r.status_code not in RETRY_STATUS:
+                    raise SheetsError(f"{method} {path}: HTTP {r.status_code} {r.text[:200]}")
+                error, retry_after = f"HTTP {r.status_code}", r.headers.get("Retry-After")
+            if attempt == self.max_retries:
+                raise SheetsError(f"{method} {path}: {error} after {attempt + 1} attempts")
+            self.retries += 1
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = min(32.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(delay)
+
+    def tab_titles(self) -> List[str]:
+        meta = self.request("GET", "", params={"fields": "sheets.properties.title"})
+        return [s["properties"]["title"] for s in meta.get("sheets", [])]
+
+    def add_tabs(self, titles: List[str]):
+        self.request("POST", ":batchUpdate",
+                     {"requests": [{"addSheet": {"properties": {"title": t}}} for t in titles]})
+
+    def clear(self, ranges: List[str]):
+        self.request("POST", "/values:batchClear", {"ranges": ranges})
+
+    def write(self, data: List[dict]):
+        self.request("POST", "/values:batchUpdate", {"valueInputOption": "RAW", "data": data})
+
+    def close(self):
+        self.http.close()
+
+
+class SheetsSync:
+    def __init__(self, sheet_url: str, checkpoint_path: str, client: Optional[SheetsClient] = None,
+                 max_cells: int = SHEETS_MAX_CELLS):
+        self.sheet_id = spreadsheet_id(sheet_url)
+        self.checkpoint_path = checkpoint_path
+        self.client = client or SheetsClient(self.sheet_id, token=default_token_source())
+        self.max_cells = max_cells
+        self._tabs_checked = False
+
+    @contextmanager
+    def _exclusive(self):
+        if fcntl is None:
+            with _local_lock:
+                yield
+            return
+        with open(self.checkpoint_path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("spreadsheetId") != self.sheet_id:
+            state = {"spreadsheetId": self.sheet_id, "tabs": {}}
+        return state
+
+    def _save(self, state: dict):
+        tmp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.checkpoint_path)
+
+    def _ensure_tabs(self, state: dict):
+        """시트에 탭이 없으면 만들고, 그 탭의 체크포인트는 버린다 (처음부터 다시 씀)"""
+        if self._tabs_checked:
+            return
+        existing = set(self.client.tab_titles())
+        missing = [t.name for t in TABS if t.name not in existing]
+        if missing:
+            self.client.add_tabs(missing)
+            for name in missing:
+                state["tabs"].pop(name, None)
+        self._tabs_checked = True
+
+    def _plan(self, tab: Tab, rows: Dict[str, list], state: dict):
+        """바뀐 행 -> (행 번호별 값, 행 번호별 체크포인트 변경 목록)"""
+        tab_state = state["tabs"].get(tab.name)
+        writes: Dict[int, list] = {}
+        changes: Dict[int, list] = {}
+        if tab_state is None or tab_state.get("header") != tab.header:
+            tab_state = None  # 새 탭이거나 열 구성이 바뀜: 비우고 전부 다시 씀
+            placed, free, next_row = {}, [], 2
+            writes[1] = tab.header
+            changes[1] = [("header", None, None)]
+        else:
+            placed = tab_state["rows"]
+            free, next_row = sorted(tab_state["free"]), tab_state["next"]
+
+        for key in sorted(set(placed) - set(rows)):  # 삭제: 행을 비우고 자리를 재사용
+            row_no = placed[key][0]
+            writes[row_no] = [""] * len(tab.header)
+            changes.setdefault(row_no, []).append((key, row_no, None))
+            free.append(row_no)
+        free.sort(reverse=True)
+        for key in sorted(rows):
+            values, h = rows[key], row_hash(rows[key])
+            if key in placed:
+                if placed[key][1] == h:
+                    continue
+                row_no = placed[key][0]
+            elif free:
+                row_no = free.pop()
+            else:
+                row_no, next_row = next_row, next_row + 1
+            writes[row_no] = values
+            changes.setdefault(row_no, []).append((key, row_no, h))
+        return tab_state is None, writes, changes
+
+    @staticmethod
+    def _apply(tab: Tab, state: dict, changes: list):
+        tab_state = state["tabs"].setdefault(tab.name, {"header": None, "rows": {}, "free": [], "next": 2})
+        for key, row_no, h in changes:
+            if key == "header":
+                tab_state["header"] = tab.header
+                continue
+            if h is None:
+                tab_state["rows"].pop(key, None)
+                if row_no not in tab_state["free"]:
+                    tab_state["free"].append(row_no)
+            else:
+                tab_state["rows"][key] = [row_no, h]
+                if row_no in tab_state["free"]:
+                    tab_state["free"].remove(row_no)
+                tab_state["next"] = max(tab_state["next"], row_no + 1)
+
+    def push(self, tables: Dict[str, Dict[str, list]]) -> dict:
+        """`read_tables()` 결과를 시트에 반영하고 통계를 돌려준다"""
+        t0 = time.perf_counter()
+        calls0, retries0 = self.client.calls, self.client.retries
+        with self._exclusive():
+            try:
+                rows_sent, ranges = self._push(tables)
+            except SheetsError:
+                self._tabs_checked = False  # 누가 탭을 지웠을 수도 있음: 다음에 다시 확인
+                raise
+        return {
+            "rows": rows_sent,
+            "ranges": ranges,
+            "calls": self.client.calls - calls0,
+            "retries": self.client.retries - retries0,
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+
+    def _push(self, tables: Dict[str, Dict[str, list]]) -> Tuple[int, int]:
+        state = self._load()
+        self._ensure_tabs(state)
+        ranges = []  # (tab, 범위 문자열, 값 목록, 체크포인트 변경)
+        for tab in TABS:
+            reset, writes, changes = self._plan(tab, tables.get(tab.name, {}), state)
+            if reset:  # 헤더를 쓰기 전까지 체크포인트의 header는 None -> 실패하면 다음에 다시 비움
+                self.client.clear([f"'{tab.name}'"])
+                state["tabs"][tab.name] = {"header": None, "rows": {}, "free": [], "next": 2}
+                self._save(state)
+            run: List[int] = []
+            run_max = max(1, self.max_cells // len(tab.header))
+            for row_no in sorted(writes) + [None]:  # 연속된 행은 한 범위로 (요청 하나에 들어갈 만큼씩)
+                if run and (row_no is None or row_no != run[-1] + 1 or len(run) == run_max):
+                    ranges.append((tab, tab.range(run[0], run[-1]), [writes[r] for r in run],
+                                   [c for r in run for c in changes[r]]))
+                    run = []
+                if row_no is not None:
+                    run.append(row_no)
+
+        rows_sent, batch, cells = 0, [], 0
+        for item in ranges + [None]:
+            size = len(item[2]) * len(item[0].header) if item else 0
+            if batch and (item is None or cells + size > self.max_cells):
+                self.client.write([{"range": r, "values": v} for _, r, v, _ in batch])
+                for tab, _, values, changes in batch:
+                    self._apply(tab, state, changes)
+                    rows_sent += len(values)
+                self._save(state)  # 요청 하나가 성공할 때마다 진행분을 남김
+                batch, cells = [], 0
+            if item:
+                batch.append(item)
+                cells += size
+        return rows_sent, len(ranges)
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", default=os.getenv("DATABASE_URL", "/data/pinehill.db"))
+    ap.add_argument("--sheet-url", default=os.getenv("GOOGLE_SHEET_URL"), required=not os.getenv("GOOGLE_SHEET_URL"))
+    ap.add_argument("--api-base", default=SHEETS_API_BASE)
+    ap.add_argument("--checkpoint", default=None, help="기본: DB 옆 sheets_sync.json")
+    ap.add_argument("--rate", type=float, default=SHEETS_RATE, help="분당 요청 수")
+    args = ap.parse_args()
+
+    checkpoint = args.checkpoint or os.path.join(os.path.dirname(os.path.abspath(args.db)), "sheets_sync.json")
+    client = SheetsClient(spreadsheet_id(args.sheet_url), base=args.api_base, token=default_token_source(),
+                          rate=args.rate)
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        tables = read_tables(conn)
+    finally:
+        conn.close()
+    print(json.dumps(SheetsSync(args.sheet_url, checkpoint, client).push(tables)))
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
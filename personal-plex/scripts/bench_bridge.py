@@ -0,0 +1,121 @@
+"""Pinehill bridge 처리량 벤치마크 (네트워크 없이 in-process).
+
+샘플 DB(scripts/sample_db.py)를 만들고 httpx ASGITransport로 동시 요청을 보내
+엔드포인트별 req/s와 p50/p99를 출력한다. `--bridge`로 다른 bridge.py를 지정하면
+변경 전후를 비교할 수 있다.
+
+    python scripts/bench_bridge.py --concurrency 32 --seconds 5
+    git show HEAD~1:personal-plex/config/bridge.py > /tmp/bridge_before.py
+    python scripts/bench_bridge.py --bridge /tmp/bridge_before.py
+
+`--revalidate`는 폴링 클라이언트처럼 지난 응답의 ETag를 If-None-Match로 보낸다 (304도 성공으로 셈).
+`--bust-cache`는 요청마다 쿼리 문자열을 바꿔 응답 캐시를 건너뛰고 매번 DB까지 가게 한다.
+동시성을 쉼표로 여러 개 주면 단계별로 돌리고, `/api/metrics`가 있으면 DB 실행기 상태도 출력한다:
+
+    python scripts/bench_bridge.py --concurrency 25,50,100,200 --bust-cache --path /api/payments/2024-03
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sample_db import make_db  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_bridge(path: Path):
+    sys.path.insert(0, str(ROOT / "config"))  # bridge.py 옆 모듈 (ledger.py 등)
+    spec = importlib.util.spec_from_file_location("bridge_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(app, paths, concurrency: int, seconds: float, revalidate: bool = False, bust_cache: bool = False):
+    latencies = {p: [] for p in paths}
+    errors = {p: 0 for p in paths}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+
+        async def user(i: int):
+            n = i
+            etags = {}
+            while time.perf_counter() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+                url = f"{path}{'&' if '?' in path else '?'}_={i}-{n}" if bust_cache else path
+                t0 = time.perf_counter()
+                r = await client.get(url, headers=headers)
+                latencies[path].append(time.perf_counter() - t0)
+                if r.status_code not in (200, 304):
+                    errors[path] += 1
+                elif "etag" in r.headers:
+                    etags[path] = r.headers["etag"]
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        metrics = None
+        if any(getattr(r, "path", None) == "/api/metrics" for r in app.routes):
+            metrics = (await client.get("/api/metrics")).json().get("db")
+    return latencies, errors, metrics
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--bridge", type=Path, default=ROOT / "config" / "bridge.py")
+    ap.add_argument("--units", type=int, default=19)
+    ap.add_argument("--months", type=int, default=36)
+    ap.add_argument("--concurrency", default="32", help="concurrent users; comma-separated for several rounds")
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--path", action="append", help="endpoint to hit (repeatable)")
+    ap.add_argument("--revalidate", action="store_true", help="send If-None-Match with the last ETag")
+    ap.add_argument("--bust-cache", action="store_true", help="vary the query string so every request hits the DB")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pinehill-bench-") as tmp:
+        db = make_db(os.path.join(tmp, "pinehill.db"), units=args.units, months=args.months)
+        os.environ["DATABASE_URL"] = db
+        bridge = load_bridge(args.bridge)
+        paths = args.path or ["/api/units", "/api/summary/2024-06"]
+
+        levels = [int(c) for c in args.concurrency.split(",")]
+
+        async def with_lifespan():
+            # ASGITransport does not send lifespan events; run the app's own startup/shutdown
+            async with bridge.app.router.lifespan_context(bridge.app):
+                return [await run(bridge.app, paths, c, args.seconds, args.revalidate, args.bust_cache)
+                        for c in levels]
+
+        rounds = asyncio.run(with_lifespan())
+
+    for concurrency, (latencies, errors, metrics) in zip(levels, rounds):
+        total = sum(len(v) for v in latencies.values())
+        print(f"{args.bridge.name}: {args.units} units x {args.months} months, "
+              f"{concurrency} concurrent, {args.seconds:.0f}s, {total / args.seconds:.0f} req/s")
+        for path in paths:
+            lat = latencies[path]
+            print(f"  {path:<28} n={len(lat):<6} {len(lat) / args.seconds:7.0f} req/s  "
+                  f"p50={pct(lat, 50) * 1000:6.2f} ms  p99={pct(lat, 99) * 1000:6.2f} ms  errors={errors[path]}")
+        if metrics:
+            print(f"  db executor: workers={metrics['workers']} maxQueued={metrics['maxQueued']} "
+                  f"wait p99={metrics['waitMs']['p99']} ms run p99={metrics['runMs']['p99']} ms "
+                  f"rejected={metrics['rejected']} timeouts={metrics['timeouts']}")
+
+if __name__ == "__main__":
+    main()
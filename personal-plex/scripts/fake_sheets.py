@@ -0,0 +1,215 @@
+"""로컬 Google Sheets API 대역 (sheets_sync.py 테스트용, 인증 없음, 메모리에만 저장).
+
+sheets_sync가 쓰는 v4 엔드포인트만 흉내 낸다:
+
+    GET  /v4/spreadsheets/{id}                     탭 목록
+    POST /v4/spreadsheets/{id}:batchUpdate         addSheet
+    POST /v4/spreadsheets/{id}/values:batchUpdate  범위별 값 쓰기
+    POST /v4/spreadsheets/{id}/values:batchClear   범위(또는 탭 전체) 비우기
+    GET  /v4/spreadsheets/{id}/values/{range}      값 읽기 (확인용)
+    GET  /_stats                                   요청 수, 쓴 셀 수, 일부러 낸 오류 수
+
+`--fail-rate`로 일정 비율의 요청에 500/429를 돌려주고, `--quota`로 분당 요청 수를 넘으면 429를
+돌려준다 (Sheets 쿼터처럼). 재시도/속도 제한을 확인할 때 쓴다.
+
+    python scripts/fake_sheets.py --port 9100 --fail-rate 0.2
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+RANGE_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?)?$")
+
+
+def column_number(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def parse_range(text: str):
+    """"'납부'!A2:E10" -> ("납부", 2, 1, 10, 5) (행/열 1부터, 범위가 없으면 탭 전체)"""
+    m = RANGE_RE.match(text)
+    if not m:
+        raise ValueError(f"bad range {text!r}")
+    title = (m.group(1) or "").replace("''", "'") or m.group(2)
+    if not m.group(3):
+        return title, 1, 1, None, None
+    r0, c0 = int(m.group(4)), column_number(m.group(3))
+    r1 = int(m.group(6)) if m.group(6) else r0
+    c1 = column_number(m.group(5)) if m.group(5) else c0
+    return title, r0, c0, r1, c1
+
+
+class FakeSheets:
+    def __init__(self, fail_rate: float = 0.0, quota: int = 0, seed: int = 0):
+        self.books = {}  # spreadsheetId -> {탭: {(행, 열): 값}}
+        self.fail_rate = fail_rate
+        self.quota = quota
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.stats = {"requests": 0, "writes": 0, "cellsWritten": 0, "injected500": 0, "quota429": 0}
+
+    def admit(self):
+        """오류를 낼 요청이면 HTTP 상태 코드, 아니면 None"""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if self.quota and len(self.recent) >= self.quota:
+                self.stats["quota429"] += 1
+                return 429
+            self.recent.append(now)
+            if self.rng.random() < self.fail_rate:
+                self.stats["injected500"] += 1
+                return self.rng.choice([500, 503, 429])
+        return None
+
+    def book(self, sheet_id: str) -> dict:
+        return self.books.setdefault(sheet_id, {"Sheet1": {}})
+
+    def values(self, sheet_id: str, text: str):
+        title, r0, c0, r1, c1 = parse_range(text)
+        cells = self.book(sheet_id).get(title)
+        if cells is None:
+            raise KeyError(title)
+        if r1 is None:
+            r1 = max((r for r, _ in cells), default=0)
+            c1 = max((c for _, c in cells), default=0)
+        rows = [[cells.get((r, c), "") for c in range(c0, c1 + 1)] for r in range(r0, r1 + 1)]
+        while rows and not any(v != "" for v in rows[-1]):
+            rows.pop()
+        return [self.trim(row) for row in rows]
+
+    @staticmethod
+    def trim(row):
+        while row and row[-1] == "":
+            row = row[:-1]
+        return row
+
+
+class Handler(BaseHTTPRequestHandler):
+    fake: FakeSheets = None
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def error(self, status: int, message: str):
+        self.reply(status, {"error": {"code": status, "message": message}})
+
+    def route(self, method: str):
+        path = unquote(urlparse(self.path).path)
+        if path == "/_stats":
+            return self.reply(200, self.fake.stats)
+        m = re.match(r"^/v4/spreadsheets/([^/:]+)(.*)$", path)
+        if not m:
+            return self.error(404, "not found")
+        failed = self.fake.admit()
+        if failed:
+            return self.error(failed, "injected failure" if failed != 429 else "quota exceeded")
+        sheet_id, rest = m.groups()
+        body = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        fake = self.fake
+        with fake.lock:
+            book = fake.book(sheet_id)
+            try:
+                if method == "GET" and rest == "":
+                    return self.reply(200, {"spreadsheetId": sheet_id, "sheets": [
+                        {"properties": {"sheetId": i, "title": t}} for i, t in enumerate(book)]})
+                if method == "GET" and rest.startswith("/values/"):
+                    text = rest[len("/values/"):]
+                    return self.reply(200, {"range": text, "values": fake.values(sheet_id, text)})
+                if method == "POST" and rest == ":batchUpdate":
+                    replies = []
+                    for req in body.get("requests", []):
+                        title = req["addSheet"]["properties"]["title"]
+                        if title in book:
+                            return self.error(400, f"sheet {title} already exists")
+                        book[title] = {}
+                        replies.append({"addSheet": {"properties": {"title": title}}})
+                    return self.reply(200, {"spreadsheetId": sheet_id, "replies": replies})
+                if method == "POST" and rest == "/values:batchUpdate":
+                    total = 0
+                    for item in body.get("data", []):
+                        title, r0, c0, r1, c1 = parse_range(item["range"])
+                        if title not in book:
+                            return self.error(400, f"Unable to parse range: {item['range']}")
+                        values = item.get("values", [])
+                        if r1 is not None and (len(values) > r1 - r0 + 1 or any(len(v) > c1 - c0 + 1 for v in values)):
+                            return self.error(400, f"values exceed range {item['range']}")
+                        for i, row in enumerate(values):
+                            for j, value in enumerate(row):
+                                if value == "":
+                                    book[title].pop((r0 + i, c0 + j), None)
+                                else:
+                                    book[title][(r0 + i, c0 + j)] = value
+                                total += 1
+                    fake.stats["writes"] += 1
+                    fake.stats["cellsWritten"] += total
+                    return self.reply(200, {"spreadsheetId": sheet_id, "totalUpdatedCells": total})
+                if method == "POST" and rest == "/values:batchClear":
+                    for text in body.get("ranges", []):
+                        title, r0, c0, r1, c1 = parse_range(text)
+                        if title not in book:
+                            return self.error(400, f"Unable to parse range: {text}")
+                        book[title] = {} if r1 is None else {
+                            (r, c): v for (r, c), v in book[title].items()
+                            if not (r0 <= r <= r1 and c0 <= c <= c1)}
+                    return self.reply(200, {"spreadsheetId": sheet_id, "clearedRanges": body.get("ranges", [])})
+            except (KeyError, ValueError) as e:
+                return self.error(400, f"bad request: {e}")
+        return self.error(404, f"unsupported {method} {rest}")
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_POST(self):
+        self.route("POST")
+
+
+def serve(port: int, fail_rate: float = 0.0, quota: int = 0, seed: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드로 서버를 띄운다 (스크립트/테스트에서 import해서 사용)"""
+    handler = type("BoundHandler", (Handler,), {"fake": FakeSheets(fail_rate, quota, seed)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="500/503/429로 실패시킬 요청 비율")
+    ap.add_argument("--quota", type=int, default=0, help="분당 요청 수 상한 (0 = 무제한)")
+    args = ap.parse_args()
+    server = serve(args.port, args.fail_rate, args.quota)
+    print(f"fake Sheets API on http://127.0.0.1:{args.port}/v4")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
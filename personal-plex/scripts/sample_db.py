@@ -0,0 +1,170 @@
+"""테스트/벤치마크용 pinehill.db 생성기 (pinehill-manager Room 스키마와 같은 테이블).
+
+    python scripts/sample_db.py data/pinehill.db --units 19 --months 36
+
+세대마다 임차인 1명, 월별 납부 1건(대부분 완납, 일부 부분납/미납/확인필요), 월 몇 건의
+지출을 만든다. 입금 문자는 카카오뱅크 형식(`SmsParser.kt`)을 따른다.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    unitId TEXT NOT NULL PRIMARY KEY,
+    roomNo INTEGER NOT NULL,
+    floor INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    roomType TEXT,
+    targetPrice TEXT,
+    createdAt INTEGER NOT NULL,
+    updatedAt INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tenants (
+    tenantKey TEXT NOT NULL PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    unitId TEXT NOT NULL,
+    createdAt INTEGER NOT NULL,
+    FOREIGN KEY(unitId) REFERENCES units(unitId) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS index_tenants_unitId ON tenants (unitId);
+CREATE TABLE IF NOT EXISTS payments (
+    paymentId INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    tenantKey TEXT,
+    unitId TEXT NOT NULL,
+    month TEXT NOT NULL,
+    paidAt INTEGER,
+    amount INTEGER NOT NULL,
+    senderName TEXT,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    statusOverride INTEGER NOT NULL,
+    rawSms TEXT,
+    createdAt INTEGER NOT NULL,
+    FOREIGN KEY(tenantKey) REFERENCES tenants(tenantKey) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS index_payments_tenantKey ON payments (tenantKey);
+CREATE INDEX IF NOT EXISTS index_payments_month ON payments (month);
+CREATE TABLE IF NOT EXISTS expenses (
+    expenseId INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    spentAt INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    memo TEXT NOT NULL,
+    unitId TEXT,
+    month TEXT NOT NULL,
+    source TEXT NOT NULL,
+    rawSms TEXT,
+    createdAt INTEGER NOT NULL
+);
+"""
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = ["민준", "서연", "도윤", "지우", "하준", "서윤", "예준", "지민", "주원", "수아", "진환", "원표"]
+ROOM_TYPES = [("원룸", "300-40"), ("1.5룸", "500-50"), ("투룸", "1000-65")]
+EXPENSE_CATEGORIES = ["REPAIR", "CLEANING", "SUPPLIES", "MANAGEMENT", "TAX", "BROKERAGE", "OTHER"]
+
+
+def monthly_rent(target_price: str) -> int:
+    """"500-50" (보증금-월세, 만원) -> 월세(원)"""
+    return int(target_price.split("-")[1]) * 10_000
+
+
+def month_list(start: str, count: int):
+    y, m = map(int, start.split("-"))
+    for _ in range(count):
+        yield f"{y:04d}-{m:02d}"
+        m += 1
+        if m > 12:
+            y, m = y + 1, 1
+
+
+def deposit_sms(month: str, day: int, hour: int, minute: int, amount: int, sender: str, balance: int) -> str:
+    return (f"[Web발신] [카카오뱅크] 심*민(8205) {month[5:]}/{day:02d} {hour:02d}:{minute:02d} "
+            f"입금 {amount:,}원 {sender} 잔액 {balance:,}원")
+
+
+def epoch_ms(month: str, day: int, hour: int, minute: int) -> int:
+    return int(time.mktime(time.strptime(f"{month}-{day:02d} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M"))) * 1000
+
+
+def make_db(path: str, units: int = 19, months: int = 36, start: str = "2023-01", seed: int = 7) -> str:
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    now = int(time.time() * 1000)
+    unit_rows, tenant_rows = [], []
+    for i in range(units):
+        floor = 2 + i // 5
+        room_no = floor * 100 + i % 5 + 1
+        unit_id = f"PINE-{room_no}"
+        room_type, price = ROOM_TYPES[i % len(ROOM_TYPES)]
+        status = "VACANT" if i % 17 == 16 else "RENTED"
+        unit_rows.append((unit_id, room_no, floor, status, room_type, price, now, now))
+        if status == "RENTED":
+            name = rng.choice(SURNAMES) + rng.choice(GIVEN)
+            phone = f"010{rng.randrange(10**8):08d}"
+            tenant_rows.append((f"{name}_{phone}", name, phone, unit_id, now))
+    conn.executemany("INSERT INTO units VALUES (?,?,?,?,?,?,?,?)", unit_rows)
+    conn.executemany("INSERT INTO tenants VALUES (?,?,?,?,?)", tenant_rows)
+
+    rent_of = {u[0]: monthly_rent(u[5]) for u in unit_rows}
+    payment_rows, expense_rows = [], []
+    balance = 5_000_000
+    for month in month_list(start, months):
+        for tenant_key, name, _, unit_id, _ in tenant_rows:
+            rent = rent_of[unit_id]
+            r = rng.random()
+            if r < 0.85:
+                status, amount = "PAID", rent
+            elif r < 0.92:
+                status, amount = "PARTIAL", rent // 2
+            elif r < 0.97:
+                status, amount = "UNPAID", 0
+            else:
+                status, amount = "PENDING", rent
+            if amount:
+                day, hour, minute = rng.randint(1, 10), rng.randint(8, 22), rng.randint(0, 59)
+                balance += amount
+                paid_at = epoch_ms(month, day, hour, minute)
+                sms = deposit_sms(month, day, hour, minute, amount, name, balance)
+            else:
+                paid_at, sms = None, None
+            payment_rows.append((tenant_key, unit_id, month, paid_at, amount, name if amount else None,
+                                 "SMS" if sms else "MANUAL", status, 0, sms, now))
+        for _ in range(rng.randint(2, 6)):
+            day = rng.randint(1, 28)
+            amount = rng.choice([20_000, 45_000, 120_000, 300_000, 800_000])
+            unit_id = rng.choice(unit_rows)[0] if rng.random() < 0.5 else None
+            expense_rows.append((epoch_ms(month, day, 12, 0), amount, rng.choice(EXPENSE_CATEGORIES), "",
+                                 unit_id, month, "MANUAL", None, now))
+    conn.executemany(
+        "INSERT INTO payments (tenantKey, unitId, month, paidAt, amount, senderName, source, status,"
+        " statusOverride, rawSms, createdAt) VALUES (?,?,?,?,?,?,?,?,?,?,?)", payment_rows)
+    conn.executemany(
+        "INSERT INTO expenses (spentAt, amount, category, memo, unitId, month, source, rawSms, createdAt)"
+        " VALUES (?,?,?,?,?,?,?,?,?)", expense_rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path")
+    ap.add_argument("--units", type=int, default=19)
+    ap.add_argument("--months", type=int, default=36)
+    ap.add_argument("--start", default="2023-01")
+    args = ap.parse_args()
+    make_db(args.path, args.units, args.months, args.start)
+    print(f"wrote {args.path}")
+
+
+if __name__ == "__main__":
+    main()
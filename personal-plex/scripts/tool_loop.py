@@ -0,0 +1,63 @@
+"""Ollama 도구 호출 루프 (Open WebUI 없이 bridge 도구를 터미널에서 시험).
+
+bridge의 `/api/tools`를 Ollama `/api/chat`에 넘기고, 모델이 도구를 부르면 `/api/tools/call`로 실행해
+결과를 대화에 붙인다. 대화 ID를 같이 보내므로 같은 질문을 되풀이해도 bridge는 결과를 다시 보내지
+않는다. 끝에 Ollama가 알려준 프롬프트/생성 토큰 수를 출력한다.
+
+    python scripts/tool_loop.py "이번 달 미납 세대 알려줘" --model llama3.1:8b
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+
+import httpx
+
+SYSTEM = ("너는 원룸 19세대 임대 관리 도우미다. 세대/납부/연체 질문은 도구로 확인한 숫자로만 답한다. "
+          "도구 결과는 cols/rows 표이고 금액 단위는 원이다. {\"same\": n}은 앞의 결과 #n과 같다는 뜻이다.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("question", nargs="+")
+    ap.add_argument("--bridge", default="http://localhost:8001")
+    ap.add_argument("--ollama", default="http://localhost:11434")
+    ap.add_argument("--model", default="llama3.1:8b")
+    ap.add_argument("--max-steps", type=int, default=6)
+    args = ap.parse_args()
+
+    conversation = uuid.uuid4().hex
+    with httpx.Client(timeout=600) as http:
+        tools = http.get(f"{args.bridge}/api/tools").json()["tools"]
+        messages = [{"role": "system", "content": SYSTEM}]
+        prompt_tokens = output_tokens = 0
+        t0 = time.perf_counter()
+        for question in args.question:
+            messages.append({"role": "user", "content": question})
+            for _ in range(args.max_steps):
+                r = http.post(f"{args.ollama}/api/chat",
+                              json={"model": args.model, "messages": messages, "tools": tools, "stream": False})
+                r.raise_for_status()
+                reply = r.json()
+                prompt_tokens += reply.get("prompt_eval_count", 0)
+                output_tokens += reply.get("eval_count", 0)
+                message = reply["message"]
+                messages.append(message)
+                calls = message.get("tool_calls") or []
+                if not calls:
+                    print(f"Q: {question}\nA: {message.get('content', '').strip()}\n")
+                    break
+                for call in calls:
+                    result = http.post(f"{args.bridge}/api/tools/call",
+                                       json={**call, "conversationId": conversation}).json()
+                    print(f"  -> {call['function']['name']}({json.dumps(call['function'].get('arguments'), ensure_ascii=False)})"
+                          f" {len(result['content'])} chars", file=sys.stderr)
+                    messages.append({"role": "tool", "tool_name": result["name"], "content": result["content"]})
+        print(f"prompt tokens {prompt_tokens}, output tokens {output_tokens}, {time.perf_counter() - t0:.1f}s",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
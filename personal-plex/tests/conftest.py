@@ -0,0 +1,83 @@
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for sub in ("config", "scripts"):
+    if str(ROOT / sub) not in sys.path:
+        sys.path.insert(0, str(ROOT / sub))
+
+from ledger import SEOUL  # noqa: E402
+from sample_db import SCHEMA  # noqa: E402
+
+
+def ms(month: str, day: int = 15) -> int:
+    """"2024-09" -> 그 달 day일 정오 (epoch ms, 서울 시간)"""
+    y, m = map(int, month.split("-"))
+    return int(datetime(y, m, day, 12, tzinfo=SEOUL).timestamp()) * 1000
+
+
+@pytest.fixture
+def db(tmp_path):
+    """빈 Pinehill 스키마 DB (autocommit 커넥션)"""
+    conn = sqlite3.connect(tmp_path / "pinehill.db", isolation_level=None)
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+
+def add_unit(conn, unit_id, room_no, price, status="RENTED"):
+    conn.execute("INSERT INTO units VALUES (?, ?, ?, ?, '원룸', ?, 0, 0)",
+                 (unit_id, room_no, room_no // 100, status, price))
+
+
+def add_tenant(conn, tenant_key, name, unit_id, month):
+    conn.execute("INSERT INTO tenants VALUES (?, ?, '01000000000', ?, ?)", (tenant_key, name, unit_id, ms(month)))
+
+
+def add_payment(conn, unit_id, tenant_key, month, amount, status="PAID", sender=None, raw=None):
+    cur = conn.execute(
+        "INSERT INTO payments (tenantKey, unitId, month, paidAt, amount, senderName, source, status,"
+        " statusOverride, rawSms, createdAt) VALUES (?, ?, ?, ?, ?, ?, 'MANUAL', ?, 0, ?, 0)",
+        (tenant_key, unit_id, month, ms(month, 5), amount, sender, status, raw))
+    return cur.lastrowid
+
+
+TOKEN = "test-token"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def bridge(tmp_path, monkeypatch):
+    """sample_db로 만든 DB를 보는 bridge 모듈. 풀/감시/실행기/캐시는 테스트마다 새로 만든다.
+
+    lifespan은 돌리지 않는다 (감시 스레드 없음): 밖에서 DB를 고쳤으면 `bridge.db_watcher.check()`.
+    """
+    monkeypatch.delenv("GOOGLE_SHEET_URL", raising=False)
+    import bridge as module
+    from sample_db import make_db
+
+    path = make_db(str(tmp_path / "pinehill.db"), units=5, months=6)
+    pool = module.ConnectionPool(path, 3)
+    executor = module.DBExecutor(pool, 2, 8, 5.0)
+    monkeypatch.setattr(module, "DB_PATH", path)
+    monkeypatch.setattr(module, "BRIDGE_TOKEN", TOKEN)
+    monkeypatch.setattr(module, "pool", pool)
+    monkeypatch.setattr(module, "db_watcher", module.DataVersionWatcher(path, pool))
+    monkeypatch.setattr(module, "db_executor", executor)
+    monkeypatch.setattr(module, "ledger", module.Ledger())
+    monkeypatch.setattr(module, "summary_cache", module.GenerationCache())
+    monkeypatch.setattr(module, "response_cache", module.GenerationCache(module.RESPONSE_CACHE_SIZE))
+    module.db_watcher.check()
+    yield module
+    executor.shutdown()
+    pool.close_idle()
+
+
+@pytest.fixture
+def client(bridge):
+    from fastapi.testclient import TestClient
+    return TestClient(bridge.app)
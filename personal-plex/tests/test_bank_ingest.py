@@ -0,0 +1,119 @@
+import sqlite3
+
+import pytest
+
+from bank_ingest import IngestError, ingest, parse_sms, read_csv, read_sms, read_transactions
+from conftest import add_payment, add_tenant, add_unit
+from ledger import month_of_epoch_ms
+
+SMS = "[Web발신] [카카오뱅크] 심*민(8205) {md} 10:30 입금 {amount}원 {sender} 잔액 5,000,000원"
+CSV_HEADER = "거래일시,구분,거래금액,내용,잔액"
+
+
+def sms(md, amount, sender):
+    return SMS.format(md=md, amount=amount, sender=sender)
+
+
+@pytest.fixture
+def building(db):
+    add_unit(db, "PINE-201", 201, "500-50")
+    add_unit(db, "PINE-202", 202, "300-40")
+    add_unit(db, "PINE-203", 203, "1000-65")
+    add_unit(db, "PINE-204", 204, "1000-65")
+    add_tenant(db, "kim", "김서연", "PINE-201", "2024-01")
+    add_tenant(db, "lee", "이도윤", "PINE-202", "2024-01")
+    add_tenant(db, "park", "박지우", "PINE-203", "2024-01")
+    add_tenant(db, "choi", "최하준", "PINE-204", "2024-01")
+    add_payment(db, "PINE-202", "lee", "2024-01", 400_000, sender="이엄마")  # 확인된 입금자명
+    return db
+
+
+def test_parse_sms():
+    t = parse_sms(sms("03/05", "500,000", "201박진환"), 2024)
+    assert (t.kind, t.amount, t.name, t.source) == ("입금", 500_000, "201박진환", "SMS")
+    assert month_of_epoch_ms(t.at) == "2024-03"
+    out = parse_sms("[Web발신] [카카오뱅크] 심*민(8205) 03/06 09:00 출금 45,000원 철물점", 2024)
+    assert (out.kind, out.amount, out.name) == ("출금", 45_000, "철물점")
+    assert parse_sms("[Web발신] 광고 문자입니다", 2024) is None
+
+
+@pytest.mark.parametrize("tz", ["UTC", "America/Los_Angeles", "Asia/Seoul"])
+def test_sms_times_are_seoul_times_whatever_the_host_zone(tz, monkeypatch):
+    import time
+
+    monkeypatch.setenv("TZ", tz)
+    time.tzset()
+    try:
+        late = parse_sms("[Web발신] [카카오뱅크] 심*민(8205) 03/31 23:30 입금 500,000원 김서연", 2024)
+        assert month_of_epoch_ms(late.at) == "2024-03"
+        assert late.at == 1711895400000  # 2024-03-31 23:30 KST
+        assert parse_sms("[Web발신] [카카오뱅크] 심*민(8205) 02/30 10:00 입금 1원 김서연", 2024) is None
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_sms_backup_rolls_year_and_joins_lines():
+    lines = [
+        "[Web발신]", "[카카오뱅크] 심*민(8205) 12/28 10:30 입금 500,000원 김서연 잔액 1원",
+        sms("01/03", "400,000", "이도윤"),
+        "2025-02-01 09:00:00\t" + sms("02/01", "650,000", "박지우"),
+    ]
+    months = [month_of_epoch_ms(t.at) for t in read_sms(lines, 2023)]
+    assert months == ["2023-12", "2024-01", "2025-02"]
+
+
+def test_csv_repeated_rows_are_counted_separately():
+    lines = [CSV_HEADER,
+             "2024-03-05 10:30,입금,\"50,000\",김서연,1",
+             "2024-03-05 10:30,입금,\"50,000\",김서연,1",
+             "2024-03-06 09:00,출금,-45000,철물점,2",
+             "날짜 아님,입금,1000,누구,3"]
+    rows = list(read_csv(lines))
+    assert rows[0].raw + " #2" == rows[1].raw
+    assert (rows[2].kind, rows[2].amount) == ("출금", 45_000)
+    assert rows[3] is None
+    with pytest.raises(IngestError):
+        list(read_csv(["금액,내용", "1000,누구"]))
+
+
+def test_ingest_matches_senders(building):
+    text = "\n".join([
+        sms("03/05", "500,000", "201박진환"),  # 호실 번호
+        sms("03/05", "400,000", "이엄마"),  # 확인된 입금자명
+        sms("03/05", "200,000", "김서연"),  # 임차인 이름, 모자람
+        sms("03/05", "650,000", "모르는사람"),  # 월세가 같은 세대가 둘 -> 못 찾음
+        sms("03/06", "400,000", "모르는사람"),  # 월세가 같은 세대가 하나
+    ])
+    result = ingest(building, read_transactions(text, year=2024))
+    assert result["payments"] == 5
+    assert result["byMatch"] == {"room": 1, "alias": 1, "name": 1, "none": 1, "rent": 1}
+    rows = building.execute("SELECT unitId, tenantKey, status, month FROM payments WHERE paymentId > 1 "
+                            "ORDER BY paymentId").fetchall()
+    assert rows == [("PINE-201", "kim", "PAID", "2024-03"), ("PINE-202", "lee", "PAID", "2024-03"),
+                    ("PINE-201", "kim", "PARTIAL", "2024-03"), ("", None, "PENDING", "2024-03"),
+                    ("PINE-202", "lee", "PENDING", "2024-03")]
+    assert result["unmatched"][0]["senderName"] == "모르는사람"
+
+
+def test_ingest_is_idempotent_and_dry_run_writes_nothing(building):
+    text = "\n".join([CSV_HEADER,
+                      "2024-03-05 10:30,입금,500000,김서연,1",
+                      "2024-03-05 10:30,입금,500000,김서연,1",
+                      "2024-03-06 09:00,출금,45000,철물점,2"])
+    dry = ingest(building, read_transactions(text), dry_run=True)
+    assert (dry["payments"], dry["expenses"], dry["dryRun"]) == (2, 1, True)
+    assert building.execute("SELECT COUNT(*) FROM payments").fetchone()[0] == 1
+
+    first = ingest(building, read_transactions(text))
+    assert (first["payments"], first["expenses"], first["duplicates"]) == (2, 1, 0)
+    again = ingest(building, read_transactions(text))
+    assert (again["payments"], again["expenses"], again["duplicates"]) == (0, 0, 3)
+
+
+def test_ingest_rolls_back_on_error(building):
+    building.execute("CREATE TRIGGER boom BEFORE INSERT ON expenses BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    text = "\n".join([CSV_HEADER, "2024-03-05 10:30,입금,500000,김서연,1", "2024-03-06 09:00,출금,45000,철물점,2"])
+    with pytest.raises(sqlite3.IntegrityError):
+        ingest(building, read_transactions(text))
+    assert building.execute("SELECT COUNT(*) FROM payments").fetchone()[0] == 1
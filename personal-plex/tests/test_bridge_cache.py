@@ -0,0 +1,48 @@
+import sqlite3
+
+from conftest import AUTH, add_payment
+
+
+def test_new_generation_clears_the_cache(bridge):
+    cache = bridge.GenerationCache()
+    cache.get("a", 1)
+    cache.put("a", 1, "v1")
+    assert cache.get("a", 1) == "v1"
+    assert cache.get("a", 2) is None
+    cache.put("a", 1, "stale")  # 예전 세대로 계산한 값은 넣지 않는다
+    assert cache.get("a", 2) is None
+    cache.put("a", 2, "v2")
+    assert cache.get("a", 2) == "v2"
+
+
+def test_requests_on_an_older_generation_do_not_thrash(bridge):
+    cache = bridge.GenerationCache()
+    cache.get("a", 5)
+    cache.put("a", 5, "new")
+    for _ in range(3):  # 바뀌는 순간 아직 돌고 있던 예전 세대 요청
+        assert cache.get("a", 4) is None
+        cache.put("a", 4, "old")
+        assert cache.get("a", 5) == "new"
+    assert cache._generation == 5 and cache._data == {"a": "new"}
+
+
+def test_max_entries_drops_the_oldest(bridge):
+    cache = bridge.GenerationCache(2)
+    cache.get("a", 1)
+    for key in "abc":
+        cache.put(key, 1, key.upper())
+    assert [cache.get(key, 1) for key in "abc"] == [None, "B", "C"]
+
+
+def test_summary_is_recomputed_after_a_db_change(bridge, client):
+    before = client.get("/api/summary/2023-03", headers=AUTH).json()
+    conn = sqlite3.connect(bridge.DB_PATH, isolation_level=None)
+    unit_id, tenant_key = conn.execute("SELECT unitId, tenantKey FROM tenants LIMIT 1").fetchone()
+    add_payment(conn, unit_id, tenant_key, "2023-03", 12_345)
+    conn.close()
+
+    assert client.get("/api/summary/2023-03", headers=AUTH).json() == before  # 감시 전: 같은 세대
+    bridge.db_watcher.check()
+    after = client.get("/api/summary/2023-03", headers=AUTH).json()
+    assert after["payments"]["paid"] == before["payments"]["paid"] + 1
+    assert after["payments"]["totalAmount"] == before["payments"]["totalAmount"] + 12_345
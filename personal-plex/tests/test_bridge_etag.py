@@ -0,0 +1,46 @@
+import sqlite3
+
+from conftest import add_payment
+
+
+def test_etag_is_the_same_in_another_worker_and_after_restart(bridge, client):
+    res = client.get("/api/summary/2023-03")
+    etag = res.headers["ETag"]
+    assert res.status_code == 200
+
+    # 다른 워커/재시작: 세대 번호는 처음부터 다시 세지만 태그는 파일 상태에서 나온다
+    other = bridge.DataVersionWatcher(bridge.DB_PATH, bridge.pool)
+    other.generation = 40
+    other.check()
+    assert other.generation != bridge.db_watcher.generation
+    assert other.tag_of(other.generation) == bridge.db_watcher.tag_of(bridge.db_watcher.generation)
+
+    bridge.db_watcher = other
+    res = client.get("/api/summary/2023-03", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+
+def test_etag_changes_with_the_db(bridge, client):
+    etag = client.get("/api/summary/2023-03").headers["ETag"]
+    conn = sqlite3.connect(bridge.DB_PATH, isolation_level=None)
+    unit_id, tenant_key = conn.execute("SELECT unitId, tenantKey FROM tenants LIMIT 1").fetchone()
+    add_payment(conn, unit_id, tenant_key, "2023-03", 10_000)
+    conn.close()
+
+    # 감시 스레드가 돌기 전(최대 DB_WATCH_INTERVAL)에는 예전 세대로 답한다
+    assert client.get("/api/summary/2023-03", headers={"If-None-Match": etag}).status_code == 304
+    bridge.db_watcher.check()
+    res = client.get("/api/summary/2023-03", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
+def test_old_generations_fall_back_to_a_process_local_tag(bridge):
+    watcher = bridge.db_watcher
+    first = watcher.generation
+    for _ in range(watcher.TAGS_KEPT):
+        watcher._seen = None  # 세대만 올린다
+        watcher.check()
+    assert watcher.tag_of(first) is None
+    assert bridge.make_etag(first) == f'W/"{bridge.INSTANCE}-{first}"'
+    assert bridge.INSTANCE not in bridge.make_etag(watcher.generation, "2024-01-01")
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+FOREVER = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+@pytest.fixture
+def executor(bridge):
+    made = []
+
+    def make(workers=1, queue_max=8, timeout=5.0):
+        made.append(bridge.DBExecutor(bridge.pool, workers, queue_max, timeout))
+        return made[-1]
+
+    yield make
+    for e in made:
+        e.shutdown()
+
+
+def select_one(conn):
+    return conn.execute("SELECT 1").fetchone()[0]
+
+
+def test_full_queue_is_rejected_with_a_503(executor):
+    ex = executor(workers=1, queue_max=2)
+    gate = threading.Event()
+
+    def blocked(conn):
+        gate.wait(5)
+        return select_one(conn)
+
+    async def main():
+        tasks = [asyncio.ensure_future(ex.run(blocked)) for _ in range(3)]
+        await asyncio.sleep(0.1)  # 하나는 실행 중, 둘은 큐에
+        assert (ex.running, ex.queued) == (1, 2)
+        with pytest.raises(HTTPException) as e:
+            await ex.run(select_one)
+        gate.set()
+        return e.value, await asyncio.gather(*tasks)
+
+    error, results = asyncio.run(main())
+    assert error.status_code == 503 and error.headers == {"Retry-After": "1"}
+    assert results == [1, 1, 1]
+    m = ex.metrics()
+    assert (m["submitted"], m["completed"], m["rejected"], m["maxQueued"]) == (3, 3, 1, 2)
+    assert (m["queued"], m["running"]) == (0, 0)
+
+
+def test_running_query_is_interrupted_with_a_504(executor):
+    ex = executor(timeout=0.2)
+
+    async def main():
+        with pytest.raises(HTTPException) as e:
+            await ex.run(lambda conn: conn.execute(FOREVER).fetchone())
+        assert e.value.status_code == 504
+        return await ex.run(select_one)  # 끊긴 커넥션도 풀에서 다시 쓸 수 있다
+
+    assert asyncio.run(main()) == 1
+    m = ex.metrics()
+    assert (m["timeouts"], m["completed"], m["running"]) == (1, 1, 0)
+
+
+def test_timed_out_queued_job_never_runs(executor):
+    ex = executor(timeout=0.2)
+    gate = threading.Event()
+    ex._executor.submit(gate.wait, 5)  # 하나뿐인 DB 스레드를 막아 둔다
+    ran = []
+
+    async def main():
+        with pytest.raises(HTTPException) as e:
+            await ex.run(lambda conn: ran.append(1))
+        return e.value
+
+    assert asyncio.run(main()).status_code == 504
+    assert ex.queued == 0
+    gate.set()
+    ex.shutdown()
+    assert ran == []
+
+
+def test_endpoints_return_503_and_504(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "db_executor", bridge.DBExecutor(bridge.pool, 1, 0, 5.0))
+    res = client.get("/api/units")
+    assert res.status_code == 503 and res.headers["retry-after"] == "1"
+    bridge.db_executor.shutdown()
+
+    ex = bridge.DBExecutor(bridge.pool, 1, 8, 0.2)
+    monkeypatch.setattr(bridge, "db_executor", ex)
+    gate = threading.Event()
+    ex._executor.submit(gate.wait, 5)
+    assert client.get("/api/units").status_code == 504
+    gate.set()
+    metrics = client.get("/api/metrics").json()["db"]
+    assert (metrics["submitted"], metrics["timeouts"], metrics["completed"]) == (1, 1, 0)
+    ex.shutdown()
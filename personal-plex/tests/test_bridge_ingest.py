@@ -0,0 +1,27 @@
+from conftest import AUTH
+
+CSV = "거래일시,구분,거래금액,내용,잔액\n2024-03-05 10:30,입금,500000,김서연,1\n"
+
+
+def payment_count(bridge):
+    with bridge.pool.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM payments").fetchone()[0]
+
+
+def test_ingest_needs_the_bridge_token(bridge, client):
+    before = payment_count(bridge)
+    r = client.post("/api/ingest/bank?format=csv", content=CSV.encode())
+    assert r.status_code == 401
+    r = client.post("/api/ingest/bank?format=csv", content=CSV.encode(), headers={"Authorization": "Bearer x"})
+    assert r.status_code == 401
+    assert payment_count(bridge) == before
+
+    r = client.post("/api/ingest/bank?format=csv", content=CSV.encode(), headers=AUTH)
+    assert r.status_code == 200 and r.json()["payments"] == 1
+    assert payment_count(bridge) == before + 1
+
+
+def test_ingest_body_cap(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "INGEST_MAX_BYTES", 64)
+    r = client.post("/api/ingest/bank?format=csv", content=CSV.encode() * 4, headers=AUTH)
+    assert r.status_code == 413
@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def pool(bridge):
+    pool = bridge.ConnectionPool(bridge.DB_PATH, 2)
+    yield pool
+    pool.close_idle()
+
+
+def test_connections_are_read_only(pool):
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM units").fetchone()[0] == 5
+        for sql in ("DELETE FROM payments", "CREATE TABLE x (a)"):
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute(sql)
+        conn.execute("PRAGMA query_only = OFF")
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):  # query_only를 꺼도 mode=ro
+            conn.execute("DELETE FROM payments")
+
+
+def test_connections_are_reused_up_to_size(pool):
+    with pool.connection() as a:
+        with pool.connection() as b:
+            assert a is not b
+    with pool.connection() as c:
+        assert c in (a, b)
+    assert pool._created == 2
+
+
+def test_exhausted_pool_waits_for_a_return(pool):
+    got = []
+    with pool.connection() as a, pool.connection() as b:
+        waiter = threading.Thread(target=lambda: got.append(pool.connection().__enter__()), daemon=True)
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive() and pool._created == 2  # 더 만들지 않고 기다린다
+    waiter.join(2)
+    assert not waiter.is_alive()
+    assert got[0] in (a, b) and pool._created == 2
+
+
+def test_waiter_gets_a_new_connection_after_reset(pool):
+    """reset() 뒤 예전 커넥션은 반납 때 닫힌다: 그 자리를 기다리던 요청이 멈추면 안 된다"""
+    got = []
+    entered = pool.connection()
+    old = entered.__enter__()
+    with pool.connection():
+        waiter = threading.Thread(target=lambda: got.append(pool.connection().__enter__()), daemon=True)
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive()
+        pool.reset()
+        entered.__exit__(None, None, None)  # 예전 세대: 닫히고 큐로 돌아가지 않음
+        waiter.join(2)
+        assert not waiter.is_alive()
+    assert got and got[0] is not old
+    assert got[0].execute("SELECT 1").fetchone()[0] == 1
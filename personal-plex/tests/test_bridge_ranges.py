@@ -0,0 +1,80 @@
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+
+def lines(res):
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in res.text.splitlines()]
+
+
+def db_payments(bridge, where="1", params=()):
+    conn = sqlite3.connect(bridge.DB_PATH)
+    try:
+        return conn.execute(
+            f"SELECT unitId, month, status, amount, paidAt FROM payments WHERE {where}"
+            " ORDER BY month, unitId, paymentId", params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_summary_range_has_a_line_per_month(client):
+    got = lines(client.get("/api/summary", params={"from": "2022-11", "to": "2023-02"}))
+    assert [s["month"] for s in got] == ["2022-11", "2022-12", "2023-01", "2023-02"]
+    assert got[0] == {"month": "2022-11", "payments": {"paid": 0, "pending": 0, "unpaid": 0, "totalAmount": 0},
+                      "expenses": {"totalAmount": 0, "count": 0}}  # 데이터 없는 달도 0으로
+    for summary in got[2:]:
+        assert summary == client.get(f"/api/summary/{summary['month']}").json()
+
+    assert len(lines(client.get("/api/summary", params={"from": "2023-03"}))) == 1  # to 생략 = from
+
+
+def test_summary_range_span_is_bounded(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "SUMMARY_MAX_MONTHS", 12)
+    assert len(lines(client.get("/api/summary", params={"from": "2023-01", "to": "2023-12"}))) == 12
+    res = client.get("/api/summary", params={"from": "2023-01", "to": "2024-01"})
+    assert res.status_code == 400
+    assert client.get("/api/summary", params={"from": "0001-01", "to": "9999-12"}).status_code == 400
+
+
+def test_payments_range_matches_the_db(bridge, client):
+    got = lines(client.get("/api/payments", params={"from": "2023-02", "to": "2023-04"}))
+    assert [(p["unitId"], p["month"], p["status"], p["amount"], p["paidAt"]) for p in got] == \
+        db_payments(bridge, "month BETWEEN '2023-02' AND '2023-04'")
+
+    got = lines(client.get("/api/payments", params={"from": "2023-01", "to": "2023-06", "status": "unpaid, partial"}))
+    assert {p["status"] for p in got} <= {"UNPAID", "PARTIAL"}
+    assert len(got) == len(db_payments(bridge, "status IN ('UNPAID', 'PARTIAL')"))
+
+
+def test_payments_range_streams_in_chunks(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "NDJSON_CHUNK", 3)  # 청크 경계에서 빠지거나 겹치는 행이 없어야 한다
+    expected = db_payments(bridge)
+    got = lines(client.get("/api/payments", params={"from": "2023-01", "to": "2023-06"}))
+    assert [(p["unitId"], p["month"], p["status"], p["amount"], p["paidAt"]) for p in got] == expected
+
+    # TestClient는 gzip을 풀어서 주므로 원본 바이트를 직접 읽는다
+    with client.stream("GET", "/api/payments", params={"from": "2023-01", "to": "2023-06"},
+                       headers={"Accept-Encoding": "gzip"}) as res:
+        assert res.headers["content-encoding"] == "gzip"
+        raw = b"".join(res.iter_raw())
+    assert [json.loads(line) for line in gzip.decompress(raw).splitlines()] == got
+
+
+def test_payments_range_revalidates(bridge, client):
+    etag = client.get("/api/payments", params={"from": "2023-01"}).headers["ETag"]
+    assert client.get("/api/payments", params={"from": "2023-01"}, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/summary", {"from": "2023-13"}),
+    ("/api/summary", {"from": "2023-1"}),
+    ("/api/summary", {"from": "2023-05", "to": "2023-01"}),
+    ("/api/payments", {"from": "2023-01", "to": "2023-00"}),
+    ("/api/payments", {"from": "2023-01", "status": "PAID,LATE"}),
+])
+def test_bad_ranges_are_a_400(client, path, params):
+    assert client.get(path, params=params).status_code == 400
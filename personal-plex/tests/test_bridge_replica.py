@@ -0,0 +1,55 @@
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from conftest import AUTH
+from replica import export_changeset, install_change_log
+
+
+def full_changeset(bridge):
+    conn = sqlite3.connect(bridge.DB_PATH, isolation_level=None)
+    try:
+        install_change_log(conn)
+        return export_changeset(conn, full=True)
+    finally:
+        conn.close()
+
+
+def test_gzip_changeset_is_applied(bridge, client):
+    body = gzip.compress(json.dumps(full_changeset(bridge)).encode())
+    r = client.post("/api/replica/changeset", content=body,
+                    headers={**AUTH, "Content-Type": "application/json", "Content-Encoding": "gzip"})
+    assert r.status_code == 200 and r.json()["applied"]
+    assert client.get("/api/replica").json()["source"] == r.json()["source"]
+
+
+def test_oversized_bodies_are_refused(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "REPLICA_MAX_BYTES", 4096)
+    r = client.post("/api/replica/changeset", content=b"{" + b" " * 5000 + b"}", headers=AUTH)
+    assert r.status_code == 413
+    monkeypatch.setattr(bridge, "REPLICA_MAX_BYTES", 64 * 1024)
+    bomb = gzip.compress(b" " * (10 * 1024 * 1024))  # 10KB 남짓 -> 풀면 10MB
+    assert len(bomb) < 64 * 1024
+    r = client.post("/api/replica/changeset", content=bomb, headers={**AUTH, "Content-Encoding": "gzip"})
+    assert r.status_code == 413
+
+
+def test_broken_gzip_is_a_bad_request(client):
+    body = gzip.compress(b'{"format": "pinehill-changeset/1"}')[:-12]
+    r = client.post("/api/replica/changeset", content=body, headers={**AUTH, "Content-Encoding": "gzip"})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "test-token"}])
+def test_changeset_needs_the_bridge_token(bridge, client, headers):
+    r = client.post("/api/replica/changeset", json=full_changeset(bridge), headers=headers)
+    assert r.status_code == 401 and r.headers["www-authenticate"] == "Bearer"
+    assert client.get("/api/replica").json()["source"] is None
+
+
+def test_writes_are_off_without_a_configured_token(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "BRIDGE_TOKEN", "")
+    r = client.post("/api/replica/changeset", json=full_changeset(bridge), headers={"Authorization": "Bearer "})
+    assert r.status_code == 403
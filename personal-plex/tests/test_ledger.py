@@ -0,0 +1,138 @@
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+
+from conftest import add_payment, add_tenant, add_unit
+from ledger import Ledger, month_of_epoch_ms
+
+RENT = 500_000
+
+
+def turnover(conn):
+    """201호: 이전 임차인 2024-01~06 납부, 07~08 공실, 새 임차인 2024-09 입주"""
+    add_unit(conn, "PINE-201", 201, "500-50")
+    add_tenant(conn, "old", "김이전", "PINE-201", "2024-01")
+    for month in ("2024-01", "2024-02", "2024-03", "2024-04", "2024-05", "2024-06"):
+        add_payment(conn, "PINE-201", "old", month, RENT)
+    add_tenant(conn, "new", "박진환", "PINE-201", "2024-09")
+
+
+def test_balance_starts_at_current_tenant_move_in(db):
+    turnover(db)
+    add_payment(db, "PINE-201", "new", "2024-09", RENT)
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+
+    row = ledger.balance("PINE-201", "2024-12")
+    assert row["tenant"] == "박진환"
+    assert row["since"] == "2024-09"  # 공실 기간과 이전 임차인 몫은 청구하지 않음
+    assert (row["expected"], row["received"], row["arrears"]) == (4 * RENT, RENT, 3 * RENT)
+    assert row["monthsBehind"] == 3.0
+    assert [m["month"] for m in ledger.statement("PINE-201", "2024-12")["months"]] == [
+        "2024-09", "2024-10", "2024-11", "2024-12"]
+
+
+def test_payment_before_registration_moves_start_back(db):
+    turnover(db)
+    add_payment(db, "PINE-201", "new", "2024-08", RENT)  # 등록 전에 들어온 첫 달 월세
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    row = ledger.balance("PINE-201", "2024-09")
+    assert row["since"] == "2024-08"
+    assert row["arrears"] == RENT
+
+
+def test_unpaid_rows_do_not_count_but_pending_does(db):
+    turnover(db)
+    add_payment(db, "PINE-201", "new", "2024-09", RENT, status="UNPAID")  # 사용자가 미납으로 고친 입금
+    add_payment(db, "PINE-201", "new", "2024-10", RENT, status="PENDING")
+    add_payment(db, "PINE-201", "new", "2024-11", RENT // 2, status="PARTIAL")
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    row = ledger.balance("PINE-201", "2024-11")
+    assert row["received"] == RENT + RENT // 2
+    assert row["arrears"] == 3 * RENT - row["received"]
+
+
+def test_refresh_is_incremental_and_recomputes_on_rewrite(db):
+    turnover(db)
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == 2 * RENT
+
+    payment_id = add_payment(db, "PINE-201", "new", "2024-09", RENT)
+    ledger.refresh(db, generation=1)  # 같은 세대: 그대로
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == 2 * RENT
+    ledger.refresh(db, generation=2)
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == RENT
+
+    # 이미 반영한 행을 고침: 새 행만 읽으므로 고친 쪽(복제 적용)이 epoch로 알린다
+    add_unit(db, "PINE-202", 202, "500-50")
+    db.execute("UPDATE payments SET unitId = 'PINE-202', tenantKey = NULL WHERE paymentId = ?", (payment_id,))
+    ledger.refresh(db, generation=3, epoch=1)
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == 2 * RENT
+    assert ledger.balance("PINE-202", "2024-10")["since"] == "2024-09"  # 임차인 없는 세대: 첫 납부 월
+
+
+def test_arrears_lists_rented_units_only(db):
+    turnover(db)
+    add_unit(db, "PINE-301", 301, "300-40", status="VACANT")
+    add_payment(db, "PINE-301", None, "2024-09", 0, status="UNPAID")
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    assert [r["unitId"] for r in ledger.arrears("2024-10")] == ["PINE-201"]
+
+
+def test_refresh_reads_only_new_rows(db):
+    turnover(db)
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    statements = []
+    db.set_trace_callback(statements.append)
+    add_payment(db, "PINE-201", "new", "2024-09", RENT)
+    statements.clear()
+    ledger.refresh(db, generation=2)
+    db.set_trace_callback(None)
+    assert not any("COUNT(" in sql.upper() for sql in statements)  # 전체 납부를 세지 않는다
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == RENT
+
+
+def test_recomputes_when_the_last_row_goes_away(db):
+    turnover(db)
+    payment_id = add_payment(db, "PINE-201", "new", "2024-09", RENT)
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    db.execute("DELETE FROM payments WHERE paymentId = ?", (payment_id,))  # 예전 DB로 되돌림
+    ledger.refresh(db, generation=2)
+    assert ledger.balance("PINE-201", "2024-10")["arrears"] == 2 * RENT
+
+
+def test_months_are_seoul_months():
+    # 2024-08-31 16:00 UTC = 2024-09-01 01:00 KST
+    at = int(datetime(2024, 8, 31, 16, tzinfo=timezone.utc).timestamp() * 1000)
+    assert month_of_epoch_ms(at) == "2024-09"
+
+
+def test_tenant_month_uses_seoul_time(db):
+    add_unit(db, "PINE-201", 201, "500-50")
+    at = int(datetime(2024, 8, 31, 16, tzinfo=timezone.utc).timestamp() * 1000)
+    db.execute("INSERT INTO tenants VALUES ('new', '박진환', '01000000000', 'PINE-201', ?)", (at,))
+    ledger = Ledger()
+    ledger.refresh(db, generation=1)
+    assert ledger.balance("PINE-201", "2024-09")["since"] == "2024-09"
+
+
+def test_bridge_recomputes_after_the_db_file_is_replaced(bridge, client):
+    before = client.get("/api/arrears", params={"asOf": "2023-06", "all": "true"}).json()["totalArrears"]
+    copy = bridge.DB_PATH + ".new"
+    shutil.copy(bridge.DB_PATH, copy)
+    conn = sqlite3.connect(copy)
+    conn.execute("UPDATE payments SET status = 'UNPAID' WHERE month = '2023-01'")  # 예전 행만 고침
+    conn.commit()
+    conn.close()
+    os.replace(copy, bridge.DB_PATH)  # 폰에서 DB를 통째로 복사해 온 경우
+    bridge.db_watcher.check()
+
+    after = client.get("/api/arrears", params={"asOf": "2023-06", "all": "true"}).json()["totalArrears"]
+    assert after > before
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import llm_tools
+from conftest import add_payment
+from llm_tools import ConversationCache, ToolError, build_tools
+
+TOOLS = ["get_units", "get_unit_status", "get_payments_by_month", "get_monthly_summary", "get_summary_range",
+         "get_payments_range", "get_arrears", "get_unit_ledger"]
+
+
+@pytest.fixture
+def tools(bridge):
+    return build_tools(bridge.app, bridge.TOOL_EXCLUDE)
+
+
+def test_tools_come_from_the_get_routes(tools):
+    assert sorted(tools) == sorted(TOOLS)  # POST/비-API/제외 목록의 라우트는 없음
+
+
+def test_spec_from_route_signature(bridge, tools):
+    fn = tools["get_arrears"].spec()["function"]
+    assert fn["description"] == "임대중 세대 연체 현황 (기준 월까지 월세 합 - 받은 금액 합), 연체액 큰 순."
+    assert fn["parameters"] == {
+        "type": "object",
+        "properties": {"asOf": {"type": "string", "description": bridge.AS_OF_DOC},
+                       "all": {"type": "boolean", "description": "연체 없는 세대도 포함", "default": False}},
+        "required": [],
+    }
+    params = tools["get_summary_range"].spec()["function"]["parameters"]
+    assert list(params["properties"]) == ["from", "to"] and params["required"] == ["from"]
+    assert tools["get_unit_ledger"].spec()["function"]["parameters"]["required"] == ["unit_id"]
+
+
+def test_request_from_arguments(tools):
+    assert tools["get_unit_ledger"].request({"unit_id": "PINE 201/x", "asOf": "2024-01"}) == \
+        ("/api/units/PINE%20201%2Fx/ledger", {"asOf": "2024-01"})
+    assert tools["get_arrears"].request({"all": True, "asOf": ""}) == ("/api/arrears", {"all": "true"})
+    with pytest.raises(ToolError, match="unit_id"):
+        tools["get_unit_status"].request({})
+    with pytest.raises(ToolError, match="from"):
+        tools["get_summary_range"].request({"to": "2024-01"})
+
+
+def render(ref):
+    return f"result #{ref}"
+
+
+def test_cache_numbers_results_per_conversation():
+    cache = ConversationCache()
+    assert cache.put("a", "k1", '"e1"', render) == "result #1"
+    assert cache.put("a", "k2", None, render) == "result #2"
+    assert cache.put("b", "k1", '"e1"', render) == "result #1"
+    assert cache.get("a", "k1") == ('"e1"', "result #1", 1)
+    assert cache.get("a", "nope") is None
+
+
+def test_cache_evicts_the_least_recently_used_conversation():
+    cache = ConversationCache(max_conversations=2)
+    cache.put("a", "k", None, render)
+    cache.put("b", "k", None, render)
+    assert cache.get("a", "k") is not None  # 가득 찬 상태에서 가장 오래된 a를 다시 써도 a는 남는다
+    assert cache.get("new", "k") is None and len(cache) == 2  # 조회만으로는 아무것도 밀어내지 않는다
+    cache.put("c", "k", None, render)
+    assert len(cache) == 2
+    assert cache.get("a", "k") == (None, "result #1", 1)
+    assert cache.put("a", "k2", None, render) == "result #2"  # ref 번호도 이어진다
+    assert cache.get("b", "k") is None  # b가 빠졌다
+
+
+def test_cache_expires_idle_conversations(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm_tools, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = ConversationCache(ttl=10)
+    cache.put("a", "k", None, render)
+    cache.put("b", "k", None, render)
+    now[0] += 8
+    assert cache.get("a", "k") is not None  # 쓰면 시간이 다시 시작
+    now[0] += 8
+    assert cache.get("a", "k") is not None
+    assert cache.get("b", "k") is None and len(cache) == 1
+    now[0] += 11
+    assert cache.get("a", "k") is None
+
+
+def call(client, name, conversation=None, **arguments):
+    body = {"id": "c1", "function": {"name": name, "arguments": json.dumps(arguments)}}
+    if conversation:
+        body["conversationId"] = conversation
+    res = client.post("/api/tools/call", json=body)
+    assert res.status_code == 200
+    msg = res.json()
+    assert (msg["role"], msg["tool_call_id"], msg["name"]) == ("tool", "c1", name)
+    return json.loads(msg["content"])
+
+
+def test_call_reuses_results_until_the_db_changes(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "tool_cache", ConversationCache())
+    first = call(client, "get_monthly_summary", "chat", month="2023-03")
+    assert first["ref"] == 1 and first["m"] == "2023-03"
+    assert call(client, "get_monthly_summary", "chat", month="2023-03") == \
+        {"same": 1, "note": "DB 변경 없음, 결과 #1 그대로"}
+    assert call(client, "get_monthly_summary", "other", month="2023-03")["ref"] == 1  # 대화마다 따로
+
+    conn = sqlite3.connect(bridge.DB_PATH, isolation_level=None)
+    unit_id, tenant_key = conn.execute("SELECT unitId, tenantKey FROM tenants LIMIT 1").fetchone()
+    add_payment(conn, unit_id, tenant_key, "2023-03", 10_000)
+    conn.close()
+    bridge.db_watcher.check()
+    changed = call(client, "get_monthly_summary", "chat", month="2023-03")
+    assert changed["ref"] == 2 and changed["in"] == first["in"] + 10_000
+
+    monkeypatch.setattr(bridge, "TOOL_DEDUP", False)
+    assert call(client, "get_monthly_summary", "chat", month="2023-03") == changed
+
+
+def test_call_without_conversation_and_errors(client):
+    units = call(client, "get_units")
+    assert "ref" not in units and units["n"] == 5 and units["cols"] == ["id", "st", "type", "price"]
+    assert call(client, "get_summary_range", **{"from": "2023-01", "to": "2023-03"})["cols"][0] == "m"
+    assert call(client, "get_unit_status") == {"err": 400, "msg": "missing argument: unit_id"}
+    assert call(client, "get_unit_status", unit_id="NOPE")["err"] == 404
+    assert client.post("/api/tools/call", json={"name": "drop_tables"}).status_code == 404
+    assert client.post("/api/tools/call", json={"name": "get_units", "arguments": "{"}).status_code == 400
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from replica import (ReplicaConflict, ReplicaError, apply_changeset, export_changeset, install_change_log,
+                     open_replica, prune_change_log, replica_state)
+from sample_db import make_db
+
+TABLES = ("units", "tenants", "payments", "expenses")
+
+
+@pytest.fixture
+def phone(tmp_path):
+    conn = sqlite3.connect(make_db(str(tmp_path / "phone.db"), units=5, months=6), isolation_level=None)
+    install_change_log(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def bridge(tmp_path):
+    conn = open_replica(str(tmp_path / "bridge.db"))
+    yield conn
+    conn.close()
+
+
+def contents(conn):
+    return {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall(), key=repr) for t in TABLES}
+
+
+def test_full_then_incremental(phone, bridge):
+    result = apply_changeset(bridge, export_changeset(phone, full=True))
+    assert result["applied"] and result["full"]
+    assert contents(bridge) == contents(phone)
+    version, rewrites = result["version"], result["rewrites"]
+
+    phone.execute("UPDATE payments SET amount = amount + 1 WHERE paymentId = 1")
+    phone.execute("DELETE FROM expenses WHERE expenseId = 1")
+    phone.execute("INSERT INTO units VALUES ('PINE-999', 999, 9, 'VACANT', '원룸', '300-40', 0, 0)")
+    changeset = export_changeset(phone, since=version)
+    assert not changeset["full"] and changeset["base"] == version
+    assert {t: len(p["rows"]) + len(p["deleted"]) for t, p in changeset["tables"].items()} == {
+        "units": 1, "payments": 1, "expenses": 1}
+
+    result = apply_changeset(bridge, changeset)
+    assert (result["upserted"], result["deleted"]) == (2, 1)
+    assert result["rewrites"] == rewrites + 1  # 기존 납부 행을 고침
+    assert contents(bridge) == contents(phone)
+
+    again = apply_changeset(bridge, changeset)  # 같은 changeset을 다시 보내도 안전
+    assert not again["applied"] and again["version"] == changeset["head"]
+
+
+def test_conflicts_report_bridge_state(phone, bridge):
+    with pytest.raises(ReplicaConflict) as e:
+        apply_changeset(bridge, export_changeset(phone, since=0))  # 처음인데 full이 아님
+    assert e.value.state["source"] is None
+
+    apply_changeset(bridge, export_changeset(phone, full=True))
+    phone.execute("UPDATE units SET status = 'VACANT' WHERE unitId = 'PINE-201'")
+    head = apply_changeset(bridge, export_changeset(phone, since=0))["version"]
+    phone.execute("UPDATE units SET status = 'RENTED' WHERE unitId = 'PINE-201'")
+    with pytest.raises(ReplicaConflict) as e:
+        apply_changeset(bridge, export_changeset(phone, since=0))  # 브리지는 이미 head까지 받음
+    assert e.value.state["version"] == head > 0
+    assert replica_state(bridge)["version"] == head
+
+
+def test_invalid_changesets_change_nothing(phone, bridge):
+    full = export_changeset(phone, full=True)
+    apply_changeset(bridge, full)
+    before = contents(bridge)
+    with pytest.raises(ReplicaError):
+        apply_changeset(bridge, {**full, "schema": ["DROP TABLE units"]})
+    with pytest.raises(ReplicaError):
+        apply_changeset(bridge, {**full, "tables": {"units": {"cols": ["unitId", "bogus"], "rows": [["x", 1]]}}})
+    with pytest.raises(ReplicaError):
+        apply_changeset(bridge, {**full, "format": "something-else"})
+    assert contents(bridge) == before
+
+
+def test_prune_keeps_deletes_until_acknowledged(phone, bridge):
+    head = apply_changeset(bridge, export_changeset(phone, full=True))["version"]
+    phone.execute("DELETE FROM expenses WHERE expenseId IN (1, 2)")
+    head = apply_changeset(bridge, export_changeset(phone, since=head))["version"]
+    assert prune_change_log(phone, head) == 2
+    assert phone.execute("SELECT COUNT(*) FROM change_log WHERE deleted = 1").fetchone()[0] == 0
+
+    phone.execute("DELETE FROM expenses WHERE expenseId = 3")
+    changeset = export_changeset(phone, since=head)
+    assert changeset["tables"]["expenses"]["deleted"] == [3]
+    # 정리한 범위보다 오래된 브리지(백업에서 되돌림 등)는 빠진 삭제가 있으니 전체 스냅샷
+    assert export_changeset(phone, since=head - 1)["full"]
+    apply_changeset(bridge, changeset)
+    assert contents(bridge) == contents(phone)
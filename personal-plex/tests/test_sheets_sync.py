@@ -0,0 +1,116 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import fake_sheets
+import sheets_sync
+from sample_db import make_db
+from sheets_sync import PAYMENTS_TAB, UNITS_TAB, SheetsClient, SheetsError, SheetsSync, read_tables
+
+URL = "https://docs.google.com/spreadsheets/d/test-sheet/edit"
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """fake_sheets 서버 (임의 포트). 재시도 대기는 0으로."""
+    monkeypatch.setattr(sheets_sync, "random", SimpleNamespace(uniform=lambda a, b: 0.0))
+    server = fake_sheets.serve(0, seed=3)
+    fake = server.RequestHandlerClass.fake
+    fake.base = f"http://127.0.0.1:{server.server_address[1]}/v4"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tables(tmp_path):
+    conn = sqlite3.connect(make_db(str(tmp_path / "pinehill.db"), units=5, months=6))
+    try:
+        return read_tables(conn)
+    finally:
+        conn.close()
+
+
+def syncer(fake, tmp_path, client_class=SheetsClient, max_retries=3, max_cells=40):
+    client = client_class("test-sheet", base=fake.base, rate=0, max_retries=max_retries)
+    return SheetsSync(URL, str(tmp_path / "sheets_sync.json"), client, max_cells=max_cells)
+
+
+def sheet_rows(fake, tab):
+    return fake.values("test-sheet", f"'{tab.name}'")
+
+
+def expected_rows(tables, tab):
+    return sorted([str(v) for v in row] for row in tables[tab.name].values())
+
+
+def assert_sheet_matches(fake, tables):
+    for tab in (UNITS_TAB, PAYMENTS_TAB):
+        rows = sheet_rows(fake, tab)
+        assert rows[0] == tab.header
+        got = sorted([str(v) for v in row] + [""] * (len(tab.header) - len(row)) for row in rows[1:] if row)
+        assert got == expected_rows(tables, tab)
+
+
+def test_sync_writes_everything_then_only_changes(fake, tmp_path, tables):
+    sync = syncer(fake, tmp_path)
+    first = sync.push(tables)
+    assert first["rows"] == len(tables[UNITS_TAB.name]) + len(tables[PAYMENTS_TAB.name]) + 2  # + 헤더 2개
+    assert_sheet_matches(fake, tables)
+
+    assert sync.push(tables)["rows"] == 0  # 그대로면 아무것도 안 보냄
+
+    key = next(iter(tables[UNITS_TAB.name]))
+    tables[UNITS_TAB.name][key][2] = "VACANT"
+    removed = tables[PAYMENTS_TAB.name].pop(next(iter(tables[PAYMENTS_TAB.name])))
+    assert sync.push(tables)["rows"] == 2  # 바뀐 행 하나 + 지운 행 하나(빈 행으로)
+    assert_sheet_matches(fake, tables)
+
+    tables[PAYMENTS_TAB.name]["2099-01|NEW"] = ["2099-01", "NEW", "PAID", 1, ""]
+    sync.push(tables)
+    state = json.load(open(tmp_path / "sheets_sync.json", encoding="utf-8"))
+    assert state["tabs"][PAYMENTS_TAB.name]["free"] == []  # 지운 자리를 다시 씀
+    assert removed not in sheet_rows(fake, PAYMENTS_TAB)
+
+
+def test_retries_429_and_5xx(fake, tmp_path, tables):
+    fake.fail_rate = 0.4
+    sync = syncer(fake, tmp_path, max_retries=8)
+    stats = sync.push(tables)
+    assert fake.stats["injected500"] > 0
+    assert stats["retries"] == fake.stats["injected500"]
+    fake.fail_rate = 0.0
+    assert_sheet_matches(fake, tables)
+
+
+def test_resumes_from_the_checkpoint(fake, tmp_path, tables):
+    class FailsAfterTwoWrites(SheetsClient):
+        writes = 0
+
+        def write(self, data):
+            super().write(data)
+            FailsAfterTwoWrites.writes += 1
+            if FailsAfterTwoWrites.writes == 2:
+                fake.fail_rate = 1.0  # 이후 요청은 전부 실패
+
+    total = len(tables[UNITS_TAB.name]) + len(tables[PAYMENTS_TAB.name]) + 2
+    with pytest.raises(SheetsError):
+        syncer(fake, tmp_path, FailsAfterTwoWrites, max_retries=0).push(tables)
+    state = json.load(open(tmp_path / "sheets_sync.json", encoding="utf-8"))
+    done = sum(len(t["rows"]) + (t["header"] is not None) for t in state["tabs"].values())
+    assert 0 < done < total
+
+    fake.fail_rate = 0.0
+    cells_before = fake.stats["cellsWritten"]
+    resumed = syncer(fake, tmp_path).push(tables)  # 새 프로세스처럼: 체크포인트만 보고 이어서
+    assert resumed["rows"] == total - done
+    assert fake.stats["cellsWritten"] - cells_before < total * 5
+    assert_sheet_matches(fake, tables)
+
+
+def test_exclusive_without_fcntl(fake, tmp_path, tables, monkeypatch):
+    monkeypatch.setattr(sheets_sync, "fcntl", None)
+    assert syncer(fake, tmp_path).push(tables)["rows"] > 0
+    assert not (tmp_path / "sheets_sync.json.lock").exists()
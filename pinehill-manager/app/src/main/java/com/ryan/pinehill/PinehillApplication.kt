@@ -1,7 +1,9 @@
 package com.ryan.pinehill
 
 import android.app.Application
+import androidx.room.InvalidationTracker
 import com.ryan.pinehill.data.AppDatabase
+import com.ryan.pinehill.util.BridgeSyncWorker
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.launch
@@ -19,6 +21,16 @@ class PinehillApplication : Application() {
                 seedUnits()
             }
         }
+
+        // 브리지 복제: 주기적으로 + 데이터가 바뀌면 잠시 뒤 (change_log만 바뀌는 prune은 다시 부르지 않음)
+        BridgeSyncWorker.schedule(this)
+        database.invalidationTracker.addObserver(
+            object : InvalidationTracker.Observer(arrayOf("units", "tenants", "payments", "expenses")) {
+                override fun onInvalidated(tables: Set<String>) {
+                    BridgeSyncWorker.requestSoon(this@PinehillApplication)
+                }
+            }
+        )
     }
     
     private suspend fun seedUnits() {
@@ -65,6 +65,7 @@ abstract class AppDatabase : RoomDatabase() {
                     "pinehill_database"
                 )
                 .fallbackToDestructiveMigration()
+                .addCallback(ChangeLog.callback)  // 브리지 증분 복제용 변경 기록
                 .build()
                 INSTANCE = instance
                 instance
@@ -0,0 +1,167 @@
+package com.ryan.pinehill.data
+
+import android.database.Cursor
+import androidx.room.RoomDatabase
+import androidx.sqlite.db.SupportSQLiteDatabase
+import org.json.JSONArray
+import org.json.JSONObject
+
+// 브리지(personal-plex) 증분 복제용 변경 기록
+// 트리거가 바뀐 행의 키를 change_log에 버전 번호와 함께 남기고 (행마다 마지막 변경 하나만),
+// export()가 since 이후 바뀐 행만 changeset JSON으로 만든다. 브리지가 받은 버전 이하의 삭제 표시는
+// prune()이 지운다. 형식은 personal-plex/config/replica.py 참고.
+object ChangeLog {
+    const val FORMAT = "pinehill-changeset/1"
+
+    // 테이블 -> 기본 키 (부모 테이블 먼저)
+    private val TABLES = linkedMapOf(
+        "units" to "unitId",
+        "tenants" to "tenantKey",
+        "payments" to "paymentId",
+        "expenses" to "expenseId"
+    )
+
+    val callback = object : RoomDatabase.Callback() {
+        override fun onOpen(db: SupportSQLiteDatabase) {
+            install(db)
+        }
+
+        override fun onDestructiveMigration(db: SupportSQLiteDatabase) {
+            // 테이블을 새로 만들었으니 DB ID도 새로: 브리지가 전체 스냅샷을 받게 한다
+            db.execSQL("DROP TABLE IF EXISTS change_log")
+            db.execSQL("DROP TABLE IF EXISTS change_log_meta")
+            db.execSQL("DROP TABLE IF EXISTS change_log_pruned")
+        }
+    }
+
+    // replica.py의 change_log_sql()과 같은 SQL
+    fun install(db: SupportSQLiteDatabase) {
+        db.execSQL(
+            "CREATE TABLE IF NOT EXISTS change_log (version INTEGER PRIMARY KEY AUTOINCREMENT, " +
+                "tbl TEXT NOT NULL, rowKey NOT NULL, deleted INTEGER NOT NULL)"
+        )
+        db.execSQL("CREATE INDEX IF NOT EXISTS change_log_row ON change_log (tbl, rowKey)")
+        db.execSQL("CREATE TABLE IF NOT EXISTS change_log_meta (dbId TEXT NOT NULL)")
+        db.execSQL(
+            "INSERT INTO change_log_meta (dbId) SELECT lower(hex(randomblob(8))) " +
+                "WHERE NOT EXISTS (SELECT 1 FROM change_log_meta)"
+        )
+        db.execSQL("CREATE TABLE IF NOT EXISTS change_log_pruned (version INTEGER NOT NULL)")
+        db.execSQL(
+            "INSERT INTO change_log_pruned (version) SELECT 0 " +
+                "WHERE NOT EXISTS (SELECT 1 FROM change_log_pruned)"
+        )
+        for ((table, key) in TABLES) {
+            db.execSQL(
+                "CREATE TRIGGER IF NOT EXISTS change_log_${table}_insert AFTER INSERT ON $table BEGIN " +
+                    "DELETE FROM change_log WHERE tbl = '$table' AND rowKey = NEW.$key; " +
+                    "INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('$table', NEW.$key, 0); END"
+            )
+            db.execSQL(
+                "CREATE TRIGGER IF NOT EXISTS change_log_${table}_update AFTER UPDATE ON $table BEGIN " +
+                    "DELETE FROM change_log WHERE tbl = '$table' AND rowKey IN (OLD.$key, NEW.$key); " +
+                    "INSERT INTO change_log (tbl, rowKey, deleted) SELECT '$table', OLD.$key, 1 " +
+                    "WHERE OLD.$key IS NOT NEW.$key; " +
+                    "INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('$table', NEW.$key, 0); END"
+            )
+            db.execSQL(
+                "CREATE TRIGGER IF NOT EXISTS change_log_${table}_delete AFTER DELETE ON $table BEGIN " +
+                    "DELETE FROM change_log WHERE tbl = '$table' AND rowKey = OLD.$key; " +
+                    "INSERT INTO change_log (tbl, rowKey, deleted) VALUES ('$table', OLD.$key, 1); END"
+            )
+        }
+    }
+
+    fun dbId(db: SupportSQLiteDatabase): String =
+        db.query("SELECT dbId FROM change_log_meta").use { it.moveToFirst(); it.getString(0) }
+
+    // 이 버전 이하의 삭제 표시는 prune()으로 지웠다
+    fun prunedVersion(db: SupportSQLiteDatabase): Long =
+        db.query("SELECT version FROM change_log_pruned").use { it.moveToFirst(); it.getLong(0) }
+
+    // 브리지가 받은 버전(acked) 이하의 삭제 표시를 지운다. 살아 있는 행의 기록은 증분 export에 필요하므로 둔다.
+    fun prune(db: SupportSQLiteDatabase, acked: Long): Int {
+        db.beginTransaction()
+        try {
+            val count = db.delete("change_log", "deleted = 1 AND version <= ?", arrayOf<Any>(acked))
+            db.execSQL("UPDATE change_log_pruned SET version = MAX(version, ?)", arrayOf<Any>(acked))
+            db.setTransactionSuccessful()
+            return count
+        } finally {
+            db.endTransaction()
+        }
+    }
+
+    // since 이후 바뀐 행 (full이면 전체 + 스키마). 한 트랜잭션에서 읽으므로 쓰는 중인 상태가 섞이지 않는다.
+    // since가 정리한 범위 안이면 빠진 삭제가 있을 수 있으므로 전체 스냅샷을 만든다.
+    fun export(db: SupportSQLiteDatabase, since: Long, full: Boolean): JSONObject {
+        db.beginTransaction()
+        try {
+            val snapshot = full || since < prunedVersion(db)
+            val base = if (snapshot) 0L else since
+            val head = db.query("SELECT COALESCE(MAX(version), 0) FROM change_log")
+                .use { it.moveToFirst(); it.getLong(0) }
+            val tables = JSONObject()
+            for ((table, key) in TABLES) {
+                val part = if (snapshot) {
+                    db.query("SELECT * FROM $table").use { toTable(it) }
+                } else {
+                    db.query(
+                        "SELECT t.* FROM change_log c JOIN $table t ON t.$key = c.rowKey " +
+                            "WHERE c.tbl = ? AND c.version > ? AND c.deleted = 0 ORDER BY c.version",
+                        arrayOf<Any>(table, base)
+                    ).use { toTable(it) }
+                }
+                val deleted = JSONArray()
+                if (!snapshot) {
+                    db.query(
+                        "SELECT rowKey FROM change_log WHERE tbl = ? AND version > ? AND deleted = 1",
+                        arrayOf<Any>(table, base)
+                    ).use { while (it.moveToNext()) deleted.put(value(it, 0)) }
+                }
+                if (part.getJSONArray("rows").length() > 0 || deleted.length() > 0) {
+                    tables.put(table, part.put("deleted", deleted))
+                }
+            }
+            val changeset = JSONObject()
+                .put("format", FORMAT)
+                .put("source", dbId(db))
+                .put("base", base)
+                .put("head", head)
+                .put("full", snapshot)
+                .put("tables", tables)
+            if (snapshot) {
+                val names = TABLES.keys.joinToString(", ") { "'$it'" }
+                val schema = JSONArray()
+                db.query(
+                    "SELECT sql FROM sqlite_master WHERE type IN ('table', 'index') AND tbl_name IN ($names) " +
+                        "AND sql IS NOT NULL ORDER BY type DESC"
+                ).use { while (it.moveToNext()) schema.put(it.getString(0)) }
+                changeset.put("schema", schema)
+            }
+            db.setTransactionSuccessful()
+            return changeset
+        } finally {
+            db.endTransaction()
+        }
+    }
+
+    private fun toTable(cursor: Cursor): JSONObject {
+        val cols = JSONArray()
+        cursor.columnNames.forEach { cols.put(it) }
+        val rows = JSONArray()
+        while (cursor.moveToNext()) {
+            val row = JSONArray()
+            for (i in 0 until cursor.columnCount) row.put(value(cursor, i))
+            rows.put(row)
+        }
+        return JSONObject().put("cols", cols).put("rows", rows)
+    }
+
+    private fun value(cursor: Cursor, i: Int): Any = when (cursor.getType(i)) {
+        Cursor.FIELD_TYPE_NULL -> JSONObject.NULL
+        Cursor.FIELD_TYPE_INTEGER -> cursor.getLong(i)
+        Cursor.FIELD_TYPE_FLOAT -> cursor.getDouble(i)
+        else -> cursor.getString(i)
+    }
+}
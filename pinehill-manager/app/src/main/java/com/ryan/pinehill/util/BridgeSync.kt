@@ -0,0 +1,55 @@
+package com.ryan.pinehill.util
+
+import com.ryan.pinehill.data.AppDatabase
+import com.ryan.pinehill.data.ChangeLog
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.withContext
+import org.json.JSONObject
+import java.io.IOException
+import java.net.HttpURLConnection
+import java.net.URL
+import java.util.zip.GZIPOutputStream
+
+// 브리지(personal-plex)에 마지막으로 보낸 뒤 바뀐 행만 보낸다 (DB 파일 통째 복사 대신)
+// BridgeSyncWorker가 부른다. http 주소는 res/xml/network_security_config.xml에 허용한 호스트만 된다.
+object BridgeSync {
+
+    // 예: push(database, "http://192.168.0.10:8001", token) -> 브리지에 적용된 버전
+    // token: 브리지의 BRIDGE_TOKEN (changeset 적용에 필요)
+    suspend fun push(database: AppDatabase, bridgeUrl: String, token: String): Long = withContext(Dispatchers.IO) {
+        val db = database.openHelper.writableDatabase
+        val state = JSONObject(request("GET", "$bridgeUrl/api/replica", null))
+        // 브리지가 이 DB에서 받은 적이 없으면(처음, 앱 재설치, DB 재생성) 전체 스냅샷
+        val full = state.isNull("source") || state.getString("source") != ChangeLog.dbId(db)
+        val since = if (full) 0L else state.getLong("version")
+        val changeset = ChangeLog.export(db, since, full)
+        val result = JSONObject(request("POST", "$bridgeUrl/api/replica/changeset", changeset.toString(), token))
+        // 브리지가 받은 버전까지의 삭제 표시는 더 보낼 일이 없다
+        val version = result.getLong("version")
+        ChangeLog.prune(db, version)
+        version
+    }
+
+    private fun request(method: String, url: String, body: String?, token: String? = null): String {
+        val conn = URL(url).openConnection() as HttpURLConnection
+        try {
+            conn.requestMethod = method
+            conn.connectTimeout = 10_000
+            conn.readTimeout = 60_000
+            if (token != null) conn.setRequestProperty("Authorization", "Bearer $token")
+            if (body != null) {
+                conn.doOutput = true
+                conn.setRequestProperty("Content-Type", "application/json")
+                conn.setRequestProperty("Content-Encoding", "gzip")
+                GZIPOutputStream(conn.outputStream).use { it.write(body.toByteArray()) }
+            }
+            val code = conn.responseCode
+            val text = (if (code in 200..299) conn.inputStream else conn.errorStream)
+                ?.bufferedReader()?.use { it.readText() } ?: ""
+            if (code !in 200..299) throw IOException("bridge $method $url -> $code $text")
+            return text
+        } finally {
+            conn.disconnect()
+        }
+    }
+}
@@ -0,0 +1,67 @@
+package com.ryan.pinehill.util
+
+import android.content.Context
+import android.util.Log
+import androidx.work.BackoffPolicy
+import androidx.work.Constraints
+import androidx.work.CoroutineWorker
+import androidx.work.ExistingPeriodicWorkPolicy
+import androidx.work.ExistingWorkPolicy
+import androidx.work.NetworkType
+import androidx.work.OneTimeWorkRequestBuilder
+import androidx.work.PeriodicWorkRequestBuilder
+import androidx.work.WorkManager
+import androidx.work.WorkerParameters
+import com.ryan.pinehill.BuildConfig
+import com.ryan.pinehill.data.AppDatabase
+import org.json.JSONException
+import java.io.IOException
+import java.util.concurrent.TimeUnit
+
+// 브리지로 changeset을 보내는 작업. 15분마다 한 번, 그리고 DB가 바뀌면 잠시 뒤 한 번 (PinehillApplication)
+class BridgeSyncWorker(context: Context, params: WorkerParameters) : CoroutineWorker(context, params) {
+
+    override suspend fun doWork(): Result {
+        if (BuildConfig.BRIDGE_URL.isEmpty()) return Result.success()  // 브리지를 쓰지 않음
+        return try {
+            val version = BridgeSync.push(
+                AppDatabase.getDatabase(applicationContext), BuildConfig.BRIDGE_URL, BuildConfig.BRIDGE_TOKEN
+            )
+            Log.d(TAG, "bridge at version $version")
+            Result.success()
+        } catch (e: IOException) {
+            // 네트워크 오류, 409(다시 GET부터 하면 풀림) 등: 백오프 후 다시
+            Log.w(TAG, "bridge push failed", e)
+            Result.retry()
+        } catch (e: JSONException) {
+            Log.w(TAG, "unexpected bridge response", e)
+            Result.failure()
+        }
+    }
+
+    companion object {
+        const val TAG = "BridgeSync"
+        private const val PERIODIC = "bridge-sync"
+        private const val SOON = "bridge-sync-soon"
+
+        private val network = Constraints.Builder().setRequiredNetworkType(NetworkType.CONNECTED).build()
+
+        fun schedule(context: Context) {
+            val request = PeriodicWorkRequestBuilder<BridgeSyncWorker>(15, TimeUnit.MINUTES)
+                .setConstraints(network)
+                .build()
+            WorkManager.getInstance(context)
+                .enqueueUniquePeriodicWork(PERIODIC, ExistingPeriodicWorkPolicy.KEEP, request)
+        }
+
+        // 쓰기 직후: 몇 초 모아서 한 번만 보낸다 (이미 기다리는 작업이 있으면 그것이 새 변경도 보냄)
+        fun requestSoon(context: Context) {
+            val request = OneTimeWorkRequestBuilder<BridgeSyncWorker>()
+                .setConstraints(network)
+                .setInitialDelay(10, TimeUnit.SECONDS)
+                .setBackoffCriteria(BackoffPolicy.EXPONENTIAL, 30, TimeUnit.SECONDS)
+                .build()
+            WorkManager.getInstance(context).enqueueUniqueWork(SOON, ExistingWorkPolicy.KEEP, request)
+        }
+    }
+}